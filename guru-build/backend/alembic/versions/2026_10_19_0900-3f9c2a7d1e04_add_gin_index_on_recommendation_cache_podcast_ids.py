@@ -0,0 +1,31 @@
+"""add GIN index on recommendation_cache.podcast_ids
+
+Revision ID: 3f9c2a7d1e04
+Revises: 0725730cb22b
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1e04'
+down_revision: Union[str, None] = '0725730cb22b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets podcast-scoped invalidation use array containment/overlap
+    # (podcast_ids @> / && ARRAY[...]) instead of scanning every cache row
+    op.create_index(
+        'ix_recommendation_cache_podcast_ids',
+        'recommendation_cache',
+        ['podcast_ids'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recommendation_cache_podcast_ids', table_name='recommendation_cache')
@@ -0,0 +1,39 @@
+"""add podcast_neighbors table
+
+Revision ID: 8b41d6e2c9a7
+Revises: 3f9c2a7d1e04
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41d6e2c9a7'
+down_revision: Union[str, None] = '3f9c2a7d1e04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Item-item collaborative filtering neighbours (top-N per podcast)
+    op.create_table(
+        'podcast_neighbors',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('external_id', sa.String(), nullable=False),
+        sa.Column('neighbor_ids', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('neighbor_scores', postgresql.ARRAY(sa.Float()), nullable=True),
+        sa.Column('support', sa.Integer(), nullable=True),
+        sa.Column('computed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_podcast_neighbors_external_id', 'podcast_neighbors', ['external_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_podcast_neighbors_external_id', table_name='podcast_neighbors')
+    op.drop_table('podcast_neighbors')
@@ -0,0 +1,51 @@
+"""add episode_features table
+
+Revision ID: c5e8a1f3b72d
+Revises: 8b41d6e2c9a7
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a1f3b72d'
+down_revision: Union[str, None] = '8b41d6e2c9a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Episode-level feature store for episode recommendations
+    op.create_table(
+        'episode_features',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('external_id', sa.String(), nullable=False),
+        sa.Column('podcast_external_id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('image', sa.String(), nullable=True),
+        sa.Column('enclosure_url', sa.String(), nullable=True),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.Column('duration_seconds', sa.Integer(), nullable=True),
+        sa.Column('title_embedding', postgresql.ARRAY(sa.Float()), nullable=True),
+        sa.Column('description_embedding', postgresql.ARRAY(sa.Float()), nullable=True),
+        sa.Column('features_computed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_episode_features_external_id', 'episode_features', ['external_id'], unique=True)
+    op.create_index(
+        'ix_episode_features_podcast_published',
+        'episode_features',
+        ['podcast_external_id', 'published_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_episode_features_podcast_published', table_name='episode_features')
+    op.drop_index('ix_episode_features_external_id', table_name='episode_features')
+    op.drop_table('episode_features')
@@ -0,0 +1,38 @@
+"""add ingested_events table
+
+Revision ID: e1a4c7b9d035
+Revises: c5e8a1f3b72d
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a4c7b9d035'
+down_revision: Union[str, None] = 'c5e8a1f3b72d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Idempotency keys for batch playback event ingestion
+    op.create_table(
+        'ingested_events',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('idempotency_key', sa.String(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('result_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('client_timestamp', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('user_id', 'idempotency_key', name='uq_ingested_events_user_key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ingested_events')
@@ -0,0 +1,71 @@
+"""add listening_daily_rollups and job_watermarks tables
+
+Revision ID: f3b9d2a6c148
+Revises: e1a4c7b9d035
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d2a6c148'
+down_revision: Union[str, None] = 'e1a4c7b9d035'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-user, per-podcast, per-day listening aggregates
+    op.create_table(
+        'listening_daily_rollups',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('podcast_external_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('session_count', sa.Integer(), nullable=False),
+        sa.Column('ended_session_count', sa.Integer(), nullable=False),
+        sa.Column('listened_seconds', sa.Integer(), nullable=False),
+        sa.Column('max_completion', sa.Float(), nullable=False),
+        sa.Column('pause_count', sa.Integer(), nullable=False),
+        sa.Column('seek_forward_count', sa.Integer(), nullable=False),
+        sa.Column('seek_backward_count', sa.Integer(), nullable=False),
+        sa.Column('engaged_session_count', sa.Integer(), nullable=False),
+        sa.Column('engaged_listened_seconds', sa.Integer(), nullable=False),
+        sa.Column('engagement_weight', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('user_id', 'podcast_external_id', 'day', name='uq_listening_daily_rollups_key'),
+    )
+    op.create_index(
+        'ix_listening_daily_rollups_user_day',
+        'listening_daily_rollups',
+        ['user_id', 'day']
+    )
+
+    # High-water marks of incremental jobs
+    op.create_table(
+        'job_watermarks',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False, unique=True),
+        sa.Column('watermark', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+
+    # The rollup job scans sessions updated since its watermark
+    op.create_index(
+        'ix_listening_sessions_updated_at',
+        'listening_sessions',
+        ['updated_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listening_sessions_updated_at', table_name='listening_sessions')
+    op.drop_table('job_watermarks')
+    op.drop_index('ix_listening_daily_rollups_user_day', table_name='listening_daily_rollups')
+    op.drop_table('listening_daily_rollups')
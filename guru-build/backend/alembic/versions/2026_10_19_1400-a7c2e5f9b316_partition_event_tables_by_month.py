@@ -0,0 +1,98 @@
+"""partition listening_sessions and podcast_interactions by month
+
+Revision ID: a7c2e5f9b316
+Revises: f3b9d2a6c148
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c2e5f9b316'
+down_revision: Union[str, None] = 'f3b9d2a6c148'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Future months created up front; the maintain_partitions task keeps ahead
+MONTHS_AHEAD = 3
+
+# table -> (partition key, indexes as (name, columns))
+TABLES = {
+    'listening_sessions': ('started_at', [
+        ('ix_listening_sessions_user_podcast', ['user_id', 'podcast_external_id']),
+        ('ix_listening_sessions_user_episode', ['user_id', 'episode_external_id']),
+        ('ix_listening_sessions_updated_at', ['updated_at']),
+        ('ix_listening_sessions_user_started', ['user_id', 'started_at']),
+    ]),
+    'podcast_interactions': ('interaction_timestamp', [
+        ('ix_podcast_interactions_user_type', ['user_id', 'interaction_type']),
+        ('ix_podcast_interactions_podcast', ['podcast_external_id']),
+        ('ix_podcast_interactions_user_timestamp', ['user_id', 'interaction_timestamp']),
+    ]),
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    today = datetime.utcnow().date()
+    current = date(today.year, today.month, 1)
+
+    for table, (key, indexes) in TABLES.items():
+        old = f'{table}_unpartitioned'
+        op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+        op.execute(
+            f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ({key})'
+        )
+
+        # One partition per month from the oldest row to the newest (and
+        # MONTHS_AHEAD past now), plus an archive partition below them so
+        # that every partition has bounds the planner can prune on
+        oldest, newest = bind.execute(sa.text(f'SELECT min({key}), max({key}) FROM {old}')).one()
+        month = min(date(oldest.year, oldest.month, 1), current) if oldest else current
+        last = _add_months(current, MONTHS_AHEAD)
+        if newest:
+            last = max(last, date(newest.year, newest.month, 1))
+        op.execute(
+            f"CREATE TABLE {table}_archive PARTITION OF {table} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{month}')"
+        )
+        while month <= last:
+            upper = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{month.year:04d}_{month.month:02d} "
+                f"PARTITION OF {table} FOR VALUES FROM ('{month}') TO ('{upper}')"
+            )
+            month = upper
+
+        op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+        op.execute(f'DROP TABLE {old}')
+
+        op.create_primary_key(f'{table}_pkey', table, ['id', key])
+        op.create_foreign_key(f'{table}_user_id_fkey', table, 'users', ['user_id'], ['id'])
+        for name, columns in indexes:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for table, (key, indexes) in TABLES.items():
+        old = f'{table}_partitioned'
+        op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)')
+        op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+        op.execute(f'DROP TABLE {old} CASCADE')  # And its partitions
+
+        op.create_primary_key(f'{table}_pkey', table, ['id'])
+        op.create_foreign_key(f'{table}_user_id_fkey', table, 'users', ['user_id'], ['id'])
+        for name, columns in indexes:
+            if columns[-1] != key:  # Indexes on the partition key came with this revision
+                op.create_index(name, table, columns)
@@ -0,0 +1,59 @@
+"""add cleanup_runs and cleanup_run_users tables
+
+Revision ID: b8d4f1a2e637
+Revises: a7c2e5f9b316
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4f1a2e637'
+down_revision: Union[str, None] = 'a7c2e5f9b316'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Weekly cleanup runs (coordinator progress)
+    op.create_table(
+        'cleanup_runs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('run_key', sa.String(), nullable=False, unique=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('cursor', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('dispatched_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+
+    # Per-user state within a run
+    op.create_table(
+        'cleanup_run_users',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            'run_id', postgresql.UUID(as_uuid=True),
+            sa.ForeignKey('cleanup_runs.id', ondelete='CASCADE'), nullable=False
+        ),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('run_id', 'user_id', name='uq_cleanup_run_users_run_user'),
+    )
+    op.create_index('ix_cleanup_run_users_run_status', 'cleanup_run_users', ['run_id', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cleanup_run_users_run_status', table_name='cleanup_run_users')
+    op.drop_table('cleanup_run_users')
+    op.drop_table('cleanup_runs')
@@ -0,0 +1,49 @@
+"""add users.calendar_timezone and timezone cohorts to cleanup_runs
+
+Revision ID: c4e7a9b2d851
+Revises: b8d4f1a2e637
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e7a9b2d851'
+down_revision: Union[str, None] = 'b8d4f1a2e637'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Cached Google Calendar timezone (cleanup cohorts, schedulers)
+    op.add_column('users', sa.Column('calendar_timezone', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('calendar_timezone_checked_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_users_calendar_timezone', 'users', ['calendar_timezone'])
+
+    # Runs are per local Sunday and fill up one timezone cohort at a time
+    op.add_column('cleanup_runs', sa.Column('week_start', sa.Date(), nullable=True))
+    op.execute("UPDATE cleanup_runs SET week_start = CAST(split_part(run_key, ':', 2) AS date)")
+    op.alter_column('cleanup_runs', 'week_start', nullable=False)
+    op.add_column(
+        'cleanup_runs',
+        sa.Column(
+            'timezones_dispatched', postgresql.JSONB(), nullable=False,
+            server_default=sa.text("'[]'::jsonb")
+        )
+    )
+    op.alter_column('cleanup_runs', 'timezones_dispatched', server_default=None)
+    op.drop_column('cleanup_runs', 'cursor')
+
+
+def downgrade() -> None:
+    op.add_column('cleanup_runs', sa.Column('cursor', postgresql.UUID(as_uuid=True), nullable=True))
+    op.drop_column('cleanup_runs', 'timezones_dispatched')
+    op.drop_column('cleanup_runs', 'week_start')
+
+    op.drop_index('ix_users_calendar_timezone', table_name='users')
+    op.drop_column('users', 'calendar_timezone_checked_at')
+    op.drop_column('users', 'calendar_timezone')
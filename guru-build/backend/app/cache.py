@@ -0,0 +1,304 @@
+"""Shared caching backends: Redis when available, in-process LRU otherwise."""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Same Redis instance Celery uses as its broker
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = "guru:"
+
+# How long to wait before retrying a Redis connection that failed
+REDIS_RETRY_SECONDS = 30
+
+_redis_client = None
+_redis_checked_at = 0.0
+_redis_lock = threading.Lock()
+
+
+def get_redis():
+    """Get the shared Redis client, or None if Redis is unreachable.
+
+    The connection is checked once and re-checked at most every
+    REDIS_RETRY_SECONDS, so callers can fall back to in-process caching
+    without paying a connect timeout on every call.
+    """
+    global _redis_client, _redis_checked_at
+
+    if _redis_client is not None:
+        return _redis_client
+    if time.monotonic() - _redis_checked_at < REDIS_RETRY_SECONDS and _redis_checked_at:
+        return None
+
+    with _redis_lock:
+        if _redis_client is not None:
+            return _redis_client
+        _redis_checked_at = time.monotonic()
+        try:
+            import redis
+
+            client = redis.Redis.from_url(
+                REDIS_URL,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5,
+                health_check_interval=30,
+            )
+            client.ping()
+            _redis_client = client
+            logger.info("Connected to Redis cache")
+        except Exception as e:
+            logger.warning(f"Redis unavailable, using in-process cache: {e}")
+            return None
+
+    return _redis_client
+
+
+class LocalTTLCache:
+    """Thread-safe in-process LRU cache with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SharedCache:
+    """JSON value cache for one namespace, shared across processes via Redis.
+
+    Falls back to a per-process LRU when Redis is unavailable. Values must be
+    JSON-serializable. TTLs are jittered so entries written together don't
+    all expire at once.
+    """
+
+    TTL_JITTER = 0.1  # Up to 10% of the TTL is shaved off at random
+
+    def __init__(self, namespace: str, default_ttl: float, local_maxsize: int = 1024):
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self._local = LocalTTLCache(local_maxsize)
+        # key -> [lock, callers holding or waiting for it]
+        self._local_locks: Dict[str, list] = {}
+        self._local_locks_guard = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"{CACHE_KEY_PREFIX}{self.namespace}:{key}"
+
+    def _jittered(self, ttl: float) -> float:
+        return max(1.0, ttl * (1 - random.uniform(0, self.TTL_JITTER)))
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None on miss."""
+        client = get_redis()
+        if client is not None:
+            try:
+                raw = client.get(self._key(key))
+                return json.loads(raw) if raw is not None else None
+            except Exception as e:
+                logger.warning(f"Redis get failed for {self.namespace}: {e}")
+        return self._local.get(self._key(key))
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value with a (jittered) TTL in seconds."""
+        ttl = self._jittered(ttl if ttl is not None else self.default_ttl)
+        client = get_redis()
+        if client is not None:
+            try:
+                client.set(self._key(key), json.dumps(value, default=str), px=int(ttl * 1000))
+                return
+            except Exception as e:
+                logger.warning(f"Redis set failed for {self.namespace}: {e}")
+        self._local.set(self._key(key), value, ttl)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store a value only if the key is absent (no jitter).
+
+        Useful as a cross-process "claim" flag, e.g. to dedupe background
+        refreshes.
+
+        Returns:
+            True if the value was stored, False if the key already existed
+        """
+        ttl = ttl if ttl is not None else self.default_ttl
+        client = get_redis()
+        if client is not None:
+            try:
+                return bool(client.set(
+                    self._key(key), json.dumps(value, default=str), nx=True, px=int(ttl * 1000)
+                ))
+            except Exception as e:
+                logger.warning(f"Redis add failed for {self.namespace}: {e}")
+        with self._local_locks_guard:
+            if self._local.get(self._key(key)) is not None:
+                return False
+            self._local.set(self._key(key), value, ttl)
+            return True
+
+    def delete(self, *keys: str) -> None:
+        """Remove one or more keys."""
+        if not keys:
+            return
+        full_keys = [self._key(k) for k in keys]
+        client = get_redis()
+        if client is not None:
+            try:
+                client.delete(*full_keys)
+            except Exception as e:
+                logger.warning(f"Redis delete failed for {self.namespace}: {e}")
+        for full_key in full_keys:
+            self._local.delete(full_key)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Tuple[Any, Optional[float]]],
+        lock_timeout: float = 30.0,
+        wait_timeout: float = 5.0,
+    ) -> Any:
+        """Get a value, computing it at most once across concurrent callers.
+
+        Stampede protection: the first caller to miss takes a short-lived lock
+        (Redis SET NX, or a per-key thread lock in-process) and computes; the
+        others wait for the value to appear instead of recomputing. If the
+        lock holder takes longer than wait_timeout, waiters compute themselves
+        rather than hang. When the holder's result isn't cached (empty, or
+        ttl 0), it is published briefly under the holder's lock token so the
+        waiters of that computation return it instead of waiting it out.
+
+        Args:
+            key: Cache key within this namespace
+            compute: Returns (value, ttl_seconds). A None/empty value or a
+                ttl of 0 is returned but not cached; ttl None uses default_ttl.
+            lock_timeout: Seconds before an abandoned compute lock expires
+            wait_timeout: Max seconds a waiter polls for the value
+
+        Returns:
+            The cached or freshly computed value
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        client = get_redis()
+        if client is not None:
+            return self._get_or_compute_redis(client, key, compute, lock_timeout, wait_timeout)
+        return self._get_or_compute_local(key, compute, wait_timeout)
+
+    def _store_computed(self, key: str, compute: Callable[[], Tuple[Any, Optional[float]]]) -> Any:
+        value, _ = self._compute_and_store(key, compute)
+        return value
+
+    def _compute_and_store(
+        self, key: str, compute: Callable[[], Tuple[Any, Optional[float]]]
+    ) -> Tuple[Any, bool]:
+        """Compute and cache a value; returns (value, whether it was cached)."""
+        value, ttl = compute()
+        cached = bool(value) and ttl != 0
+        if cached:
+            self.set(key, value, ttl)
+        return value, cached
+
+    def _get_or_compute_redis(self, client, key, compute, lock_timeout, wait_timeout) -> Any:
+        lock_key = self._key(f"lock:{key}")
+        token = uuid.uuid4().hex
+        try:
+            acquired = client.set(lock_key, token, nx=True, px=int(lock_timeout * 1000))
+        except Exception as e:
+            logger.warning(f"Redis lock failed for {self.namespace}: {e}")
+            return self._store_computed(key, compute)
+
+        result_key = self._key(f"uncached:{key}")
+        if acquired:
+            try:
+                value, cached = self._compute_and_store(key, compute)
+                if not cached:
+                    # Let this computation's waiters have the result too
+                    try:
+                        client.set(
+                            result_key,
+                            json.dumps({'token': token, 'value': value}, default=str),
+                            px=int(wait_timeout * 1000),
+                        )
+                    except Exception:
+                        pass
+                return value
+            finally:
+                try:
+                    if client.get(lock_key) == token.encode():
+                        client.delete(lock_key)
+                except Exception:
+                    pass
+
+        try:
+            holder = client.get(lock_key)
+        except Exception:
+            holder = None
+        deadline = time.monotonic() + wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = self.get(key)
+            if value is not None:
+                return value
+            if holder is not None:
+                try:
+                    raw = client.get(result_key)
+                    published = json.loads(raw) if raw is not None else None
+                except Exception:
+                    published = None
+                if published and published['token'].encode() == holder:
+                    return published['value']
+        return self._store_computed(key, compute)
+
+    def _get_or_compute_local(self, key, compute, wait_timeout) -> Any:
+        # The lock is shared until every caller holding or waiting for it is
+        # done, so a newcomer never gets a fresh lock while others still wait
+        with self._local_locks_guard:
+            entry = self._local_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        lock = entry[0]
+
+        try:
+            if not lock.acquire(timeout=wait_timeout):
+                return self._store_computed(key, compute)
+            try:
+                value = self.get(key)
+                if value is not None:
+                    return value
+                return self._store_computed(key, compute)
+            finally:
+                lock.release()
+        finally:
+            with self._local_locks_guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    self._local_locks.pop(key, None)
@@ -3,6 +3,7 @@
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_ready
 
 # Get Redis URL from environment
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -12,7 +13,11 @@ celery_app = Celery(
     "guru_app",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["app.tasks.weekly_cleanup"]
+    include=[
+        "app.tasks.weekly_cleanup",
+        "app.tasks.podcast_features",
+        "app.tasks.recommendations",
+    ]
 )
 
 # Celery configuration
@@ -25,16 +30,84 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes max
     result_expires=3600,  # Results expire after 1 hour
+    # Per-user weekly cleanup tasks get their own queue so a cleanup run
+    # can't starve the periodic tasks
+    task_routes={
+        "app.tasks.weekly_cleanup.cleanup_user": {"queue": "weekly_cleanup"},
+    },
 )
 
 # Celery Beat schedule - runs tasks at specific times
 celery_app.conf.beat_schedule = {
-    # Run weekly cleanup every Sunday at midnight UTC
-    "weekly-cleanup-and-reschedule": {
-        "task": "app.tasks.weekly_cleanup.cleanup_and_reschedule_tasks",
-        "schedule": crontab(hour=0, minute=0, day_of_week=0),  # Sunday at 00:00 UTC
+    # Add users whose local Sunday midnight has passed to the weekly cleanup
+    # (hourly timezone cohorts, so the run spreads over the day)
+    "weekly-cleanup-cohorts": {
+        "task": "app.tasks.weekly_cleanup.dispatch_cleanup_cohorts",
+        "schedule": crontab(minute=0),  # Every hour on the hour
+    },
+    # Dispatch more users of unfinished cleanup runs (and resume crashed ones)
+    "resume-weekly-cleanup": {
+        "task": "app.tasks.weekly_cleanup.resume_weekly_cleanup",
+        "schedule": 60,  # Every minute
+    },
+    # Keep the shared trending-podcast cache warm (stale-while-revalidate)
+    "refresh-trending-podcasts": {
+        "task": "app.tasks.podcast_features.refresh_trending_podcasts",
+        "schedule": 5 * 60,  # Every 5 minutes
+    },
+    # Queue stale podcast features by staleness x demand
+    "plan-feature-refresh": {
+        "task": "app.tasks.podcast_features.plan_feature_refresh",
+        "schedule": 15 * 60,  # Every 15 minutes
+    },
+    # Refresh the most urgent queued podcast features in small batches
+    "refresh-stale-features": {
+        "task": "app.tasks.podcast_features.refresh_stale_features",
+        "schedule": 60,  # Every minute
+    },
+    # Write buffered listening progress (bounds unflushed progress)
+    "flush-listening-progress": {
+        "task": "app.tasks.recommendations.flush_listening_progress",
+        "schedule": float(os.getenv("LISTENING_PROGRESS_FLUSH_SECONDS", "15")) or 15.0,
+    },
+    # Fold new and changed listening sessions into the daily rollups
+    "roll-up-listening-sessions": {
+        "task": "app.tasks.recommendations.roll_up_listening_sessions",
+        "schedule": 5 * 60,  # Every 5 minutes
+    },
+    # Keep future monthly partitions of the event tables ready
+    "maintain-partitions": {
+        "task": "app.tasks.recommendations.maintain_partitions",
+        "schedule": crontab(hour=1, minute=0),  # Daily at 01:00 UTC
+    },
+    # Drop listening session partitions past retention (already rolled up)
+    "purge-listening-sessions": {
+        "task": "app.tasks.recommendations.purge_listening_sessions",
+        "schedule": crontab(hour=1, minute=30),  # Daily at 01:30 UTC
+    },
+    # Rebuild item-item collaborative filtering neighbours ahead of precompute
+    "nightly-podcast-neighbors": {
+        "task": "app.tasks.recommendations.compute_podcast_neighbors",
+        "schedule": crontab(hour=2, minute=15),  # Daily at 02:15 UTC
+    },
+    # Precompute recommendations for active users every night
+    "nightly-recommendation-precompute": {
+        "task": "app.tasks.recommendations.precompute_recommendations",
+        "schedule": crontab(hour=3, minute=0),  # Daily at 03:00 UTC
     },
 }
 
-# Optional: Add additional schedules for different timezones
-# Users can configure their timezone in preferences, and we'll handle it in the task
+
+@worker_process_init.connect
+def warm_up_worker_process(**kwargs):
+    """Load the shared embedding model once per worker process."""
+    if os.getenv("EMBEDDING_MODEL_PRELOAD", "true").lower() == "true":
+        from app.services.embedding_model import warm_up_embedding_model
+        warm_up_embedding_model()
+
+
+@worker_ready.connect
+def warm_up_shared_caches(sender=None, **kwargs):
+    """Pre-populate shared caches once when a worker comes up."""
+    sender.app.send_task("app.tasks.podcast_features.refresh_trending_podcasts")
+
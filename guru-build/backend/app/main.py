@@ -10,6 +10,7 @@ env_path = backend_dir / ".env"
 load_dotenv(dotenv_path=env_path)
 
 import os
+import asyncio
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -96,6 +97,31 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Error ensuring journal_entries table: {e}", exc_info=True)
 
+    # Pre-load the shared embedding model off the event loop so the first
+    # recommendation request doesn't pay the model load
+    if os.getenv("EMBEDDING_MODEL_PRELOAD", "true").lower() == "true":
+        from app.services.embedding_model import warm_up_embedding_model
+
+        asyncio.get_running_loop().run_in_executor(None, warm_up_embedding_model)
+
+    # Pre-populate the shared trending cache so no request waits on upstream
+    from app.services.trending_cache import refresh_known_trending
+
+    asyncio.get_running_loop().run_in_executor(None, refresh_known_trending)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered listening progress before the process exits."""
+    from app.services.listening_progress import listening_progress_buffer
+
+    if listening_progress_buffer.enabled:
+        flushed = await asyncio.get_running_loop().run_in_executor(
+            None, listening_progress_buffer.flush_with_new_session
+        )
+        logger.info(f"Flushed progress for {flushed} listening sessions on shutdown")
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -156,11 +182,25 @@ async def debug_users():
         db.close()
 
 
+@app.get("/admin/metrics")
+async def get_metrics():
+    """Process-level performance metrics for this web worker."""
+    from app.services.embedding_model import get_embedding_model
+    from app.services.listening_progress import listening_progress_buffer
+    from app.services.profile_updates import profile_update_queue
+
+    return {
+        "embedding_model": get_embedding_model().metrics(),
+        "listening_progress": listening_progress_buffer.metrics(),
+        "profile_updates": profile_update_queue.metrics(),
+    }
+
+
 @app.post("/admin/trigger-weekly-cleanup")
 async def trigger_weekly_cleanup_manually():
     """
     Manual trigger for weekly cleanup task (for testing).
-    In production, this runs automatically every Sunday at midnight.
+    In production, this runs automatically at each user's local Sunday midnight.
     """
     from app.tasks.weekly_cleanup import cleanup_and_reschedule_tasks
 
@@ -18,12 +18,18 @@ from .schedule_agent import ScheduleSuggestion, TaskCompletionFeedback, Schedule
 from .journal_entry import JournalEntry
 from .list_item import ListItem
 from .saved_media import SavedPodcast, SavedEpisode
+from .cleanup_run import CleanupRun, CleanupRunUser
 from .podcast_recommendation import (
     ListeningSession,
     PodcastInteraction,
     PodcastFeatures,
+    EpisodeFeatures,
     UserPodcastProfile,
     RecommendationCache,
+    PodcastNeighbors,
+    IngestedEvent,
+    ListeningDailyRollup,
+    JobWatermark,
     InteractionType,
 )
 
@@ -49,10 +55,17 @@ __all__ = [
     "ListItem",
     "SavedPodcast",
     "SavedEpisode",
+    "CleanupRun",
+    "CleanupRunUser",
     "ListeningSession",
     "PodcastInteraction",
     "PodcastFeatures",
+    "EpisodeFeatures",
     "UserPodcastProfile",
     "RecommendationCache",
+    "PodcastNeighbors",
+    "IngestedEvent",
+    "ListeningDailyRollup",
+    "JobWatermark",
     "InteractionType",
 ]
@@ -0,0 +1,43 @@
+"""Progress tracking for the sharded weekly cleanup."""
+
+from sqlalchemy import Column, String, Integer, Date, DateTime, Text, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from .base import BaseModel
+
+
+class CleanupRun(BaseModel):
+    """One weekly cleanup run.
+
+    A run covers one local Sunday. Users join it in hourly timezone cohorts
+    as their local Sunday midnight passes; `timezones_dispatched` records
+    the cohorts already added, so a missed or crashed tick is caught up on
+    the next one instead of starting over.
+    """
+
+    __tablename__ = "cleanup_runs"
+
+    run_key = Column(String, unique=True, nullable=False)  # e.g. weekly:2026-10-18, manual:2026-10-21
+    week_start = Column(Date, nullable=False)  # The Sunday the run is for (a manual run's day)
+    status = Column(String, nullable=False, default="dispatching")  # dispatching, dispatched, completed
+    timezones_dispatched = Column(JSONB, nullable=False, default=list)  # Cohorts added so far
+    started_at = Column(DateTime, nullable=False)
+    dispatched_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+
+class CleanupRunUser(BaseModel):
+    """Per-user state within a cleanup run (one per user in a dispatched cohort)."""
+
+    __tablename__ = "cleanup_run_users"
+
+    run_id = Column(UUID(as_uuid=True), ForeignKey("cleanup_runs.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, queued, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('run_id', 'user_id', name='uq_cleanup_run_users_run_user'),
+        Index('ix_cleanup_run_users_run_status', 'run_id', 'status'),
+    )
@@ -1,7 +1,7 @@
 """Podcast recommendation ML models for personalized suggestions."""
 
 import enum
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, Enum, Index
+from sqlalchemy import Column, String, Integer, Float, Boolean, Date, DateTime, Text, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -29,6 +29,9 @@ class ListeningSession(BaseModel):
     - completion_rate: How much of the episode was listened to
     - seek_backward_count: Rewinding = engagement signal
     - pause_count: Many pauses might indicate distraction or difficulty
+
+    Range-partitioned by month on started_at (see app.services.partitions),
+    so started_at is part of the primary key.
     """
 
     __tablename__ = "listening_sessions"
@@ -38,7 +41,7 @@ class ListeningSession(BaseModel):
     podcast_external_id = Column(String, nullable=False)  # Podcast Index feed ID
 
     # Session timing
-    started_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, primary_key=True, nullable=False)  # Partition key
     ended_at = Column(DateTime, nullable=True)
 
     # Playback metrics
@@ -62,6 +65,9 @@ class ListeningSession(BaseModel):
     __table_args__ = (
         Index('ix_listening_sessions_user_podcast', 'user_id', 'podcast_external_id'),
         Index('ix_listening_sessions_user_episode', 'user_id', 'episode_external_id'),
+        Index('ix_listening_sessions_updated_at', 'updated_at'),  # Rollup watermark scans
+        Index('ix_listening_sessions_user_started', 'user_id', 'started_at'),  # Recent history
+        {'postgresql_partition_by': 'RANGE (started_at)'},
     )
 
 
@@ -72,6 +78,9 @@ class PodcastInteraction(BaseModel):
     - like/dislike: Strong preference signals
     - save/unsave: Interest signals
     - share: Strong positive signal
+
+    Range-partitioned by month on interaction_timestamp (see
+    app.services.partitions), so the timestamp is part of the primary key.
     """
 
     __tablename__ = "podcast_interactions"
@@ -81,7 +90,7 @@ class PodcastInteraction(BaseModel):
     episode_external_id = Column(String, nullable=True)  # Null for podcast-level interactions
 
     interaction_type = Column(Enum(InteractionType), nullable=False)
-    interaction_timestamp = Column(DateTime, nullable=False)
+    interaction_timestamp = Column(DateTime, primary_key=True, nullable=False)  # Partition key
 
     # Additional context
     extra_data = Column(JSONB, nullable=True)  # For flexible additional data
@@ -91,6 +100,8 @@ class PodcastInteraction(BaseModel):
     __table_args__ = (
         Index('ix_podcast_interactions_user_type', 'user_id', 'interaction_type'),
         Index('ix_podcast_interactions_podcast', 'podcast_external_id'),
+        Index('ix_podcast_interactions_user_timestamp', 'user_id', 'interaction_timestamp'),
+        {'postgresql_partition_by': 'RANGE (interaction_timestamp)'},
     )
 
 
@@ -133,6 +144,40 @@ class PodcastFeatures(BaseModel):
     )
 
 
+class EpisodeFeatures(BaseModel):
+    """Cached feature vectors for individual episodes.
+
+    Populated from the episodes/byfeedid responses fetched during podcast
+    feature extraction, so episode ranking never calls the API:
+    - title_embedding / description_embedding: sentence-transformer (384 dims)
+    - duration_seconds: used to fit episodes into a listening window
+    """
+
+    __tablename__ = "episode_features"
+
+    external_id = Column(String, unique=True, nullable=False, index=True)  # Podcast Index episode ID
+    podcast_external_id = Column(String, nullable=False)  # Podcast Index feed ID
+
+    # Basic metadata (cached from API)
+    title = Column(String)
+    description = Column(Text)
+    image = Column(String)  # Episode image URL (falls back to feed image)
+    enclosure_url = Column(String)  # Audio URL
+    published_at = Column(DateTime)
+    duration_seconds = Column(Integer)
+
+    # Extracted features
+    title_embedding = Column(ARRAY(Float))  # Sentence-transformer embedding (384 dims)
+    description_embedding = Column(ARRAY(Float))  # Sentence-transformer embedding (384 dims)
+
+    features_computed_at = Column(DateTime)
+
+    __table_args__ = (
+        # Per-show episode index: a show's episodes, newest first
+        Index('ix_episode_features_podcast_published', 'podcast_external_id', 'published_at'),
+    )
+
+
 class UserPodcastProfile(BaseModel):
     """User's learned podcast preference profile.
 
@@ -168,7 +213,7 @@ class RecommendationCache(BaseModel):
     """Cached recommendations for users.
 
     Pre-computed recommendations to avoid real-time computation:
-    - Refreshed periodically by background jobs
+    - Refreshed nightly by app.tasks.recommendations.precompute_recommendations
     - Expires after a set time to ensure freshness
     """
 
@@ -195,4 +240,96 @@ class RecommendationCache(BaseModel):
     __table_args__ = (
         Index('ix_recommendation_cache_user_expires', 'user_id', 'expires_at'),
         Index('ix_recommendation_cache_user_context', 'user_id', 'context'),
+        # Podcast-scoped invalidation across users (podcast_ids @> / && ARRAY[...])
+        Index('ix_recommendation_cache_podcast_ids', 'podcast_ids', postgresql_using='gin'),
+    )
+
+
+class PodcastNeighbors(BaseModel):
+    """Item-item collaborative filtering neighbours for a podcast.
+
+    Top-N most similar podcasts by co-listening (cosine over the user x podcast
+    interaction matrix), recomputed in batch by
+    app.tasks.recommendations.compute_podcast_neighbors.
+    """
+
+    __tablename__ = "podcast_neighbors"
+
+    external_id = Column(String, unique=True, nullable=False, index=True)  # Podcast Index ID
+
+    neighbor_ids = Column(ARRAY(String))  # Most similar podcasts, best first
+    neighbor_scores = Column(ARRAY(Float))  # Corresponding cosine similarities
+
+    support = Column(Integer)  # Users who interacted with this podcast
+    computed_at = Column(DateTime)
+
+
+class IngestedEvent(BaseModel):
+    """Idempotency record for events received through batch ingestion.
+
+    One row per (user, client idempotency key); a retried batch finds its
+    keys here and is not applied twice. For session start events,
+    result_id is the ListeningSession created, so later events can refer
+    to the session by the start event's key.
+    """
+
+    __tablename__ = "ingested_events"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    idempotency_key = Column(String, nullable=False)  # Client-generated
+    event_type = Column(String, nullable=False)
+    result_id = Column(UUID(as_uuid=True), nullable=True)  # Created row (session starts)
+    client_timestamp = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'idempotency_key', name='uq_ingested_events_user_key'),
+    )
+
+
+class ListeningDailyRollup(BaseModel):
+    """Per-user, per-podcast, per-day aggregate of listening sessions.
+
+    Maintained incrementally from listening_sessions (see
+    app.services.listening_rollups), so profile building and history
+    summaries don't scan raw sessions, which are only kept for a
+    retention window. A session counts toward the day it started (UTC).
+
+    The engaged_* columns aggregate sessions at or above the profile's
+    completion threshold; engagement_weight is the sum of their
+    completion x (1 + 0.1 x rewinds).
+    """
+
+    __tablename__ = "listening_daily_rollups"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    podcast_external_id = Column(String, nullable=False)
+    day = Column(Date, nullable=False)
+
+    session_count = Column(Integer, nullable=False, default=0)
+    ended_session_count = Column(Integer, nullable=False, default=0)
+    listened_seconds = Column(Integer, nullable=False, default=0)
+    max_completion = Column(Float, nullable=False, default=0.0)
+    pause_count = Column(Integer, nullable=False, default=0)
+    seek_forward_count = Column(Integer, nullable=False, default=0)
+    seek_backward_count = Column(Integer, nullable=False, default=0)
+
+    engaged_session_count = Column(Integer, nullable=False, default=0)
+    engaged_listened_seconds = Column(Integer, nullable=False, default=0)
+    engagement_weight = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'podcast_external_id', 'day', name='uq_listening_daily_rollups_key'),
+        Index('ix_listening_daily_rollups_user_day', 'user_id', 'day'),
     )
+
+
+class JobWatermark(BaseModel):
+    """High-water mark of an incremental background job.
+
+    Rows updated after `watermark` have not been processed yet.
+    """
+
+    __tablename__ = "job_watermarks"
+
+    name = Column(String, unique=True, nullable=False)
+    watermark = Column(DateTime, nullable=False)
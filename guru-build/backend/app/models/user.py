@@ -1,6 +1,6 @@
 """User model."""
 
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, DateTime
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -14,6 +14,8 @@ class User(BaseModel):
     email = Column(String, unique=True, nullable=False, index=True)
     google_tokens = Column(JSONB)  # Encrypted OAuth tokens
     preferences_json = Column(JSONB)  # User preferences and settings
+    calendar_timezone = Column(String, nullable=True, index=True)  # Cached Google Calendar timezone (IANA name)
+    calendar_timezone_checked_at = Column(DateTime, nullable=True)
 
     # Relationships
     tasks = relationship("Task", back_populates="user", cascade="all, delete-orphan")
@@ -6,6 +6,7 @@ from app.database import get_db
 from app.models.saved_media import SavedPodcast, SavedEpisode
 from app.models.user import User
 from app.schemas.saved_media import SavedPodcastCreate, SavedPodcastResponse, SavedEpisodeCreate, SavedEpisodeResponse
+from app.services.interaction_state import interaction_state
 
 router = APIRouter(tags=["library"])
 
@@ -38,6 +39,7 @@ def save_podcast(podcast: SavedPodcastCreate, db: Session = Depends(get_db), cur
     db.add(db_podcast)
     db.commit()
     db.refresh(db_podcast)
+    interaction_state.add(current_user.id, 'saved', [db_podcast.external_id])
     return db_podcast
 
 @router.get("/podcasts/{podcast_id}/episodes", response_model=List[SavedEpisodeResponse])
@@ -69,8 +71,10 @@ def remove_podcast(podcast_id: str, db: Session = Depends(get_db), current_user:
     if not db_podcast:
         raise HTTPException(status_code=404, detail="Podcast not found")
     
+    external_id = db_podcast.external_id
     db.delete(db_podcast)
     db.commit()
+    interaction_state.remove(current_user.id, 'saved', [external_id])
     return {"message": "Podcast removed"}
 
 @router.get("/episodes", response_model=List[SavedEpisodeResponse])
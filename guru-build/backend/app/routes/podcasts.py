@@ -3,19 +3,15 @@
 from fastapi import APIRouter, HTTPException, status, Query
 from pydantic import BaseModel
 from typing import List, Optional
-import os
-import hashlib
-import time
-import requests
+from app.services.podcast_index_client import (
+    PodcastIndexError,
+    PodcastIndexNotConfigured,
+    get_podcast_index_client,
+)
+from app.services.trending_cache import get_trending_feeds
 
 router = APIRouter()
 
-# Podcast Index API configuration
-PODCAST_INDEX_API_KEY = os.getenv('PODCAST_INDEX_API_KEY')
-PODCAST_INDEX_API_SECRET = os.getenv('PODCAST_INDEX_API_SECRET')
-PODCAST_INDEX_BASE_URL = 'https://api.podcastindex.org/api/1.0'
-
-
 def fix_image_url(url: str) -> str:
     """
     Convert HTTP image URLs to HTTPS for mobile app compatibility.
@@ -35,33 +31,29 @@ def fix_image_url(url: str) -> str:
     return url
 
 
-def get_podcast_index_headers():
+def podcast_index_get(endpoint: str, params: Optional[dict], failure_message: str) -> dict:
     """
-    Generate authentication headers for Podcast Index API
-    Uses API key and secret with timestamp-based hash
+    Call the shared Podcast Index client, mapping failures to HTTP errors
+
+    Blocks (rate limiting, retry backoff, waiting on a coalesced request),
+    so the routes calling it are plain def and run in the threadpool.
     """
-    if not PODCAST_INDEX_API_KEY or not PODCAST_INDEX_API_SECRET:
+    try:
+        return get_podcast_index_client().get(endpoint, params)
+    except PodcastIndexNotConfigured:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Podcast Index API credentials not configured"
         )
-
-    api_header_time = str(int(time.time()))
-
-    # Create hash using API key, secret, and timestamp
-    data_to_hash = PODCAST_INDEX_API_KEY + PODCAST_INDEX_API_SECRET + api_header_time
-    sha_1_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()
-
-    return {
-        'X-Auth-Date': api_header_time,
-        'X-Auth-Key': PODCAST_INDEX_API_KEY,
-        'Authorization': sha_1_hash,
-        'User-Agent': 'GuruApp/1.0'
-    }
+    except PodcastIndexError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{failure_message}: {e.detail}"
+        )
 
 
 @router.get("/search")
-async def search_podcasts(
+def search_podcasts(
     q: str = Query(..., description="Search query"),
     limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
     lang: Optional[str] = Query("en", description="Filter by language (e.g. 'en')")
@@ -74,20 +66,12 @@ async def search_podcasts(
         if lang:
             params['lang'] = lang
 
-        response = requests.get(
-            f"{PODCAST_INDEX_BASE_URL}/search/byterm",
-            headers=get_podcast_index_headers(),
-            params=params
+        data = podcast_index_get(
+            "search/byterm",
+            params,
+            "Failed to search podcasts"
         )
 
-        if not response.ok:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to search podcasts: {response.text}"
-            )
-
-        data = response.json()
-
         # Transform to match our frontend format
         podcasts = []
         for feed in data.get('feeds', []):
@@ -119,38 +103,30 @@ async def search_podcasts(
 
 
 @router.get("/trending")
-async def get_trending_podcasts(
+def get_trending_podcasts(
     limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
     category: Optional[str] = Query(None, description="Filter by category"),
     lang: Optional[str] = Query("en", description="Filter by language (e.g. 'en')")
 ):
     """
     Get trending podcasts
+
+    Served from the shared trending cache (stale-while-revalidate), so
+    requests don't wait on the Podcast Index API. A plain def (run in the
+    threadpool): a cold key blocks while another worker fetches it.
     """
     try:
-        params = {'max': limit}
-        if category:
-            params['cat'] = category
-        if lang:
-            params['lang'] = lang
-
-        response = requests.get(
-            f"{PODCAST_INDEX_BASE_URL}/podcasts/trending",
-            headers=get_podcast_index_headers(),
-            params=params
-        )
+        feeds = get_trending_feeds(category=category, lang=lang, limit=limit)
 
-        if not response.ok:
+        if feeds is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to fetch trending podcasts: {response.text}"
+                detail="Failed to fetch trending podcasts"
             )
 
-        data = response.json()
-
         # Transform to match our frontend format
         podcasts = []
-        for feed in data.get('feeds', []):
+        for feed in feeds:
             podcasts.append({
                 'id': str(feed.get('id')),
                 'name': feed.get('title', ''),
@@ -167,7 +143,7 @@ async def get_trending_podcasts(
 
         return {
             'feeds': podcasts,
-            'count': data.get('count', 0)
+            'count': len(podcasts)
         }
 
     except HTTPException:
@@ -180,24 +156,16 @@ async def get_trending_podcasts(
 
 
 @router.get("/podcast/{podcast_id}")
-async def get_podcast_by_id(podcast_id: str):
+def get_podcast_by_id(podcast_id: str):
     """
     Get a specific podcast by ID
     """
     try:
-        response = requests.get(
-            f"{PODCAST_INDEX_BASE_URL}/podcasts/byfeedid",
-            headers=get_podcast_index_headers(),
-            params={'id': podcast_id}
+        data = podcast_index_get(
+            "podcasts/byfeedid",
+            {'id': podcast_id},
+            "Failed to fetch podcast"
         )
-
-        if not response.ok:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to fetch podcast: {response.text}"
-            )
-
-        data = response.json()
         feed = data.get('feed', {})
 
         if not feed:
@@ -229,7 +197,7 @@ async def get_podcast_by_id(podcast_id: str):
 
 
 @router.get("/podcast/{podcast_id}/episodes")
-async def get_podcast_episodes(
+def get_podcast_episodes(
     podcast_id: str,
     limit: int = Query(50, ge=1, le=1000, description="Number of episodes to return")
 ):
@@ -237,20 +205,12 @@ async def get_podcast_episodes(
     Get episodes from a specific podcast
     """
     try:
-        response = requests.get(
-            f"{PODCAST_INDEX_BASE_URL}/episodes/byfeedid",
-            headers=get_podcast_index_headers(),
-            params={'id': podcast_id, 'max': limit}
+        data = podcast_index_get(
+            "episodes/byfeedid",
+            {'id': podcast_id, 'max': limit},
+            "Failed to fetch episodes"
         )
 
-        if not response.ok:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to fetch episodes: {response.text}"
-            )
-
-        data = response.json()
-
         # Transform to match our frontend format
         episodes = []
         for item in data.get('items', []):
@@ -282,23 +242,16 @@ async def get_podcast_episodes(
 
 
 @router.get("/categories")
-async def get_categories():
+def get_categories():
     """
     Get all podcast categories
     """
     try:
-        response = requests.get(
-            f"{PODCAST_INDEX_BASE_URL}/categories/list",
-            headers=get_podcast_index_headers()
+        data = podcast_index_get(
+            "categories/list",
+            None,
+            "Failed to fetch categories"
         )
-
-        if not response.ok:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to fetch categories: {response.text}"
-            )
-
-        data = response.json()
         return {
             'feeds': data.get('feeds', []),
             'count': data.get('count', 0)
@@ -314,7 +267,7 @@ async def get_categories():
 
 
 @router.get("/recent")
-async def get_recent_episodes(
+def get_recent_episodes(
     limit: int = Query(20, ge=1, le=1000, description="Number of episodes to return"),
     category: Optional[str] = Query(None, description="Filter by category")
 ):
@@ -324,20 +277,12 @@ async def get_recent_episodes(
     try:
         params = {'max': limit}
 
-        response = requests.get(
-            f"{PODCAST_INDEX_BASE_URL}/recent/episodes",
-            headers=get_podcast_index_headers(),
-            params=params
+        data = podcast_index_get(
+            "recent/episodes",
+            params,
+            "Failed to fetch recent episodes"
         )
 
-        if not response.ok:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Failed to fetch recent episodes: {response.text}"
-            )
-
-        data = response.json()
-
         # Transform to match our frontend format
         episodes = []
         for item in data.get('items', []):
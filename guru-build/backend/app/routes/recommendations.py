@@ -8,12 +8,14 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models.user import User
-from app.models.podcast_recommendation import InteractionType, UserPodcastProfile
+from app.models.podcast_recommendation import InteractionType, PodcastFeatures, UserPodcastProfile
 from app.services.recommendation_service import RecommendationService
 from app.services.event_tracking_service import EventTrackingService
 from app.services.feature_extraction_service import FeatureExtractionService
+from app.services.feature_refresh import is_stale, request_feature_refresh
+from app.services.profile_updates import schedule_profile_update
 from app.schemas.recommendation import (
     StartSessionRequest,
     StartSessionResponse,
@@ -22,10 +24,16 @@ from app.schemas.recommendation import (
     EndSessionResponse,
     InteractionRequest,
     InteractionResponse,
+    PlaybackEventBatchRequest,
+    PlaybackEventBatchResponse,
     PodcastRecommendation,
     RecommendationsResponse,
+    EpisodeRecommendation,
+    EpisodeRecommendationsResponse,
     UserProfileResponse,
     ListeningSessionResponse,
+    ListeningSummaryItem,
+    ListeningSummaryResponse,
     InteractionHistoryItem,
     InteractionHistoryResponse,
 )
@@ -51,7 +59,7 @@ def get_current_user(db: Session = Depends(get_db)) -> User:
 # === Recommendation Endpoints ===
 
 @router.get("/podcasts", response_model=RecommendationsResponse)
-async def get_recommendations(
+def get_recommendations(
     limit: int = Query(20, ge=1, le=50, description="Number of recommendations"),
     context: Optional[str] = Query(
         None,
@@ -70,6 +78,9 @@ async def get_recommendations(
     - Stated preferences (topics, genres)
 
     For new users, falls back to trending podcasts.
+
+    A plain def (run in the threadpool): on a cache miss the call may block
+    while another worker computes the same key.
     """
     service = RecommendationService(db, current_user)
     recommendations = service.get_recommendations(
@@ -97,6 +108,42 @@ async def get_recommendations(
     )
 
 
+@router.get("/episodes", response_model=EpisodeRecommendationsResponse)
+async def get_episode_recommendations(
+    limit: int = Query(10, ge=1, le=50, description="Number of episodes"),
+    context: Optional[str] = Query(
+        None,
+        description="Listening context: commute, chore, workout, relaxing"
+    ),
+    window_minutes: Optional[int] = Query(
+        None,
+        ge=1,
+        le=600,
+        description="Minutes available; defaults to your commute/chore duration"
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get episodes that fit a listening window (e.g. a commute or chore block).
+
+    Ranks the newest stored episodes of the user's best-matching podcasts by
+    show score, episode content, how well they fill the window, and recency.
+    Served entirely from stored features.
+    """
+    service = RecommendationService(db, current_user)
+    recommendations, window = service.get_episode_recommendations(
+        limit=limit,
+        context=context,
+        window_minutes=window_minutes
+    )
+
+    return EpisodeRecommendationsResponse(
+        recommendations=[EpisodeRecommendation(**r) for r in recommendations],
+        generated_at=datetime.utcnow(),
+        window_minutes=window,
+    )
+
+
 @router.post("/profile/refresh", response_model=UserProfileResponse)
 async def refresh_user_profile(
     db: Session = Depends(get_db),
@@ -193,10 +240,9 @@ async def start_listening_session(
         device_type='mobile'
     )
 
-    # Extract features for podcast in background
+    # Queue a feature refresh for the podcast if its features are missing or stale
     background_tasks.add_task(
-        extract_podcast_features_background,
-        db,
+        queue_podcast_features_background,
         request.podcast_id
     )
 
@@ -237,14 +283,13 @@ async def update_listening_session(
 @router.post("/listening/{session_id}/end", response_model=EndSessionResponse)
 async def end_listening_session(
     session_id: UUID,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """End a listening session.
 
     Call this when the user stops playing or the episode ends.
-    Triggers a profile update in the background.
+    Queues a debounced profile update.
     """
     service = EventTrackingService(db, current_user)
     session = service.end_listening_session(session_id)
@@ -252,12 +297,7 @@ async def end_listening_session(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Update user profile in background
-    background_tasks.add_task(
-        update_user_profile_background,
-        db,
-        current_user.id
-    )
+    schedule_profile_update(current_user.id)
 
     return EndSessionResponse(
         status="ended",
@@ -266,6 +306,39 @@ async def end_listening_session(
     )
 
 
+@router.post("/events/batch", response_model=PlaybackEventBatchResponse)
+async def ingest_playback_events(
+    request: PlaybackEventBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Ingest a batch of playback events, e.g. a log recorded while offline.
+
+    Each event carries a client-generated idempotency key, so a batch can be
+    retried safely: already ingested events are reported as duplicates.
+    Sessions started offline are referenced by their start event's key
+    (session_key). Invalid events are rejected individually; the rest of
+    the batch is applied in one transaction.
+    """
+    service = EventTrackingService(db, current_user)
+    outcome = service.ingest_events([event.model_dump() for event in request.events])
+
+    if outcome['disliked_podcast_ids']:
+        RecommendationService(db, current_user).invalidate_cache()
+
+    # One profile update per batch, not per event
+    if outcome['update_profile']:
+        schedule_profile_update(current_user.id)
+
+    results = outcome['results']
+    return PlaybackEventBatchResponse(
+        accepted=sum(1 for r in results if r['status'] == 'accepted'),
+        duplicates=sum(1 for r in results if r['status'] == 'duplicate'),
+        rejected=sum(1 for r in results if r['status'] == 'rejected'),
+        results=results,
+    )
+
+
 @router.get("/listening/history", response_model=list[ListeningSessionResponse])
 async def get_listening_history(
     limit: int = Query(20, ge=1, le=100),
@@ -297,12 +370,48 @@ async def get_listening_history(
     ]
 
 
+@router.get("/listening/summary", response_model=ListeningSummaryResponse)
+async def get_listening_summary(
+    days: int = Query(30, ge=0, le=3650, description="Days back to include (0 = all history)"),
+    podcast_id: Optional[str] = Query(None, description="Filter by podcast"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get per-podcast listening totals over a period.
+
+    Served from daily rollups, so it covers history beyond the raw
+    session retention window.
+    """
+    service = EventTrackingService(db, current_user)
+    rows = service.get_listening_summary(days=days, podcast_id=podcast_id)
+
+    podcasts = [
+        ListeningSummaryItem(
+            podcast_id=row['podcast_external_id'],
+            days_listened=row['days_listened'],
+            last_listened_on=row['last_listened_on'],
+            session_count=row['session_count'],
+            ended_session_count=row['ended_session_count'],
+            listened_minutes=round(row['listened_seconds'] / 60, 1),
+            max_completion=row['max_completion'],
+            pause_count=row['pause_count'],
+            seek_forward_count=row['seek_forward_count'],
+            seek_backward_count=row['seek_backward_count'],
+        )
+        for row in rows
+    ]
+    return ListeningSummaryResponse(
+        days=days,
+        total_listened_minutes=round(sum(p.listened_minutes for p in podcasts), 1),
+        podcasts=podcasts,
+    )
+
+
 # === Interaction Endpoints ===
 
 @router.post("/interaction", response_model=InteractionResponse)
 async def record_interaction(
     request: InteractionRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -336,13 +445,9 @@ async def record_interaction(
         rec_service = RecommendationService(db, current_user)
         rec_service.invalidate_cache(podcast_id=request.podcast_id)
 
-    # Update profile in background for important interactions
+    # Update profile (debounced) for important interactions
     if interaction_type in [InteractionType.like, InteractionType.dislike]:
-        background_tasks.add_task(
-            update_user_profile_background,
-            db,
-            current_user.id
-        )
+        schedule_profile_update(current_user.id)
 
     return InteractionResponse(
         status="recorded",
@@ -395,21 +500,24 @@ async def get_interaction_history(
 
 # === Background Task Functions ===
 
-def extract_podcast_features_background(db: Session, podcast_id: str):
-    """Background task to extract podcast features."""
-    try:
-        service = FeatureExtractionService(db)
-        service.extract_and_store_features(podcast_id)
-    except Exception as e:
-        logger.error(f"Error extracting features for podcast {podcast_id}: {e}")
-
+def queue_podcast_features_background(podcast_id: str):
+    """Background task to queue missing or stale podcast features for refresh.
 
-def update_user_profile_background(db: Session, user_id: UUID):
-    """Background task to update user profile."""
+    Runs after the response is sent, when the request's session may already
+    be closed, so it uses its own. The refresh itself runs on a Celery
+    worker (see app.services.feature_refresh).
+    """
+    db = SessionLocal()
     try:
-        user = db.query(User).filter_by(id=user_id).first()
-        if user:
-            service = RecommendationService(db, user)
-            service.update_user_profile()
+        features = db.query(PodcastFeatures.features_computed_at).filter_by(
+            external_id=podcast_id
+        ).first()
+        if features is None:
+            request_feature_refresh([podcast_id], missing=True)
+        elif is_stale(features.features_computed_at):
+            request_feature_refresh([podcast_id])
     except Exception as e:
-        logger.error(f"Error updating profile for user {user_id}: {e}")
+        logger.error(f"Error queueing feature refresh for podcast {podcast_id}: {e}")
+    finally:
+        db.close()
+
@@ -1,6 +1,6 @@
 """Pydantic schemas for podcast recommendation API."""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 from pydantic import BaseModel, Field
@@ -35,6 +35,37 @@ class InteractionRequest(BaseModel):
     )
 
 
+class PlaybackEvent(BaseModel):
+    """A single event from a (possibly offline) playback log."""
+    idempotency_key: str = Field(
+        ..., min_length=1, max_length=128,
+        description="Client-generated unique key; an event is applied at most once per key"
+    )
+    event_type: str = Field(
+        ...,
+        description="Session event (start, progress, pause, seek, end) or "
+                    "interaction (like, dislike, save, unsave, share, skip)"
+    )
+    timestamp: datetime = Field(..., description="When the event happened on the device")
+    podcast_id: Optional[str] = Field(None, description="External podcast ID (start and interactions)")
+    episode_id: Optional[str] = Field(None, description="External episode ID")
+    session_id: Optional[UUID] = Field(None, description="Server session ID for session events")
+    session_key: Optional[str] = Field(
+        None,
+        description="Idempotency key of the session's start event, for sessions started offline"
+    )
+    episode_duration_seconds: Optional[int] = Field(None, gt=0, description="Episode length (start)")
+    listened_duration_seconds: Optional[int] = Field(None, ge=0, description="Listened so far (progress, end)")
+    playback_speed: Optional[float] = Field(None, gt=0, le=3.0, description="Current playback speed")
+    direction: Optional[str] = Field(None, description="Seek direction: forward or backward")
+    context: Optional[str] = Field(None, description="Listening context: commute, chore, workout, relaxing")
+
+
+class PlaybackEventBatchRequest(BaseModel):
+    """Batch of playback events, e.g. a log recorded while offline."""
+    events: List[PlaybackEvent] = Field(..., min_length=1, max_length=500)
+
+
 # === Response Schemas ===
 
 class StartSessionResponse(BaseModel):
@@ -62,6 +93,22 @@ class InteractionResponse(BaseModel):
     interaction_id: UUID
 
 
+class PlaybackEventResult(BaseModel):
+    """Outcome of one event in a batch."""
+    idempotency_key: str
+    status: str = Field(..., description="accepted, duplicate or rejected")
+    error: Optional[str] = None
+    session_id: Optional[UUID] = Field(None, description="Session created or updated by the event")
+
+
+class PlaybackEventBatchResponse(BaseModel):
+    """Response after ingesting a batch of playback events."""
+    accepted: int
+    duplicates: int
+    rejected: int
+    results: List[PlaybackEventResult]
+
+
 class PodcastRecommendation(BaseModel):
     """A single podcast recommendation."""
     podcast_id: str = Field(..., description="External podcast ID")
@@ -89,6 +136,31 @@ class RecommendationsResponse(BaseModel):
     )
 
 
+class EpisodeRecommendation(BaseModel):
+    """A single episode recommendation."""
+    episode_id: str = Field(..., description="External episode ID")
+    podcast_id: str = Field(..., description="External podcast ID")
+    title: str = Field(default="", description="Episode title")
+    podcast_title: str = Field(default="", description="Podcast title")
+    description: Optional[str] = Field(default="", description="Episode description")
+    image: Optional[str] = Field(default="", description="Episode image URL")
+    audio_url: Optional[str] = Field(None, description="Episode audio URL")
+    duration_seconds: Optional[int] = Field(None, description="Episode length in seconds")
+    published_at: Optional[datetime] = Field(None, description="When the episode was published")
+    score: float = Field(..., ge=0, description="Recommendation score")
+    reason: str = Field(default="Recommended for you", description="Why this was recommended")
+
+
+class EpisodeRecommendationsResponse(BaseModel):
+    """Response containing episode recommendations."""
+    recommendations: List[EpisodeRecommendation]
+    generated_at: datetime
+    window_minutes: Optional[int] = Field(
+        None,
+        description="Listening window the episodes were fitted to"
+    )
+
+
 class UserProfileResponse(BaseModel):
     """Response containing user's recommendation profile."""
     has_profile: bool
@@ -115,6 +187,27 @@ class ListeningSessionResponse(BaseModel):
     context: Optional[str]
 
 
+class ListeningSummaryItem(BaseModel):
+    """Listening totals for one podcast."""
+    podcast_id: str
+    days_listened: int
+    last_listened_on: date
+    session_count: int
+    ended_session_count: int = Field(..., description="Sessions that were ended")
+    listened_minutes: float
+    max_completion: float
+    pause_count: int
+    seek_forward_count: int
+    seek_backward_count: int
+
+
+class ListeningSummaryResponse(BaseModel):
+    """Listening summary over a period, aggregated from daily rollups."""
+    days: int = Field(..., description="Period covered in days (0 = all history)")
+    total_listened_minutes: float
+    podcasts: List[ListeningSummaryItem]
+
+
 class InteractionHistoryItem(BaseModel):
     """A single interaction in history."""
     id: UUID
@@ -1,7 +1,7 @@
 """Google Calendar service for OAuth and event management."""
 
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
@@ -20,6 +20,9 @@ class CalendarService:
         'https://www.googleapis.com/auth/calendar.events'
     ]
 
+    # Requests per batch call (Google recommends at most 50)
+    DELETE_BATCH_SIZE = 50
+
     def __init__(self, tokens: Dict[str, Any], client_id: Optional[str] = None, client_secret: Optional[str] = None):
         """
         Initialize calendar service with OAuth tokens.
@@ -70,12 +73,13 @@ class CalendarService:
             logger.error(f"Error initializing calendar service: {e}", exc_info=True)
             raise
 
-    def get_calendar_timezone(self, calendar_id: str = 'primary') -> str:
+    def get_calendar_timezone(self, calendar_id: str = 'primary', default: Optional[str] = 'UTC') -> Optional[str]:
         """
         Get the timezone of a specific calendar.
 
         Args:
             calendar_id: Calendar ID (defaults to primary)
+            default: Returned when the calendar can't be fetched
 
         Returns:
             Timezone string (e.g., 'America/Los_Angeles', 'UTC')
@@ -91,7 +95,7 @@ class CalendarService:
             return timezone
         except Exception as e:
             logger.error(f"Error fetching calendar timezone: {e}")
-            return 'UTC'
+            return default
 
     def get_events(
         self,
@@ -156,11 +160,16 @@ class CalendarService:
         description: Optional[str] = None,
         location: Optional[str] = None,
         color_id: Optional[str] = None,
-        calendar_id: str = 'primary'
+        calendar_id: str = 'primary',
+        event_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create a new calendar event.
 
+        With an explicit event_id the call is idempotent: if an event with
+        that ID already exists (e.g. created by an earlier, failed attempt),
+        it is updated to match instead of creating a duplicate.
+
         Args:
             summary: Event title
             start_time: Event start time
@@ -169,6 +178,8 @@ class CalendarService:
             location: Event location (optional)
             color_id: Google Calendar color ID 1-11 (optional)
             calendar_id: Calendar ID (defaults to primary)
+            event_id: Event ID to create the event with (optional; base32hex
+                characters, 5-1024 long)
 
         Returns:
             Created event dictionary
@@ -208,6 +219,8 @@ class CalendarService:
                 event['location'] = location
             if color_id:
                 event['colorId'] = color_id
+            if event_id:
+                event['id'] = event_id
 
             logger.info(f"Event payload: {event}")
 
@@ -220,6 +233,18 @@ class CalendarService:
             return created_event
 
         except HttpError as error:
+            if event_id and error.resp.status == 409:
+                logger.info(f"Event {event_id} already exists, updating it instead")
+                return self.update_event(
+                    event_id,
+                    summary=summary,
+                    start_time=start_time,
+                    end_time=end_time,
+                    description=description,
+                    location=location,
+                    color_id=color_id,
+                    calendar_id=calendar_id,
+                )
             logger.error(f"HttpError creating event: {error}")
             logger.error(f"Event details - summary: '{summary}', start: {start_time}, end: {end_time}")
             raise
@@ -343,6 +368,49 @@ class CalendarService:
             logger.error(f"Error deleting event: {error}")
             raise
 
+    def delete_events(
+        self,
+        event_ids: List[str],
+        calendar_id: str = 'primary'
+    ) -> Set[str]:
+        """
+        Delete calendar events using batched API requests.
+
+        Sends up to DELETE_BATCH_SIZE deletes per HTTP request instead of one
+        request per event. Events that no longer exist (404/410) count as
+        deleted; other failures are logged and left out of the result.
+
+        Args:
+            event_ids: IDs of the events to delete
+            calendar_id: Calendar ID (defaults to primary)
+
+        Returns:
+            IDs of the events that are gone
+        """
+        deleted: Set[str] = set()
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                deleted.add(request_id)
+            elif isinstance(exception, HttpError) and exception.resp.status in (404, 410):
+                logger.info(f"Event {request_id} was already deleted, treating as success")
+                deleted.add(request_id)
+            else:
+                logger.error(f"Error deleting event {request_id}: {exception}")
+
+        unique_ids = list(dict.fromkeys(event_ids))
+        for i in range(0, len(unique_ids), self.DELETE_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for event_id in unique_ids[i:i + self.DELETE_BATCH_SIZE]:
+                batch.add(
+                    self.service.events().delete(calendarId=calendar_id, eventId=event_id),
+                    request_id=event_id
+                )
+            batch.execute()
+
+        logger.info(f"Deleted {len(deleted)} of {len(unique_ids)} events")
+        return deleted
+
     def get_available_slots(
         self,
         start_date: datetime,
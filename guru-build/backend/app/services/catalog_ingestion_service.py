@@ -0,0 +1,346 @@
+"""Bulk ingestion of the Podcast Index SQLite catalog dump into podcast_features."""
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import column, func, or_, select, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.podcast_recommendation import PodcastFeatures
+from app.services.feature_extraction_service import FeatureExtractionService
+
+logger = logging.getLogger(__name__)
+
+# Columns written for each ingested podcast (order matches the COPY stream)
+INGEST_COLUMNS = [
+    'id',
+    'external_id',
+    'title',
+    'author',
+    'description',
+    'artwork',
+    'language',
+    'categories',
+    'episode_count',
+    'category_vector',
+    'description_embedding',
+    'avg_episode_duration_seconds',
+    'update_frequency_days',
+    'popularity_score',
+    'last_fetched_at',
+    'features_computed_at',
+    'created_at',
+    'updated_at',
+]
+
+# Podcast Index popularityScore is a small integer rank; scale to 0-1
+DUMP_POPULARITY_SCALE = 30.0
+
+COPY_NULL = '\\N'
+STAGING_TABLE = 'tmp_podcast_features_ingest'
+
+
+class CatalogIngestionService:
+    """Streams the Podcast Index catalog dump (podcastindex_feeds.db) into
+    podcast_features without any per-podcast API calls.
+
+    Each chunk of dump rows is mapped to feature rows, embedded in batches
+    (only where the description changed), COPY-loaded into a temp table and
+    merged with one INSERT ... ON CONFLICT. A checkpoint file records the
+    last committed dump ID so an interrupted run resumes where it stopped;
+    re-running over the same rows is a no-op apart from refreshed metadata.
+    """
+
+    CHUNK_SIZE = int(os.getenv('CATALOG_INGEST_CHUNK_SIZE', '5000'))
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.features = FeatureExtractionService(db)
+
+    def ingest(
+        self,
+        dump_path: str,
+        checkpoint_path: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        language: Optional[str] = None,
+        limit: Optional[int] = None,
+        compute_embeddings: bool = True,
+        reset: bool = False
+    ) -> Dict[str, Any]:
+        """Ingest (or resume ingesting) a catalog dump.
+
+        Args:
+            dump_path: Path to the Podcast Index SQLite dump
+            checkpoint_path: Progress file (default: <dump_path>.checkpoint.json)
+            chunk_size: Dump rows per transaction (default CHUNK_SIZE)
+            language: Only ingest podcasts whose language starts with this code
+            limit: Stop after this many podcasts (for trial runs)
+            compute_embeddings: Embed new/changed descriptions
+            reset: Ignore any existing checkpoint and start from the beginning
+
+        Returns:
+            Dict with last_id, ingested, embedded and elapsed_seconds
+        """
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        checkpoint_path = checkpoint_path or f"{dump_path}.checkpoint.json"
+        signature = self._dump_signature(dump_path)
+        snapshot_at = datetime.utcfromtimestamp(os.path.getmtime(dump_path))
+
+        checkpoint = None if reset else self._load_checkpoint(checkpoint_path, signature)
+        last_id = checkpoint['last_id'] if checkpoint else 0
+        ingested = checkpoint['ingested'] if checkpoint else 0
+        embedded = 0
+        if checkpoint:
+            logger.info(f"Resuming catalog ingestion after dump id {last_id} ({ingested} done)")
+
+        started = time.monotonic()
+        run_ingested = 0
+        for dump_rows in self._read_dump(dump_path, last_id, chunk_size, language):
+            if limit is not None and run_ingested >= limit:
+                break
+            if limit is not None:
+                dump_rows = dump_rows[:limit - run_ingested]
+
+            rows = [self._build_row(r, snapshot_at) for r in dump_rows]
+            rows = [row for row in rows if row is not None]
+            if rows and compute_embeddings:
+                embedded += self._embed_changed(rows)
+            if rows:
+                self._copy_upsert(rows)
+            else:
+                self.db.commit()
+
+            last_id = dump_rows[-1]['id']
+            run_ingested += len(rows)
+            ingested += len(rows)
+            self._save_checkpoint(checkpoint_path, signature, last_id, ingested)
+
+            elapsed = time.monotonic() - started
+            logger.info(
+                f"Ingested catalog through dump id {last_id}: {ingested} podcasts total "
+                f"({run_ingested / elapsed if elapsed else 0.0:.0f} podcasts/s, {embedded} embedded)"
+            )
+
+        elapsed = time.monotonic() - started
+        return {
+            'last_id': last_id,
+            'ingested': ingested,
+            'embedded': embedded,
+            'elapsed_seconds': round(elapsed, 1),
+        }
+
+    # === Dump reading ===
+
+    def _read_dump(
+        self,
+        dump_path: str,
+        after_id: int,
+        chunk_size: int,
+        language: Optional[str]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield chunks of dump rows in id order (keyset pagination)."""
+        conn = sqlite3.connect(f"file:{dump_path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            available = {row[1] for row in conn.execute("PRAGMA table_info(podcasts)")}
+            filters = ["id > ?"]
+            params: List[Any] = []
+            if 'dead' in available:
+                filters.append("dead = 0")
+            if language and 'language' in available:
+                filters.append("lower(language) LIKE ?")
+                params.append(f"{language.lower()}%")
+
+            query = (
+                f"SELECT * FROM podcasts WHERE {' AND '.join(filters)} "
+                f"ORDER BY id LIMIT ?"
+            )
+            while True:
+                cursor = conn.execute(query, [after_id, *params, chunk_size])
+                chunk = [dict(row) for row in cursor.fetchall()]
+                if not chunk:
+                    return
+                yield chunk
+                after_id = chunk[-1]['id']
+        finally:
+            conn.close()
+
+    def _build_row(self, dump_row: Dict[str, Any], snapshot_at: datetime) -> Optional[Dict[str, Any]]:
+        """Map a dump `podcasts` row to a podcast_features row."""
+        if not dump_row.get('id') or not dump_row.get('title'):
+            return None
+
+        categories = {
+            str(i): dump_row[f'category{i}']
+            for i in range(1, 11)
+            if dump_row.get(f'category{i}')
+        }
+
+        episode_count = dump_row.get('episodeCount') or 0
+        newest = dump_row.get('newestItemPubdate') or 0
+        oldest = dump_row.get('oldestItemPubdate') or 0
+        update_frequency = None
+        if episode_count >= 2 and newest > oldest:
+            update_frequency = (newest - oldest) / (episode_count - 1) / 86400
+
+        popularity = dump_row.get('popularityScore') or 0
+        duration = dump_row.get('newestEnclosureDuration') or None
+
+        return {
+            'id': uuid.uuid4(),
+            'external_id': str(dump_row['id']),
+            'title': dump_row.get('title') or '',
+            'author': dump_row.get('itunesAuthor') or dump_row.get('itunesOwnerName') or '',
+            'description': dump_row.get('description') or '',
+            'artwork': self.features._fix_image_url(dump_row.get('imageUrl') or ''),
+            'language': dump_row.get('language') or 'en',
+            'categories': categories,
+            'episode_count': episode_count,
+            'category_vector': self.features._encode_categories(categories),
+            'description_embedding': None,
+            'avg_episode_duration_seconds': int(duration) if duration and duration > 0 else None,
+            'update_frequency_days': update_frequency,
+            'popularity_score': min(1.0, popularity / DUMP_POPULARITY_SCALE) if popularity else 0.0,
+            'last_fetched_at': snapshot_at,
+            'features_computed_at': datetime.utcnow(),
+            'created_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow(),
+        }
+
+    # === Embeddings ===
+
+    def _embed_changed(self, rows: List[Dict[str, Any]]) -> int:
+        """Embed rows that are new or whose description changed.
+
+        Rows whose stored description is identical and already embedded keep
+        their embedding (the upsert coalesces NULL), so re-runs are cheap.
+
+        Returns:
+            Number of rows sent to the model
+        """
+        stored = dict(
+            self.db.query(
+                PodcastFeatures.external_id,
+                func.md5(PodcastFeatures.description),
+            ).filter(
+                PodcastFeatures.external_id.in_([row['external_id'] for row in rows]),
+                PodcastFeatures.description_embedding.isnot(None),
+            ).all()
+        )
+
+        to_embed = [
+            row for row in rows
+            if row['description']
+            and stored.get(row['external_id']) != hashlib.md5(row['description'].encode()).hexdigest()
+        ]
+        self.features._embed_rows(to_embed)
+        return len(to_embed)
+
+    # === Loading ===
+
+    def _copy_upsert(self, rows: List[Dict[str, Any]]) -> None:
+        """COPY rows into a temp table and merge them in one statement.
+
+        Rows already refreshed from the live API since the dump snapshot are
+        left alone.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([self._copy_value(row[c]) for c in INGEST_COLUMNS])
+        buffer.seek(0)
+
+        target = PodcastFeatures.__table__
+        try:
+            self.db.execute(text(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+                f"(LIKE podcast_features INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            ))
+            cursor = self.db.connection().connection.cursor()
+            cursor.copy_expert(
+                f"COPY {STAGING_TABLE} ({', '.join(INGEST_COLUMNS)}) "
+                f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                buffer
+            )
+
+            staging = table(STAGING_TABLE, *[column(c) for c in INGEST_COLUMNS])
+            stmt = pg_insert(target).from_select(
+                INGEST_COLUMNS, select(*[staging.c[c] for c in INGEST_COLUMNS])
+            )
+            excluded = stmt.excluded
+            update_columns = {
+                c: excluded[c]
+                for c in INGEST_COLUMNS
+                if c not in ('id', 'external_id', 'created_at', 'description_embedding')
+            }
+            update_columns['description_embedding'] = func.coalesce(
+                excluded.description_embedding, target.c.description_embedding
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['external_id'],
+                set_=update_columns,
+                where=or_(
+                    target.c.last_fetched_at.is_(None),
+                    target.c.last_fetched_at <= excluded.last_fetched_at,
+                )
+            )
+            self.db.execute(stmt)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    @staticmethod
+    def _copy_value(value: Any) -> Any:
+        """Render a Python value as a COPY (CSV) field."""
+        if value is None:
+            return COPY_NULL
+        if isinstance(value, dict):
+            return json.dumps(value)
+        if isinstance(value, list):
+            return '{' + ','.join(repr(float(v)) for v in value) + '}'
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    # === Checkpointing ===
+
+    @staticmethod
+    def _dump_signature(dump_path: str) -> str:
+        """Identify a dump file so a new dump doesn't resume an old checkpoint."""
+        stat = os.stat(dump_path)
+        return f"{os.path.basename(dump_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+    @staticmethod
+    def _load_checkpoint(checkpoint_path: str, signature: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('dump_signature') != signature:
+            logger.info("Checkpoint belongs to a different dump, starting from the beginning")
+            return None
+        return checkpoint
+
+    @staticmethod
+    def _save_checkpoint(checkpoint_path: str, signature: str, last_id: int, ingested: int) -> None:
+        """Write the checkpoint atomically (after the chunk is committed)."""
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'dump_signature': signature,
+                'last_id': last_id,
+                'ingested': ingested,
+                'updated_at': datetime.utcnow().isoformat(),
+            }, f)
+        os.replace(tmp_path, checkpoint_path)
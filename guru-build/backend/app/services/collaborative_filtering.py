@@ -0,0 +1,273 @@
+"""Item-item collaborative filtering over listening and interaction data.
+
+Builds a sparse user x podcast matrix from listening_daily_rollups,
+podcast_interactions and saved_podcasts across all users, computes cosine
+similarity between podcast columns in blocks, and keeps the top-N
+neighbours per podcast in podcast_neighbors.
+"""
+
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.models.podcast_recommendation import (
+    InteractionType,
+    ListeningDailyRollup,
+    PodcastInteraction,
+    PodcastNeighbors,
+)
+from app.models.saved_media import SavedPodcast
+
+logger = logging.getLogger(__name__)
+
+# Implicit-feedback weight per signal; a user's weight for a podcast is the
+# strongest signal they gave it. Dislikes remove the pair entirely.
+INTERACTION_WEIGHTS = {
+    InteractionType.like: 3.0,
+    InteractionType.share: 3.0,
+    InteractionType.save: 2.0,
+    InteractionType.play_complete: 2.0,
+    InteractionType.play_start: 1.0,
+}
+SAVED_WEIGHT = 2.0
+SESSION_BASE_WEIGHT = 1.0  # Plus completion rate (0-1)
+
+_DISLIKE = np.inf  # Sentinel that wins the max-reduce, then drops the pair
+
+
+class InteractionMatrix:
+    """Sparse user x podcast implicit-feedback matrix.
+
+    Attributes:
+        matrix: CSR matrix (users x podcasts) of float32 weights
+        podcast_ids: External podcast ID for each column
+    """
+
+    def __init__(self, matrix: sp.csr_matrix, podcast_ids: List[str]):
+        self.matrix = matrix
+        self.podcast_ids = podcast_ids
+
+    @classmethod
+    def from_triples(
+        cls,
+        user_keys: Sequence,
+        podcast_ids: Sequence[str],
+        weights: Sequence[float]
+    ) -> "InteractionMatrix":
+        """Build the matrix from (user, podcast, weight) triples.
+
+        Duplicate pairs keep their largest weight; pairs with an infinite
+        weight (dislikes) are dropped.
+        """
+        user_index: Dict = {}
+        podcast_index: Dict[str, int] = {}
+        rows = np.fromiter(
+            (user_index.setdefault(u, len(user_index)) for u in user_keys),
+            dtype=np.int64, count=len(user_keys)
+        )
+        cols = np.fromiter(
+            (podcast_index.setdefault(p, len(podcast_index)) for p in podcast_ids),
+            dtype=np.int64, count=len(podcast_ids)
+        )
+        values = np.asarray(weights, dtype=np.float64)
+
+        if len(values):
+            # Max-reduce duplicate (user, podcast) pairs
+            keys = rows * max(len(podcast_index), 1) + cols
+            order = np.lexsort((values, keys))
+            keys, rows, cols, values = keys[order], rows[order], cols[order], values[order]
+            last = np.r_[keys[1:] != keys[:-1], True]
+            rows, cols, values = rows[last], cols[last], values[last]
+
+            keep = np.isfinite(values) & (values > 0)
+            rows, cols, values = rows[keep], cols[keep], values[keep]
+
+        matrix = sp.csr_matrix(
+            (values.astype(np.float32), (rows, cols)),
+            shape=(len(user_index), len(podcast_index)),
+        )
+        ordered_ids = [None] * len(podcast_index)
+        for pid, i in podcast_index.items():
+            ordered_ids[i] = pid
+        return cls(matrix, ordered_ids)
+
+    @classmethod
+    def load(cls, db: Session, since: Optional[datetime] = None) -> "InteractionMatrix":
+        """Load every user's signals (optionally only recent ones) in 3 queries."""
+        users: List = []
+        podcasts: List[str] = []
+        weights: List[float] = []
+
+        sessions = db.query(
+            ListeningDailyRollup.user_id,
+            ListeningDailyRollup.podcast_external_id,
+            func.max(ListeningDailyRollup.max_completion),
+        ).group_by(ListeningDailyRollup.user_id, ListeningDailyRollup.podcast_external_id)
+        if since:
+            sessions = sessions.filter(ListeningDailyRollup.day >= since.date())
+        for user_id, podcast_id, completion in sessions.yield_per(10000):
+            users.append(user_id)
+            podcasts.append(podcast_id)
+            weights.append(SESSION_BASE_WEIGHT + min(max(completion or 0.0, 0.0), 1.0))
+
+        interactions = db.query(
+            PodcastInteraction.user_id,
+            PodcastInteraction.podcast_external_id,
+            PodcastInteraction.interaction_type,
+        ).filter(
+            PodcastInteraction.interaction_type.in_(
+                list(INTERACTION_WEIGHTS) + [InteractionType.dislike]
+            )
+        ).distinct()
+        if since:
+            interactions = interactions.filter(PodcastInteraction.interaction_timestamp >= since)
+        for user_id, podcast_id, interaction_type in interactions.yield_per(10000):
+            users.append(user_id)
+            podcasts.append(podcast_id)
+            weights.append(
+                _DISLIKE if interaction_type == InteractionType.dislike
+                else INTERACTION_WEIGHTS[interaction_type]
+            )
+
+        saved = db.query(SavedPodcast.user_id, SavedPodcast.external_id)
+        for user_id, podcast_id in saved.yield_per(10000):
+            users.append(user_id)
+            podcasts.append(podcast_id)
+            weights.append(SAVED_WEIGHT)
+
+        return cls.from_triples(users, podcasts, weights)
+
+
+def compute_item_neighbors(
+    matrix: sp.spmatrix,
+    top_n: int = 50,
+    min_support: int = 2,
+    block_size: int = 1000
+) -> Tuple[List[np.ndarray], List[np.ndarray], np.ndarray]:
+    """Top-N cosine neighbours for every podcast column.
+
+    Columns are L2-normalized once; similarities are then computed for a
+    block of podcasts at a time as a sparse (block x podcasts) product, so
+    memory stays bounded by the block's co-occurrences rather than the full
+    podcasts x podcasts matrix.
+
+    Args:
+        matrix: users x podcasts sparse weight matrix
+        top_n: Neighbours kept per podcast
+        min_support: Podcasts with fewer users get (and are) no neighbours
+        block_size: Podcasts per similarity block
+
+    Returns:
+        Tuple of (neighbour column indices, similarities, support) where the
+        first two are per-podcast arrays ordered best first and support is
+        the number of users per podcast
+    """
+    X = sp.csc_matrix(matrix, dtype=np.float32)
+    n_items = X.shape[1]
+    support = np.diff(X.indptr)
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=0)).ravel())
+
+    eligible = (support >= min_support) & (norms > 0)
+    inverse = np.zeros(n_items, dtype=np.float32)
+    inverse[eligible] = 1.0 / norms[eligible]
+    normalized = (X @ sp.diags(inverse)).tocsc()
+    normalized.eliminate_zeros()
+    normalized_t = normalized.T.tocsr()
+
+    neighbor_idx: List[np.ndarray] = []
+    neighbor_sim: List[np.ndarray] = []
+    empty_idx = np.empty(0, dtype=np.int32)
+    empty_sim = np.empty(0, dtype=np.float32)
+
+    for start in range(0, n_items, block_size):
+        end = min(start + block_size, n_items)
+        block = (normalized_t[start:end] @ normalized).tocsr()
+
+        for r in range(end - start):
+            item = start + r
+            lo, hi = block.indptr[r], block.indptr[r + 1]
+            if not eligible[item] or lo == hi:
+                neighbor_idx.append(empty_idx)
+                neighbor_sim.append(empty_sim)
+                continue
+
+            cols = block.indices[lo:hi]
+            sims = block.data[lo:hi]
+            not_self = cols != item
+            cols, sims = cols[not_self], sims[not_self]
+
+            if len(sims) > top_n:
+                best = np.argpartition(-sims, top_n - 1)[:top_n]
+                cols, sims = cols[best], sims[best]
+            order = np.argsort(-sims, kind='stable')
+            neighbor_idx.append(cols[order].astype(np.int32))
+            neighbor_sim.append(sims[order].astype(np.float32))
+
+    return neighbor_idx, neighbor_sim, support
+
+
+def rebuild_podcast_neighbors(
+    db: Session,
+    top_n: int = 50,
+    min_support: int = 2,
+    lookback_days: Optional[int] = None,
+    block_size: int = 1000
+) -> int:
+    """Recompute and replace every podcast's neighbour list.
+
+    The table is swapped in one transaction, so readers see either the old
+    or the new neighbours, never a mix.
+
+    Returns:
+        Number of podcasts with at least one neighbour
+    """
+    started = time.monotonic()
+    since = datetime.utcnow() - timedelta(days=lookback_days) if lookback_days else None
+    interactions = InteractionMatrix.load(db, since=since)
+    matrix = interactions.matrix
+    logger.info(
+        f"Item-item CF: {matrix.shape[0]} users x {matrix.shape[1]} podcasts, "
+        f"{matrix.nnz} interactions (loaded in {time.monotonic() - started:.1f}s)"
+    )
+
+    neighbor_idx, neighbor_sim, support = compute_item_neighbors(
+        matrix, top_n=top_n, min_support=min_support, block_size=block_size
+    )
+
+    now = datetime.utcnow()
+    ids = interactions.podcast_ids
+    rows = [
+        {
+            'id': uuid.uuid4(),
+            'external_id': ids[i],
+            'neighbor_ids': [ids[j] for j in neighbor_idx[i]],
+            'neighbor_scores': [float(s) for s in neighbor_sim[i]],
+            'support': int(support[i]),
+            'computed_at': now,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for i in range(len(ids))
+        if len(neighbor_idx[i])
+    ]
+
+    try:
+        db.query(PodcastNeighbors).delete(synchronize_session=False)
+        for offset in range(0, len(rows), 5000):
+            db.execute(insert(PodcastNeighbors.__table__), rows[offset:offset + 5000])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(
+        f"Stored neighbours for {len(rows)} podcasts in {time.monotonic() - started:.1f}s"
+    )
+    return len(rows)
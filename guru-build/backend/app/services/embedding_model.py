@@ -0,0 +1,193 @@
+"""Process-wide sentence-transformer model shared by all services."""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# all-MiniLM-L6-v2 produces 384-dim embeddings and is a good balance of speed and quality
+EMBEDDING_MODEL_NAME = os.getenv('EMBEDDING_MODEL_NAME', 'all-MiniLM-L6-v2')
+
+# Inference backend: "fp32" (full-precision PyTorch) or "int8" (dynamic
+# quantization of the Linear layers, for CPU-only workers)
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'fp32').lower()
+EMBEDDING_BACKENDS = ('fp32', 'int8')
+
+
+class EmbeddingModel:
+    """Thread-safe holder for a single sentence-transformer instance.
+
+    The model is loaded once per process (at worker start via
+    warm_up_embedding_model(), or lazily on first use) and shared across
+    threads. encode() serializes access to the underlying model so concurrent
+    callers can pass their own batches safely, and records load time,
+    inference latency and time spent waiting for the model.
+    """
+
+    LATENCY_WINDOW = 1000  # Number of recent encode() calls kept for percentiles
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, backend: str = EMBEDDING_BACKEND):
+        if backend not in EMBEDDING_BACKENDS:
+            logger.warning(f"Unknown embedding backend '{backend}', falling back to fp32")
+            backend = 'fp32'
+        self.model_name = model_name
+        self.backend = backend
+        self._model = None
+        self._load_failed = False
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+
+        self.load_time_seconds: Optional[float] = None
+        self._encode_calls = 0
+        self._encoded_texts = 0
+        self._latencies_ms: deque = deque(maxlen=self.LATENCY_WINDOW)
+        self._lock_waits_ms: deque = deque(maxlen=self.LATENCY_WINDOW)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        """Load the model if needed and return it (None if unavailable)."""
+        if self._model is not None or self._load_failed:
+            return self._model
+
+        with self._load_lock:
+            if self._model is not None or self._load_failed:
+                return self._model
+
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                logger.warning(
+                    "sentence-transformers not installed. "
+                    "Run: pip install sentence-transformers"
+                )
+                self._load_failed = True
+                return None
+
+            started = time.monotonic()
+            try:
+                model = SentenceTransformer(self.model_name)
+            except Exception as e:
+                logger.error(f"Failed to load sentence-transformers model {self.model_name}: {e}")
+                self._load_failed = True
+                return None
+
+            if self.backend == 'int8':
+                model = self._quantize_int8(model)
+
+            self.load_time_seconds = time.monotonic() - started
+            self._model = model
+            logger.info(
+                f"Loaded sentence-transformers model: {self.model_name} "
+                f"({self.backend}) in {self.load_time_seconds:.2f}s"
+            )
+            return self._model
+
+    def _quantize_int8(self, model):
+        """Apply int8 dynamic quantization to the model's Linear layers.
+
+        Weights are stored as int8 and activations quantized on the fly, which
+        cuts memory and speeds up CPU inference. Falls back to the fp32 model
+        if the quantization engine is unavailable.
+        """
+        try:
+            import torch
+
+            model.eval()
+            torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+            return model
+        except Exception as e:
+            logger.warning(f"int8 quantization failed, using fp32 embeddings: {e}")
+            self.backend = 'fp32'
+            return model
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32):
+        """Encode one text or a list of texts.
+
+        Mirrors SentenceTransformer.encode: a single string returns a 1-D
+        numpy array, a list returns a 2-D array.
+
+        Raises:
+            RuntimeError: If the model could not be loaded
+        """
+        model = self.load()
+        if model is None:
+            raise RuntimeError(f"Embedding model {self.model_name} is not available")
+
+        # Inference latency excludes the wait for other callers' batches,
+        # which is reported separately
+        waiting = time.monotonic()
+        with self._encode_lock:
+            started = time.monotonic()
+            embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+            finished = time.monotonic()
+
+        with self._metrics_lock:
+            self._encode_calls += 1
+            self._encoded_texts += 1 if isinstance(texts, str) else len(texts)
+            self._latencies_ms.append((finished - started) * 1000)
+            self._lock_waits_ms.append((started - waiting) * 1000)
+
+        return embeddings
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of load and inference metrics for this process."""
+        with self._metrics_lock:
+            latencies = sorted(self._latencies_ms)
+            lock_waits = sorted(self._lock_waits_ms)
+            calls = self._encode_calls
+            texts = self._encoded_texts
+
+        def percentile(p: float, values: List[float] = latencies) -> Optional[float]:
+            if not values:
+                return None
+            return round(values[min(len(values) - 1, int(p * len(values)))], 2)
+
+        return {
+            'model_name': self.model_name,
+            'backend': self.backend,
+            'loaded': self.is_loaded,
+            'load_time_seconds': round(self.load_time_seconds, 3) if self.load_time_seconds else None,
+            'encode_calls': calls,
+            'encoded_texts': texts,
+            'latency_ms_p50': percentile(0.50),
+            'latency_ms_p95': percentile(0.95),
+            'latency_ms_max': round(latencies[-1], 2) if latencies else None,
+            'lock_wait_ms_p50': percentile(0.50, lock_waits),
+            'lock_wait_ms_p95': percentile(0.95, lock_waits),
+        }
+
+
+_shared_model: Optional[EmbeddingModel] = None
+_shared_model_lock = threading.Lock()
+
+
+def get_embedding_model() -> EmbeddingModel:
+    """Get the process-wide embedding model holder (model loads lazily)."""
+    global _shared_model
+    if _shared_model is None:
+        with _shared_model_lock:
+            if _shared_model is None:
+                _shared_model = EmbeddingModel()
+    return _shared_model
+
+
+def warm_up_embedding_model() -> None:
+    """Load the shared model eagerly (call at web/worker process start)."""
+    holder = get_embedding_model()
+    if holder.load() is None:
+        return
+    try:
+        # First inference initializes lazy kernels; keep it off the request path
+        holder.encode(["warm up"])
+    except Exception as e:
+        logger.warning(f"Embedding model warm-up inference failed: {e}")
@@ -1,21 +1,42 @@
 """Service for tracking user listening events and interactions."""
 
 import logging
-from datetime import datetime
-from typing import Optional, Dict, Any
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List
 from uuid import UUID
 
+from sqlalchemy import delete, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.models.user import User
 from app.models.podcast_recommendation import (
+    IngestedEvent,
+    ListeningDailyRollup,
     ListeningSession,
     PodcastInteraction,
     InteractionType,
 )
+from app.services.listening_progress import (
+    PROGRESS_FIELDS,
+    get_session_meta,
+    listening_progress_buffer,
+    progress_update_statement,
+    remember_session,
+    sessions_by_id,
+)
+from app.services.interaction_state import interaction_state
+from app.services.listening_rollups import roll_up_user_sessions
+from app.services.partitions import MAX_CLOCK_SKEW, newest_first_ranges
 
 logger = logging.getLogger(__name__)
 
+# Batch ingestion: session lifecycle events; anything else is an InteractionType
+SESSION_EVENT_TYPES = ('start', 'progress', 'pause', 'seek', 'end')
+# Events that change the user's profile inputs
+PROFILE_EVENT_TYPES = ('end', InteractionType.like.value, InteractionType.dislike.value)
+
 
 class EventTrackingService:
     """Service for recording user listening events and interactions.
@@ -67,6 +88,8 @@ class EventTrackingService:
         self.db.add(session)
         self.db.commit()
         self.db.refresh(session)
+        remember_session(session.id, session.user_id, session.episode_duration_seconds, session.started_at)
+        interaction_state.add(self.user.id, 'listened', [podcast_id])
 
         logger.info(
             f"Started listening session {session.id} for user {self.user.id}, "
@@ -85,6 +108,10 @@ class EventTrackingService:
     ) -> Optional[ListeningSession]:
         """Update an ongoing listening session with progress.
 
+        With the write-behind buffer enabled, the progress is buffered and
+        written in bulk by the flusher; the returned session is then a
+        transient (unsaved) ListeningSession holding the buffered values.
+
         Args:
             session_id: The session to update
             listened_duration_seconds: How much has been listened so far
@@ -96,10 +123,17 @@ class EventTrackingService:
         Returns:
             The updated session, or None if not found
         """
-        session = self.db.query(ListeningSession).filter_by(
-            id=session_id,
-            user_id=self.user.id
-        ).first()
+        if listening_progress_buffer.enabled:
+            return self._buffer_listening_progress(
+                session_id,
+                listened_duration_seconds=listened_duration_seconds,
+                pause_count=pause_count,
+                seek_forward_count=seek_forward_count,
+                seek_backward_count=seek_backward_count,
+                playback_speed=playback_speed,
+            )
+
+        session = self._get_session(session_id)
 
         if not session:
             logger.warning(f"Session {session_id} not found for user {self.user.id}")
@@ -131,24 +165,74 @@ class EventTrackingService:
         )
         return session
 
+    def _buffer_listening_progress(
+        self,
+        session_id: UUID,
+        listened_duration_seconds: int,
+        **optional: Optional[float]
+    ) -> Optional[ListeningSession]:
+        """Buffer a progress heartbeat without touching the database.
+
+        Returns:
+            Transient session with the buffered progress, or None if not found
+        """
+        meta = get_session_meta(self.db, session_id)
+        if not meta or meta['user_id'] != str(self.user.id):
+            logger.warning(f"Session {session_id} not found for user {self.user.id}")
+            return None
+
+        completion_rate = None
+        if meta['duration'] and meta['duration'] > 0:
+            completion_rate = min(1.0, listened_duration_seconds / meta['duration'])
+
+        listening_progress_buffer.record(session_id, {
+            'started_at': meta['started_at'],
+            'listened_duration_seconds': listened_duration_seconds,
+            'completion_rate': completion_rate,
+            **optional,
+        })
+
+        return ListeningSession(
+            id=session_id,
+            user_id=self.user.id,
+            started_at=datetime.fromisoformat(meta['started_at']),
+            episode_duration_seconds=meta['duration'],
+            listened_duration_seconds=listened_duration_seconds,
+            completion_rate=completion_rate if completion_rate is not None else 0.0,
+            **{k: v for k, v in optional.items() if v is not None},
+        )
+
+    def _get_session(self, session_id: UUID) -> Optional[ListeningSession]:
+        """The user's session with this ID, or None."""
+        sessions = sessions_by_id(
+            self.db.query(ListeningSession).filter(ListeningSession.user_id == self.user.id),
+            [session_id]
+        )
+        return sessions[0] if sessions else None
+
     def end_listening_session(self, session_id: UUID) -> Optional[ListeningSession]:
         """End a listening session.
 
+        Any buffered progress for the session is applied in the same commit.
+
         Args:
             session_id: The session to end
 
         Returns:
             The ended session, or None if not found
         """
-        session = self.db.query(ListeningSession).filter_by(
-            id=session_id,
-            user_id=self.user.id
-        ).first()
+        session = self._get_session(session_id)
 
         if not session:
             logger.warning(f"Session {session_id} not found for user {self.user.id}")
             return None
 
+        pending = listening_progress_buffer.pop(session_id)
+        if pending:
+            for field in PROGRESS_FIELDS:
+                if pending.get(field) is not None:
+                    setattr(session, field, pending[field])
+
         session.ended_at = datetime.utcnow()
         self.db.commit()
 
@@ -188,6 +272,7 @@ class EventTrackingService:
         self.db.add(interaction)
         self.db.commit()
         self.db.refresh(interaction)
+        interaction_state.record_interaction(self.user.id, podcast_id, interaction_type)
 
         logger.info(
             f"Recorded {interaction_type.value} for podcast {podcast_id} "
@@ -195,6 +280,314 @@ class EventTrackingService:
         )
         return interaction
 
+    def ingest_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply a batch of playback events (e.g. an offline log) at once.
+
+        Events are validated up front; invalid ones are rejected individually.
+        Idempotency keys are claimed with one INSERT ... ON CONFLICT DO
+        NOTHING, so retried events are reported as duplicates and not
+        applied again; claims of events later rejected (unknown session)
+        are released before the commit. Then, in the same transaction:
+        - session starts become one multi-row INSERT into listening_sessions
+        - progress/pause/seek/end events are folded per session in timestamp
+          order and written with one UPDATE ... FROM (VALUES ...)
+        - interactions become one multi-row INSERT into podcast_interactions
+
+        Args:
+            events: PlaybackEvent dicts
+
+        Returns:
+            Dict with per-event 'results' (in request order), and
+            'update_profile' / 'disliked_podcast_ids' for follow-up work
+        """
+        now = datetime.utcnow()
+        results: Dict[str, Dict[str, Any]] = {}
+        fresh_events: List[Dict[str, Any]] = []
+
+        for event in events:
+            key = event['idempotency_key']
+            if key in results:
+                continue  # Same key twice in one batch: the first one counts
+            event = {**event, 'timestamp': self._utc_naive(event['timestamp'])}
+            error = self._validate_event(event, now)
+            results[key] = {
+                'idempotency_key': key,
+                'status': 'rejected' if error else 'accepted',
+                'error': error,
+                'session_id': event.get('session_id'),
+            }
+            if not error:
+                fresh_events.append(event)
+
+        outcome = {'update_profile': False, 'disliked_podcast_ids': []}
+        if not fresh_events:
+            return {'results': list(results.values()), **outcome}
+
+        try:
+            fresh_events = self._claim_idempotency_keys(fresh_events, results, now)
+            self._insert_session_starts(
+                [e for e in fresh_events if e['event_type'] == 'start'], now
+            )
+            self._apply_session_events(
+                [e for e in fresh_events if e['event_type'] in SESSION_EVENT_TYPES[1:]], results, now
+            )
+            applied = [e for e in fresh_events if results[e['idempotency_key']]['status'] == 'accepted']
+            self._release_idempotency_keys([
+                e['idempotency_key'] for e in fresh_events
+                if results[e['idempotency_key']]['status'] == 'rejected'
+            ])
+            self._insert_interactions(
+                [e for e in applied if e['event_type'] not in SESSION_EVENT_TYPES], now
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        for event in applied:
+            if event['event_type'] == 'start':
+                remember_session(
+                    event['session_id'], self.user.id, event['episode_duration_seconds'], event['timestamp']
+                )
+                interaction_state.add(self.user.id, 'listened', [event['podcast_id']])
+            elif event['event_type'] not in SESSION_EVENT_TYPES:
+                interaction_state.record_interaction(
+                    self.user.id, event['podcast_id'], InteractionType(event['event_type'])
+                )
+
+        outcome['update_profile'] = any(e['event_type'] in PROFILE_EVENT_TYPES for e in applied)
+        outcome['disliked_podcast_ids'] = sorted({
+            e['podcast_id'] for e in applied if e['event_type'] == InteractionType.dislike.value
+        })
+
+        logger.info(
+            f"Ingested {len(applied)}/{len(events)} playback events for user {self.user.id}"
+        )
+        return {'results': list(results.values()), **outcome}
+
+    @staticmethod
+    def _utc_naive(timestamp: datetime) -> datetime:
+        """Client timestamps are stored as naive UTC, like server ones."""
+        if timestamp.tzinfo is not None:
+            return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        return timestamp
+
+    @staticmethod
+    def _validate_event(event: Dict[str, Any], now: datetime) -> Optional[str]:
+        """Return why an event is invalid, or None if it can be applied."""
+        event_type = event['event_type']
+        if event['timestamp'] > now + MAX_CLOCK_SKEW:
+            return "timestamp is in the future"
+        if event_type not in SESSION_EVENT_TYPES:
+            try:
+                InteractionType(event_type)
+            except ValueError:
+                return f"Unknown event type: {event_type}"
+            return None if event.get('podcast_id') else "podcast_id is required"
+
+        if event_type == 'start':
+            if not event.get('podcast_id') or not event.get('episode_id'):
+                return "podcast_id and episode_id are required"
+            if not event.get('episode_duration_seconds'):
+                return "episode_duration_seconds is required"
+            return None
+        if not event.get('session_id') and not event.get('session_key'):
+            return "session_id or session_key is required"
+        if event_type == 'progress' and event.get('listened_duration_seconds') is None:
+            return "listened_duration_seconds is required"
+        if event_type == 'seek' and event.get('direction') not in ('forward', 'backward'):
+            return "direction must be forward or backward"
+        return None
+
+    def _claim_idempotency_keys(
+        self,
+        events: List[Dict[str, Any]],
+        results: Dict[str, Dict[str, Any]],
+        now: datetime
+    ) -> List[Dict[str, Any]]:
+        """Record the batch's keys; returns only events not seen before.
+
+        Start events get their session ID here, stored as the key's result_id.
+        """
+        for event in events:
+            if event['event_type'] == 'start':
+                event['session_id'] = uuid.uuid4()
+
+        table = IngestedEvent.__table__
+        stmt = pg_insert(table).values([
+            {
+                'id': uuid.uuid4(),
+                'user_id': self.user.id,
+                'idempotency_key': event['idempotency_key'],
+                'event_type': event['event_type'],
+                'result_id': event['session_id'] if event['event_type'] == 'start' else None,
+                'client_timestamp': event['timestamp'],
+                'created_at': now,
+                'updated_at': now,
+            }
+            for event in events
+        ]).on_conflict_do_nothing(
+            index_elements=['user_id', 'idempotency_key']
+        ).returning(table.c.idempotency_key)
+        claimed = set(self.db.execute(stmt).scalars())
+
+        fresh, duplicate_starts = [], []
+        for event in events:
+            result = results[event['idempotency_key']]
+            if event['idempotency_key'] in claimed:
+                result['session_id'] = event.get('session_id')
+                fresh.append(event)
+            else:
+                result.update(status='duplicate', session_id=None)
+                if event['event_type'] == 'start':
+                    duplicate_starts.append(event['idempotency_key'])
+
+        if duplicate_starts:
+            # A retried start reports the session created the first time
+            for key, session_id in self.db.query(IngestedEvent.idempotency_key, IngestedEvent.result_id).filter(
+                IngestedEvent.user_id == self.user.id,
+                IngestedEvent.idempotency_key.in_(duplicate_starts)
+            ):
+                results[key]['session_id'] = session_id
+        return fresh
+
+    def _release_idempotency_keys(self, keys: List[str]) -> None:
+        """Drop the claims of events rejected after claiming, so a resend can apply them."""
+        if not keys:
+            return
+        self.db.execute(delete(IngestedEvent).where(
+            IngestedEvent.user_id == self.user.id,
+            IngestedEvent.idempotency_key.in_(keys)
+        ))
+
+    def _insert_session_starts(self, starts: List[Dict[str, Any]], now: datetime) -> None:
+        """Create sessions for start events with one multi-row INSERT."""
+        if not starts:
+            return
+        self.db.execute(insert(ListeningSession.__table__).values([
+            {
+                'id': event['session_id'],
+                'user_id': self.user.id,
+                'episode_external_id': event['episode_id'],
+                'podcast_external_id': event['podcast_id'],
+                'started_at': event['timestamp'],
+                'episode_duration_seconds': event['episode_duration_seconds'],
+                'listened_duration_seconds': 0,
+                'completion_rate': 0.0,
+                'pause_count': 0,
+                'seek_forward_count': 0,
+                'seek_backward_count': 0,
+                'playback_speed': event.get('playback_speed') or 1.0,
+                'listening_context': event.get('context'),
+                'device_type': 'mobile',
+                'created_at': now,
+                'updated_at': now,
+            }
+            for event in starts
+        ]))
+
+    def _apply_session_events(
+        self,
+        events: List[Dict[str, Any]],
+        results: Dict[str, Dict[str, Any]],
+        now: datetime
+    ) -> None:
+        """Fold progress/pause/seek/end events into their sessions.
+
+        Sessions are resolved by ID or by their start event's key and must
+        belong to the user; events for unknown sessions are rejected.
+        """
+        if not events:
+            return
+
+        keys = {e['session_key'] for e in events if not e.get('session_id') and e.get('session_key')}
+        by_key = {}
+        if keys:
+            by_key = dict(self.db.query(IngestedEvent.idempotency_key, IngestedEvent.result_id).filter(
+                IngestedEvent.user_id == self.user.id,
+                IngestedEvent.idempotency_key.in_(keys),
+                IngestedEvent.result_id.isnot(None)
+            ).all())
+        for event in events:
+            if not event.get('session_id'):
+                event['session_id'] = by_key.get(event.get('session_key'))
+
+        sessions = {
+            row.id: row
+            for row in sessions_by_id(
+                self.db.query(
+                    ListeningSession.id,
+                    ListeningSession.started_at,
+                    ListeningSession.episode_duration_seconds,
+                    *(getattr(ListeningSession, field) for field in PROGRESS_FIELDS),
+                ).filter(ListeningSession.user_id == self.user.id),
+                {e['session_id'] for e in events if e['session_id']}
+            )
+        }
+
+        states: Dict[UUID, Dict[str, Any]] = {}
+        for event in sorted(events, key=lambda e: e['timestamp']):
+            result = results[event['idempotency_key']]
+            session = sessions.get(event['session_id'])
+            if session is None:
+                result.update(status='rejected', error="Unknown session", session_id=None)
+                continue
+            result['session_id'] = session.id
+
+            state = states.get(session.id)
+            if state is None:
+                # Buffered heartbeats are newer than what's stored
+                pending = listening_progress_buffer.pop(session.id) or {}
+                state = {field: getattr(session, field) for field in PROGRESS_FIELDS}
+                state.update({k: v for k, v in pending.items() if v is not None})
+                state['started_at'] = session.started_at
+                state['ended_at'] = None
+                states[session.id] = state
+
+            if event.get('listened_duration_seconds') is not None:
+                state['listened_duration_seconds'] = event['listened_duration_seconds']
+            if event.get('playback_speed') is not None:
+                state['playback_speed'] = event['playback_speed']
+            if event['event_type'] == 'pause':
+                state['pause_count'] = (state['pause_count'] or 0) + 1
+            elif event['event_type'] == 'seek':
+                field = f"seek_{event['direction']}_count"
+                state[field] = (state[field] or 0) + 1
+            elif event['event_type'] == 'end':
+                state['ended_at'] = event['timestamp']
+
+            duration = session.episode_duration_seconds
+            if duration and duration > 0 and state['listened_duration_seconds'] is not None:
+                state['completion_rate'] = min(1.0, state['listened_duration_seconds'] / duration)
+
+        if states:
+            self.db.execute(progress_update_statement([
+                (
+                    str(session_id), state['started_at'],
+                    *(state[field] for field in PROGRESS_FIELDS), state['ended_at']
+                )
+                for session_id, state in states.items()
+            ]))
+
+    def _insert_interactions(self, events: List[Dict[str, Any]], now: datetime) -> None:
+        """Record interaction events with one multi-row INSERT."""
+        if not events:
+            return
+        self.db.execute(insert(PodcastInteraction.__table__).values([
+            {
+                'id': uuid.uuid4(),
+                'user_id': self.user.id,
+                'podcast_external_id': event['podcast_id'],
+                'episode_external_id': event.get('episode_id'),
+                'interaction_type': InteractionType(event['event_type']),
+                'interaction_timestamp': event['timestamp'],
+                'extra_data': {'source': 'batch', 'idempotency_key': event['idempotency_key']},
+                'created_at': now,
+                'updated_at': now,
+            }
+            for event in events
+        ]))
+
     def get_user_interactions(
         self,
         podcast_id: Optional[str] = None,
@@ -218,7 +611,7 @@ class EventTrackingService:
         if interaction_type:
             query = query.filter_by(interaction_type=interaction_type)
 
-        return query.order_by(PodcastInteraction.interaction_timestamp.desc()).limit(limit).all()
+        return self._newest_first(query, PodcastInteraction.interaction_timestamp, limit)
 
     def get_listening_sessions(
         self,
@@ -243,20 +636,73 @@ class EventTrackingService:
         if min_completion_rate > 0:
             query = query.filter(ListeningSession.completion_rate >= min_completion_rate)
 
-        return query.order_by(ListeningSession.started_at.desc()).limit(limit).all()
+        return self._newest_first(query, ListeningSession.started_at, limit)
+
+    @staticmethod
+    def _newest_first(query, key, limit: int) -> list:
+        """Run a newest-first listing one month of the partition key at a time.
+
+        Recent months are queried one partition each, newest first, until
+        `limit` rows are found; older history is only read if they don't
+        hold enough.
+        """
+        rows = []
+        for lower, upper in newest_first_ranges():
+            bounded = query.filter(key < upper)
+            if lower is not None:
+                bounded = bounded.filter(key >= lower)
+            rows += bounded.order_by(key.desc()).limit(limit - len(rows)).all()
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def get_listening_summary(
+        self,
+        days: int = 30,
+        podcast_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Summarize the user's listening per podcast from the daily rollups.
+
+        Unlike get_listening_sessions, covers history older than the raw
+        session retention window.
+
+        Args:
+            days: How many days back to include (0 = all history)
+            podcast_id: Filter by podcast
+
+        Returns:
+            Per-podcast totals, most listened first
+        """
+        roll_up_user_sessions(self.db, self.user.id)
+
+        r = ListeningDailyRollup
+        query = self.db.query(
+            r.podcast_external_id,
+            func.count(r.day).label('days_listened'),
+            func.max(r.day).label('last_listened_on'),
+            func.sum(r.session_count).label('session_count'),
+            func.sum(r.ended_session_count).label('ended_session_count'),
+            func.sum(r.listened_seconds).label('listened_seconds'),
+            func.max(r.max_completion).label('max_completion'),
+            func.sum(r.pause_count).label('pause_count'),
+            func.sum(r.seek_forward_count).label('seek_forward_count'),
+            func.sum(r.seek_backward_count).label('seek_backward_count'),
+        ).filter(r.user_id == self.user.id)
+
+        if days > 0:
+            query = query.filter(r.day >= (datetime.utcnow() - timedelta(days=days)).date())
+        if podcast_id:
+            query = query.filter(r.podcast_external_id == podcast_id)
+
+        rows = query.group_by(r.podcast_external_id).order_by(
+            func.sum(r.listened_seconds).desc()
+        ).all()
+        return [row._asdict() for row in rows]
 
     def has_liked_podcast(self, podcast_id: str) -> bool:
         """Check if user has liked a podcast."""
-        return self.db.query(PodcastInteraction).filter_by(
-            user_id=self.user.id,
-            podcast_external_id=podcast_id,
-            interaction_type=InteractionType.like
-        ).first() is not None
+        return podcast_id in interaction_state.get(self.db, self.user.id).liked
 
     def has_disliked_podcast(self, podcast_id: str) -> bool:
         """Check if user has disliked a podcast."""
-        return self.db.query(PodcastInteraction).filter_by(
-            user_id=self.user.id,
-            podcast_external_id=podcast_id,
-            interaction_type=InteractionType.dislike
-        ).first() is not None
+        return podcast_id in interaction_state.get(self.db, self.user.id).disliked
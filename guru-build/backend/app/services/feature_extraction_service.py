@@ -2,15 +2,24 @@
 
 import logging
 import os
-import hashlib
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
-import requests
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from app.models.podcast_recommendation import PodcastFeatures
+from app.models.podcast_recommendation import EpisodeFeatures, PodcastFeatures
+from app.services.embedding_model import EmbeddingModel, get_embedding_model
+from app.services.feature_refresh import is_stale, request_feature_refresh
+from app.services.podcast_index_client import (
+    PodcastIndexError,
+    PodcastIndexNotConfigured,
+    get_podcast_index_client,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +30,8 @@ class FeatureExtractionService:
     Converts podcast data into feature vectors used for recommendations:
     - Category vectors: One-hot encoded podcast categories
     - Description embeddings: Semantic embeddings from sentence-transformers
+    - Episode features: title/description embeddings and duration for the
+      recent episodes fetched alongside each podcast
     """
 
     # Standard podcast categories from Podcast Index
@@ -47,31 +58,31 @@ class FeatureExtractionService:
         "TV & Film",
     ]
 
+    # Batch pipeline settings (overridable via environment for backfills)
+    EMBEDDING_BATCH_SIZE = int(os.getenv('FEATURE_EMBEDDING_BATCH_SIZE', '64'))
+    UPSERT_BATCH_SIZE = int(os.getenv('FEATURE_UPSERT_BATCH_SIZE', '200'))
+    FETCH_WORKERS = int(os.getenv('FEATURE_FETCH_WORKERS', '8'))
+    EPISODES_PER_FEED = int(os.getenv('FEATURE_EPISODES_PER_FEED', '10'))
+    EPISODE_UPSERT_CHUNK = 1000  # Keeps each INSERT under Postgres' bind parameter limit
+
+    # Max description length fed to the embedding model
+    MAX_DESCRIPTION_CHARS = 2000
+
     def __init__(self, db: Session):
         self.db = db
-        self._embedding_model = None
-        self.api_key = os.getenv('PODCAST_INDEX_API_KEY')
-        self.api_secret = os.getenv('PODCAST_INDEX_API_SECRET')
 
     @property
-    def embedding_model(self):
-        """Lazy load sentence transformer for embeddings.
+    def embedding_model(self) -> Optional[EmbeddingModel]:
+        """Process-wide sentence transformer for embeddings.
 
-        Uses all-MiniLM-L6-v2 which produces 384-dim embeddings.
-        This model is a good balance of speed and quality.
+        The model is shared by every service instance in the process, so it is
+        loaded once (at worker start, or lazily on first use) rather than per
+        request. Returns None if sentence-transformers is unavailable.
         """
-        if self._embedding_model is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                self._embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-                logger.info("Loaded sentence-transformers model: all-MiniLM-L6-v2")
-            except ImportError:
-                logger.warning(
-                    "sentence-transformers not installed. "
-                    "Run: pip install sentence-transformers"
-                )
-                return None
-        return self._embedding_model
+        holder = get_embedding_model()
+        if holder.load() is None:
+            return None
+        return holder
 
     def extract_and_store_features(
         self,
@@ -80,26 +91,24 @@ class FeatureExtractionService:
     ) -> Optional[PodcastFeatures]:
         """Extract features for a podcast and store in database.
 
+        An existing row is returned as is; if it is stale, it is queued for
+        the background refresh scheduler rather than refreshed inline.
+
         Args:
             podcast_id: External podcast ID from Podcast Index
-            force_refresh: If True, recompute even if cached
+            force_refresh: If True, recompute now even if a row exists
 
         Returns:
             PodcastFeatures object, or None if extraction failed
         """
-        # Check if already cached and fresh
         existing = self.db.query(PodcastFeatures).filter_by(
             external_id=podcast_id
         ).first()
 
         if existing and not force_refresh:
-            if existing.features_computed_at:
-                age_hours = (
-                    datetime.utcnow() - existing.features_computed_at
-                ).total_seconds() / 3600
-                if age_hours < 24:  # Cache for 24 hours
-                    logger.debug(f"Using cached features for podcast {podcast_id}")
-                    return existing
+            if is_stale(existing.features_computed_at):
+                request_feature_refresh([podcast_id])
+            return existing
 
         # Fetch from Podcast Index API
         podcast_data = self._fetch_podcast_data(podcast_id)
@@ -126,14 +135,15 @@ class FeatureExtractionService:
         if features.description and self.embedding_model:
             try:
                 # Limit input length to avoid memory issues
-                text = features.description[:2000]
+                text = features.description[:self.MAX_DESCRIPTION_CHARS]
                 embedding = self.embedding_model.encode(text)
                 features.description_embedding = embedding.tolist()
             except Exception as e:
                 logger.error(f"Error computing embedding for podcast {podcast_id}: {e}")
 
         # Compute additional metrics from episodes
-        episode_stats = self._compute_episode_stats(podcast_id)
+        episodes = self._fetch_episodes(podcast_id)
+        episode_stats = self._compute_episode_stats(episodes)
         features.avg_episode_duration_seconds = episode_stats.get('avg_duration')
         features.update_frequency_days = episode_stats.get('update_frequency')
 
@@ -149,6 +159,9 @@ class FeatureExtractionService:
         self.db.commit()
         self.db.refresh(features)
 
+        # Keep the episodes we already fetched as episode-level features
+        self.store_episode_features(podcast_id, episodes, fallback_image=features.artwork)
+
         logger.info(f"Extracted features for podcast {podcast_id}: {features.title}")
         return features
 
@@ -190,109 +203,70 @@ class FeatureExtractionService:
         Returns:
             Podcast data dict, or None if failed
         """
-        headers = self._get_api_headers()
-        if not headers:
-            logger.error("Missing Podcast Index API credentials")
-            return None
-
         try:
-            response = requests.get(
-                f'https://api.podcastindex.org/api/1.0/podcasts/byfeedid',
-                headers=headers,
-                params={'id': podcast_id},
-                timeout=10
-            )
-
-            if response.ok:
-                data = response.json()
-                return data.get('feed', {})
-            else:
-                logger.warning(
-                    f"Podcast Index API error for {podcast_id}: {response.status_code}"
-                )
-        except requests.RequestException as e:
-            logger.error(f"Error fetching podcast {podcast_id}: {e}")
+            return get_podcast_index_client().podcast_by_feed_id(podcast_id).get('feed', {})
+        except PodcastIndexNotConfigured:
+            logger.error("Missing Podcast Index API credentials")
+        except PodcastIndexError as e:
+            logger.warning(f"Podcast Index API error for {podcast_id}: {e}")
 
         return None
 
-    def _get_api_headers(self) -> Optional[Dict[str, str]]:
-        """Generate Podcast Index API authentication headers.
+    def _fetch_episodes(self, podcast_id: str) -> List[Dict[str, Any]]:
+        """Fetch a podcast's most recent episodes from Podcast Index API.
+
+        Args:
+            podcast_id: External podcast ID
 
         Returns:
-            Headers dict, or None if credentials not available
+            List of episode dicts (empty if the request failed)
         """
-        if not self.api_key or not self.api_secret:
-            return None
-
-        epoch_time = str(int(time.time()))
-        data_to_hash = self.api_key + self.api_secret + epoch_time
-        sha_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()
-
-        return {
-            'User-Agent': 'GuruApp/1.0',
-            'X-Auth-Key': self.api_key,
-            'X-Auth-Date': epoch_time,
-            'Authorization': sha_hash,
-        }
-
-    def _compute_episode_stats(self, podcast_id: str) -> Dict[str, Any]:
+        try:
+            return get_podcast_index_client().episodes_by_feed_id(
+                podcast_id, self.EPISODES_PER_FEED
+            ).get('items', []) or []
+        except PodcastIndexError as e:
+            logger.error(f"Error fetching episodes for {podcast_id}: {e}")
+            return []
+
+    def _compute_episode_stats(self, episodes: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Compute statistics from recent episodes.
 
         Args:
-            podcast_id: External podcast ID
+            episodes: Episode dicts from episodes/byfeedid
 
         Returns:
             Dict with avg_duration and update_frequency
         """
-        headers = self._get_api_headers()
-        if not headers:
+        if not episodes:
             return {}
 
-        try:
-            response = requests.get(
-                'https://api.podcastindex.org/api/1.0/episodes/byfeedid',
-                headers=headers,
-                params={'id': podcast_id, 'max': 10},
-                timeout=10
-            )
-
-            if not response.ok:
-                return {}
-
-            episodes = response.json().get('items', [])
-            if not episodes:
-                return {}
-
-            # Average duration
-            durations = [
-                e.get('duration', 0)
-                for e in episodes
-                if e.get('duration') and e.get('duration') > 0
+        # Average duration
+        durations = [
+            e.get('duration', 0)
+            for e in episodes
+            if e.get('duration') and e.get('duration') > 0
+        ]
+        avg_duration = int(sum(durations) / len(durations)) if durations else None
+
+        # Update frequency (average days between episodes)
+        dates = sorted([
+            e.get('datePublished', 0)
+            for e in episodes
+            if e.get('datePublished')
+        ])
+        update_frequency = None
+        if len(dates) >= 2:
+            gaps = [
+                (dates[i + 1] - dates[i]) / 86400  # Convert seconds to days
+                for i in range(len(dates) - 1)
             ]
-            avg_duration = int(sum(durations) / len(durations)) if durations else None
-
-            # Update frequency (average days between episodes)
-            dates = sorted([
-                e.get('datePublished', 0)
-                for e in episodes
-                if e.get('datePublished')
-            ])
-            update_frequency = None
-            if len(dates) >= 2:
-                gaps = [
-                    (dates[i + 1] - dates[i]) / 86400  # Convert seconds to days
-                    for i in range(len(dates) - 1)
-                ]
-                update_frequency = sum(gaps) / len(gaps)
+            update_frequency = sum(gaps) / len(gaps)
 
-            return {
-                'avg_duration': avg_duration,
-                'update_frequency': update_frequency
-            }
-
-        except requests.RequestException as e:
-            logger.error(f"Error computing episode stats for {podcast_id}: {e}")
-            return {}
+        return {
+            'avg_duration': avg_duration,
+            'update_frequency': update_frequency
+        }
 
     def _fix_image_url(self, url: str) -> str:
         """Fix image URL to use HTTPS."""
@@ -305,7 +279,8 @@ class FeatureExtractionService:
     def get_or_extract_features(self, podcast_id: str) -> Optional[PodcastFeatures]:
         """Get features for a podcast, extracting if needed.
 
-        Convenience method that first checks the cache.
+        Convenience method that first checks the cache. Rows without an
+        embedding are queued for background refresh and returned as is.
 
         Args:
             podcast_id: External podcast ID
@@ -318,39 +293,331 @@ class FeatureExtractionService:
             external_id=podcast_id
         ).first()
 
-        if features and features.description_embedding:
+        if features:
+            if not features.description_embedding or is_stale(features.features_computed_at):
+                request_feature_refresh([podcast_id])
             return features
 
-        # Extract if not cached or incomplete
+        # Extract if not cached
         return self.extract_and_store_features(podcast_id)
 
     def batch_extract_features(
         self,
         podcast_ids: List[str],
-        skip_existing: bool = True
+        skip_existing: bool = True,
+        batch_size: Optional[int] = None,
+        max_workers: Optional[int] = None
     ) -> Dict[str, PodcastFeatures]:
-        """Extract features for multiple podcasts.
+        """Extract features for multiple podcasts in batches.
+
+        Pipeline per batch:
+        1. Fetch podcast metadata and episode stats concurrently
+        2. Encode descriptions in mini-batches through the sentence-transformer
+        3. Bulk-upsert PodcastFeatures rows in a single transaction
 
         Args:
             podcast_ids: List of podcast IDs to process
             skip_existing: Skip podcasts that already have features
+            batch_size: Podcasts per upsert transaction (default UPSERT_BATCH_SIZE)
+            max_workers: Concurrent API fetches (default FETCH_WORKERS)
 
         Returns:
             Dict mapping podcast_id to PodcastFeatures
         """
-        results = {}
-
-        for podcast_id in podcast_ids:
-            if skip_existing:
-                existing = self.db.query(PodcastFeatures).filter_by(
-                    external_id=podcast_id
-                ).first()
-                if existing and existing.description_embedding:
-                    results[podcast_id] = existing
+        batch_size = batch_size or self.UPSERT_BATCH_SIZE
+        max_workers = max_workers or self.FETCH_WORKERS
+
+        # Dedupe while preserving order
+        podcast_ids = list(dict.fromkeys(str(pid) for pid in podcast_ids if pid))
+        results: Dict[str, PodcastFeatures] = {}
+
+        if skip_existing and podcast_ids:
+            existing = self.db.query(PodcastFeatures).filter(
+                PodcastFeatures.external_id.in_(podcast_ids),
+                PodcastFeatures.description_embedding.isnot(None)
+            ).all()
+            for features in existing:
+                results[features.external_id] = features
+            podcast_ids = [pid for pid in podcast_ids if pid not in results]
+
+        if not podcast_ids:
+            return results
+
+        started = time.monotonic()
+        processed = 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for offset in range(0, len(podcast_ids), batch_size):
+                batch_ids = podcast_ids[offset:offset + batch_size]
+
+                fetched = [
+                    (pid, podcast_data, episodes)
+                    for pid, (podcast_data, episodes) in zip(
+                        batch_ids, executor.map(self._fetch_podcast_bundle, batch_ids)
+                    )
+                    if podcast_data
+                ]
+                if not fetched:
                     continue
 
-            features = self.extract_and_store_features(podcast_id)
-            if features:
-                results[podcast_id] = features
+                rows = [
+                    self._build_feature_row(pid, podcast_data, self._compute_episode_stats(episodes))
+                    for pid, podcast_data, episodes in fetched
+                ]
+                self._embed_rows(rows)
+                self._bulk_upsert_features(rows)
+                processed += len(rows)
+
+                # Episodes from the same responses become episode features
+                self._store_episode_rows([
+                    episode_row
+                    for row, (pid, _, episodes) in zip(rows, fetched)
+                    for episode_row in self._build_episode_rows(pid, episodes, row['artwork'])
+                ])
+
+                elapsed = time.monotonic() - started
+                logger.info(
+                    f"Feature batch {offset // batch_size + 1}: {len(rows)}/{len(batch_ids)} podcasts "
+                    f"({processed / elapsed if elapsed else 0.0:.1f} podcasts/s overall)"
+                )
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Batch feature extraction finished: {processed} podcasts in {elapsed:.1f}s "
+            f"({processed / elapsed if elapsed else 0.0:.1f} podcasts/s)"
+        )
+
+        stored = self.db.query(PodcastFeatures).filter(
+            PodcastFeatures.external_id.in_(podcast_ids)
+        ).all()
+        for features in stored:
+            results[features.external_id] = features
 
         return results
+
+    def _fetch_podcast_bundle(
+        self,
+        podcast_id: str
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Fetch podcast metadata and recent episodes (runs in a worker thread).
+
+        Args:
+            podcast_id: External podcast ID
+
+        Returns:
+            Tuple of (podcast data or None, episode dicts)
+        """
+        podcast_data = self._fetch_podcast_data(podcast_id)
+        if not podcast_data:
+            return None, []
+        return podcast_data, self._fetch_episodes(podcast_id)
+
+    def _build_feature_row(
+        self,
+        podcast_id: str,
+        podcast_data: Dict[str, Any],
+        episode_stats: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Map Podcast Index data to a podcast_features row for bulk upsert.
+
+        The description embedding is filled in later by _embed_rows.
+        """
+        now = datetime.utcnow()
+        categories = podcast_data.get('categories') or {}
+        trend_score = podcast_data.get('trendScore', 0)
+
+        return {
+            'id': uuid.uuid4(),
+            'external_id': podcast_id,
+            'title': podcast_data.get('title', ''),
+            'author': podcast_data.get('author', ''),
+            'description': podcast_data.get('description', ''),
+            'artwork': self._fix_image_url(podcast_data.get('artwork', '')),
+            'language': podcast_data.get('language', 'en'),
+            'categories': categories,
+            'episode_count': podcast_data.get('episodeCount', 0),
+            'category_vector': self._encode_categories(categories),
+            'description_embedding': None,
+            'avg_episode_duration_seconds': episode_stats.get('avg_duration'),
+            'update_frequency_days': episode_stats.get('update_frequency'),
+            'popularity_score': min(1.0, trend_score / 100.0) if trend_score else 0.0,
+            'last_fetched_at': now,
+            'features_computed_at': now,
+            'created_at': now,
+            'updated_at': now,
+        }
+
+    def _embed_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """Compute description embeddings for rows in mini-batches (in place)."""
+        model = self.embedding_model
+        if model is None:
+            return
+
+        to_embed = [row for row in rows if row['description']]
+        for offset in range(0, len(to_embed), self.EMBEDDING_BATCH_SIZE):
+            chunk = to_embed[offset:offset + self.EMBEDDING_BATCH_SIZE]
+            texts = [row['description'][:self.MAX_DESCRIPTION_CHARS] for row in chunk]
+            try:
+                embeddings = model.encode(texts, batch_size=self.EMBEDDING_BATCH_SIZE)
+            except Exception as e:
+                logger.error(f"Error computing embeddings for batch of {len(chunk)} podcasts: {e}")
+                continue
+            for row, embedding in zip(chunk, embeddings):
+                row['description_embedding'] = embedding.tolist()
+
+    def _bulk_upsert_features(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert or update podcast_features rows in a single transaction.
+
+        Existing rows keep their id and created_at; a missing embedding never
+        overwrites one that is already stored.
+        """
+        stmt = pg_insert(PodcastFeatures.__table__).values(rows)
+        excluded = stmt.excluded
+        update_columns = {
+            column: excluded[column]
+            for column in rows[0].keys()
+            if column not in ('id', 'external_id', 'created_at', 'description_embedding')
+        }
+        update_columns['description_embedding'] = func.coalesce(
+            excluded.description_embedding,
+            PodcastFeatures.__table__.c.description_embedding
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['external_id'],
+            set_=update_columns
+        )
+
+        try:
+            self.db.execute(stmt)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def store_episode_features(
+        self,
+        podcast_id: str,
+        episodes: List[Dict[str, Any]],
+        fallback_image: Optional[str] = None
+    ) -> int:
+        """Embed and store episode features from an episodes/byfeedid response.
+
+        Args:
+            podcast_id: External podcast ID the episodes belong to
+            episodes: Episode dicts as returned by Podcast Index
+            fallback_image: Image to use for episodes without their own
+
+        Returns:
+            Number of episodes stored
+        """
+        return self._store_episode_rows(
+            self._build_episode_rows(podcast_id, episodes, fallback_image)
+        )
+
+    def _build_episode_rows(
+        self,
+        podcast_id: str,
+        episodes: List[Dict[str, Any]],
+        fallback_image: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Map Podcast Index episodes to episode_features rows for bulk upsert.
+
+        Embeddings are filled in later by _embed_episode_rows.
+        """
+        now = datetime.utcnow()
+        rows = []
+        for episode in episodes:
+            episode_id = episode.get('id')
+            if not episode_id:
+                continue
+            published = episode.get('datePublished')
+            duration = episode.get('duration')
+            rows.append({
+                'id': uuid.uuid4(),
+                'external_id': str(episode_id),
+                'podcast_external_id': podcast_id,
+                'title': episode.get('title', ''),
+                'description': episode.get('description', ''),
+                'image': self._fix_image_url(
+                    episode.get('image') or episode.get('feedImage') or fallback_image or ''
+                ),
+                'enclosure_url': episode.get('enclosureUrl'),
+                'published_at': datetime.utcfromtimestamp(published) if published else None,
+                'duration_seconds': int(duration) if duration and duration > 0 else None,
+                'title_embedding': None,
+                'description_embedding': None,
+                'features_computed_at': now,
+                'created_at': now,
+                'updated_at': now,
+            })
+        return rows
+
+    def _store_episode_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """Embed new episodes and bulk-upsert all rows.
+
+        Episodes that already have embeddings are not re-encoded; their
+        metadata is still refreshed.
+        """
+        rows = list({row['external_id']: row for row in rows}.values())
+        if not rows:
+            return 0
+
+        embedded = {
+            external_id for (external_id,) in self.db.query(EpisodeFeatures.external_id).filter(
+                EpisodeFeatures.external_id.in_([row['external_id'] for row in rows]),
+                EpisodeFeatures.title_embedding.isnot(None)
+            ).all()
+        }
+        self._embed_episode_rows([row for row in rows if row['external_id'] not in embedded])
+
+        for offset in range(0, len(rows), self.EPISODE_UPSERT_CHUNK):
+            self._bulk_upsert_episodes(rows[offset:offset + self.EPISODE_UPSERT_CHUNK])
+        return len(rows)
+
+    def _embed_episode_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """Compute title and description embeddings in mini-batches (in place)."""
+        model = self.embedding_model
+        if model is None:
+            return
+
+        for source, target in (('title', 'title_embedding'), ('description', 'description_embedding')):
+            to_embed = [row for row in rows if row[source]]
+            for offset in range(0, len(to_embed), self.EMBEDDING_BATCH_SIZE):
+                chunk = to_embed[offset:offset + self.EMBEDDING_BATCH_SIZE]
+                texts = [row[source][:self.MAX_DESCRIPTION_CHARS] for row in chunk]
+                try:
+                    embeddings = model.encode(texts, batch_size=self.EMBEDDING_BATCH_SIZE)
+                except Exception as e:
+                    logger.error(f"Error computing {source} embeddings for {len(chunk)} episodes: {e}")
+                    continue
+                for row, embedding in zip(chunk, embeddings):
+                    row[target] = embedding.tolist()
+
+    def _bulk_upsert_episodes(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert or update episode_features rows in a single transaction.
+
+        Existing rows keep their id and created_at; missing embeddings never
+        overwrite stored ones.
+        """
+        table = EpisodeFeatures.__table__
+        stmt = pg_insert(table).values(rows)
+        excluded = stmt.excluded
+        embedding_columns = ('title_embedding', 'description_embedding')
+        update_columns = {
+            column: excluded[column]
+            for column in rows[0].keys()
+            if column not in ('id', 'external_id', 'created_at') + embedding_columns
+        }
+        for column in embedding_columns:
+            update_columns[column] = func.coalesce(excluded[column], table.c[column])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['external_id'],
+            set_=update_columns
+        )
+
+        try:
+            self.db.execute(stmt)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
@@ -0,0 +1,213 @@
+"""Priority-driven background refresh of podcast features.
+
+Stale or missing PodcastFeatures rows are refreshed by Celery workers in
+priority order, staleness x demand, instead of inline on whatever request
+happens to touch them. Request paths only record demand (non-blocking) and
+keep reading the row they have.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.cache import CACHE_KEY_PREFIX, get_redis
+
+logger = logging.getLogger(__name__)
+
+# Features older than this are stale
+FEATURE_TTL_HOURS = float(os.getenv('FEATURE_REFRESH_TTL_HOURS', '24'))
+# Podcasts refreshed per run of the refresh task (runs every minute)
+REFRESH_BATCH_SIZE = int(os.getenv('FEATURE_REFRESH_BATCH_SIZE', '100'))
+# Stale podcasts queued per planning pass
+REFRESH_PLAN_SIZE = int(os.getenv('FEATURE_REFRESH_PLAN_SIZE', '5000'))
+# A podcast with no features yet ranks like one this many TTLs stale
+MISSING_STALENESS = 4.0
+# Listening/interaction history counted as demand
+DEMAND_LOOKBACK_DAYS = 30
+
+
+class FeatureRefreshQueue:
+    """Priority queue of podcast IDs to refresh, highest priority first.
+
+    A Redis sorted set shared by web and worker processes; falls back to an
+    in-process dict when Redis is unavailable.
+    """
+
+    KEY = f"{CACHE_KEY_PREFIX}feature_refresh:queue"
+
+    def __init__(self):
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def push(self, priorities: Dict[str, float]) -> None:
+        """Queue podcasts; an already queued podcast keeps the higher priority."""
+        if not priorities:
+            return
+        client = get_redis()
+        if client is not None:
+            try:
+                client.zadd(self.KEY, priorities, gt=True)
+                return
+            except Exception as e:
+                logger.warning(f"Redis zadd failed for feature refresh queue: {e}")
+        with self._lock:
+            for pid, priority in priorities.items():
+                self._local[pid] = max(priority, self._local.get(pid, 0.0))
+
+    def bump(self, podcast_ids: Iterable[str], amount: float) -> None:
+        """Add demand to podcasts (queueing them if absent)."""
+        podcast_ids = list(podcast_ids)
+        if not podcast_ids:
+            return
+        client = get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for pid in podcast_ids:
+                    pipe.zincrby(self.KEY, amount, pid)
+                pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Redis zincrby failed for feature refresh queue: {e}")
+        with self._lock:
+            for pid in podcast_ids:
+                self._local[pid] = self._local.get(pid, 0.0) + amount
+
+    def pop(self, count: int) -> List[Tuple[str, float]]:
+        """Remove and return up to `count` (podcast_id, priority), best first."""
+        client = get_redis()
+        if client is not None:
+            try:
+                return [
+                    (pid.decode() if isinstance(pid, bytes) else pid, priority)
+                    for pid, priority in client.zpopmax(self.KEY, count)
+                ]
+            except Exception as e:
+                logger.warning(f"Redis zpopmax failed for feature refresh queue: {e}")
+        with self._lock:
+            best = sorted(self._local.items(), key=lambda item: item[1], reverse=True)[:count]
+            for pid, _ in best:
+                del self._local[pid]
+            return best
+
+    def __len__(self) -> int:
+        client = get_redis()
+        if client is not None:
+            try:
+                return int(client.zcard(self.KEY))
+            except Exception as e:
+                logger.warning(f"Redis zcard failed for feature refresh queue: {e}")
+        with self._lock:
+            return len(self._local)
+
+
+feature_refresh_queue = FeatureRefreshQueue()
+
+
+def request_feature_refresh(podcast_ids: Iterable[str], missing: bool = False) -> None:
+    """Record request-time demand for podcasts with stale or missing features.
+
+    Never blocks on Podcast Index: the podcasts are refreshed by the next
+    refresh_stale_features run, ahead of ones nobody asked for.
+
+    Args:
+        podcast_ids: External podcast IDs
+        missing: True if the podcasts have no feature row at all
+    """
+    feature_refresh_queue.bump(
+        (str(pid) for pid in podcast_ids if pid),
+        MISSING_STALENESS if missing else 1.0
+    )
+
+
+def is_stale(computed_at) -> bool:
+    """Whether features computed at `computed_at` are due for a refresh."""
+    if computed_at is None:
+        return True
+    return datetime.utcnow() - computed_at > timedelta(hours=FEATURE_TTL_HOURS)
+
+
+# Demand = distinct users whose cached recommendations, saves or recent
+# listening/interactions reference a podcast
+_PLAN_SQL = text("""
+    WITH refs AS (
+        SELECT unnest(podcast_ids) AS podcast_id, user_id
+        FROM recommendation_cache WHERE expires_at > :now
+        UNION ALL
+        SELECT external_id, user_id FROM saved_podcasts
+        UNION ALL
+        SELECT podcast_external_id, user_id FROM listening_sessions WHERE started_at >= :since
+        UNION ALL
+        SELECT podcast_external_id, user_id FROM podcast_interactions WHERE interaction_timestamp >= :since
+    ),
+    demand AS (
+        SELECT podcast_id, count(DISTINCT user_id) AS users FROM refs GROUP BY podcast_id
+    )
+    SELECT
+        COALESCE(f.external_id, d.podcast_id) AS podcast_id,
+        CASE
+            WHEN f.features_computed_at IS NULL THEN :missing
+            ELSE EXTRACT(EPOCH FROM (:now - f.features_computed_at)) / 3600.0 / :ttl_hours
+        END * (1 + COALESCE(d.users, 0)) AS priority
+    FROM podcast_features f
+    FULL OUTER JOIN demand d ON d.podcast_id = f.external_id
+    WHERE f.external_id IS NULL
+        OR f.features_computed_at IS NULL
+        OR f.features_computed_at < :cutoff
+    ORDER BY priority DESC
+    LIMIT :limit
+""")
+
+
+def plan_feature_refresh(db: Session, limit: int = REFRESH_PLAN_SIZE) -> int:
+    """Queue the most urgent stale or missing podcasts by staleness x demand.
+
+    Returns:
+        Number of podcasts queued
+    """
+    now = datetime.utcnow()
+    rows = db.execute(_PLAN_SQL, {
+        'now': now,
+        'since': now - timedelta(days=DEMAND_LOOKBACK_DAYS),
+        'cutoff': now - timedelta(hours=FEATURE_TTL_HOURS),
+        'ttl_hours': FEATURE_TTL_HOURS,
+        'missing': MISSING_STALENESS,
+        'limit': limit,
+    }).all()
+
+    feature_refresh_queue.push({pid: float(priority) for pid, priority in rows if pid})
+    return len(rows)
+
+
+def refresh_next_batch(db: Session, batch_size: int = REFRESH_BATCH_SIZE) -> int:
+    """Refresh the highest-priority queued podcasts through the batch pipeline.
+
+    Podcasts are re-queued with their priority if the batch fails.
+
+    Returns:
+        Number of podcasts refreshed
+    """
+    from app.services.feature_extraction_service import FeatureExtractionService
+
+    batch = feature_refresh_queue.pop(batch_size)
+    if not batch:
+        return 0
+
+    try:
+        refreshed = FeatureExtractionService(db).batch_extract_features(
+            [pid for pid, _ in batch],
+            skip_existing=False
+        )
+    except Exception:
+        feature_refresh_queue.push(dict(batch))
+        raise
+
+    return sum(
+        1 for pid, _ in batch
+        if pid in refreshed and not is_stale(refreshed[pid].features_computed_at)
+    )
@@ -0,0 +1,197 @@
+"""Per-user podcast interaction state: liked, disliked, saved, listened sets.
+
+Recommendation filtering needs these sets on every computation. They are
+cached per user (Redis sets shared by all workers, or an in-process entry
+when Redis is unavailable) and kept current write-through by the code that
+records interactions, listening sessions and library saves, so reads are
+one Redis round trip and no database queries. A miss loads all sets with
+three queries.
+
+Writers add to the Redis sets whether or not the user's state is loaded,
+and loads merge with what is already there, so a write racing a load is
+never lost.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Set
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.cache import CACHE_KEY_PREFIX, LocalTTLCache, get_redis
+from app.models.podcast_recommendation import (
+    InteractionType,
+    ListeningDailyRollup,
+    ListeningSession,
+    PodcastInteraction,
+)
+from app.models.saved_media import SavedPodcast
+from app.services.listening_rollups import UNROLLED_SESSION_WINDOW
+from app.services.partitions import recent_range
+
+logger = logging.getLogger(__name__)
+
+STATE_TTL_SECONDS = int(os.getenv('INTERACTION_STATE_TTL_SECONDS', str(6 * 3600)))
+# Without Redis, other workers' writes aren't seen; keep local entries short-lived
+LOCAL_TTL_SECONDS = 60
+
+KINDS = ('liked', 'disliked', 'saved', 'listened', 'interacted')
+
+
+@dataclass
+class InteractionState:
+    """A user's podcast sets (external podcast IDs)."""
+    liked: Set[str] = field(default_factory=set)
+    disliked: Set[str] = field(default_factory=set)
+    saved: Set[str] = field(default_factory=set)
+    listened: Set[str] = field(default_factory=set)
+    interacted: Set[str] = field(default_factory=set)  # Any explicit interaction
+
+    @property
+    def interacted_ids(self) -> Set[str]:
+        """Podcasts listened to, saved or interacted with."""
+        return self.listened | self.saved | self.interacted
+
+
+class InteractionStateCache:
+    """Write-through cache of InteractionState per user."""
+
+    def __init__(self):
+        self._local = LocalTTLCache(maxsize=10000)
+        self._lock = threading.Lock()
+
+    def _key(self, user_id, kind: str) -> str:
+        return f"{CACHE_KEY_PREFIX}interaction_state:{user_id}:{kind}"
+
+    def get(self, db: Session, user_id: UUID) -> InteractionState:
+        """The user's state, loaded from the database on a miss."""
+        client = get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                pipe.exists(self._key(user_id, 'loaded'))
+                for kind in KINDS:
+                    pipe.smembers(self._key(user_id, kind))
+                loaded, *members = pipe.execute()
+                cached = InteractionState(**{
+                    kind: {m.decode() if isinstance(m, bytes) else m for m in values}
+                    for kind, values in zip(KINDS, members)
+                })
+                if loaded:
+                    return cached
+                state = self._load(db, user_id)
+                self._store_redis(client, user_id, state)
+                return InteractionState(**{
+                    kind: getattr(state, kind) | getattr(cached, kind) for kind in KINDS
+                })
+            except Exception as e:
+                logger.warning(f"Redis read failed for interaction state of user {user_id}: {e}")
+
+        key = str(user_id)
+        state = self._local.get(key)
+        if state is None:
+            state = self._load(db, user_id)
+            self._local.set(key, state, LOCAL_TTL_SECONDS)
+        return state
+
+    def add(self, user_id: UUID, kind: str, podcast_ids: Iterable[str]) -> None:
+        """Record podcasts in one of the user's sets (after the DB commit)."""
+        self._update(user_id, kind, {pid for pid in podcast_ids if pid}, remove=False)
+
+    def remove(self, user_id: UUID, kind: str, podcast_ids: Iterable[str]) -> None:
+        """Drop podcasts from one of the user's sets (after the DB commit)."""
+        self._update(user_id, kind, {pid for pid in podcast_ids if pid}, remove=True)
+
+    def record_interaction(self, user_id: UUID, podcast_id: str, interaction_type: InteractionType) -> None:
+        """Write-through for a recorded PodcastInteraction."""
+        self.add(user_id, 'interacted', [podcast_id])
+        if interaction_type == InteractionType.like:
+            self.add(user_id, 'liked', [podcast_id])
+        elif interaction_type == InteractionType.dislike:
+            self.add(user_id, 'disliked', [podcast_id])
+
+    def _update(self, user_id: UUID, kind: str, podcast_ids: Set[str], remove: bool) -> None:
+        if not podcast_ids:
+            return
+        client = get_redis()
+        if client is not None:
+            try:
+                key = self._key(user_id, kind)
+                pipe = client.pipeline()
+                if remove:
+                    pipe.srem(key, *podcast_ids)
+                else:
+                    pipe.sadd(key, *podcast_ids)
+                pipe.expire(key, STATE_TTL_SECONDS)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Redis write failed for interaction state of user {user_id}: {e}")
+                self.invalidate(user_id)
+
+        with self._lock:
+            state = self._local.get(str(user_id))
+            if state is not None:
+                values = getattr(state, kind)
+                if remove:
+                    values.difference_update(podcast_ids)
+                else:
+                    values.update(podcast_ids)
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Forget the user's state; the next read reloads it."""
+        client = get_redis()
+        if client is not None:
+            try:
+                client.delete(self._key(user_id, 'loaded'), *(self._key(user_id, k) for k in KINDS))
+            except Exception as e:
+                logger.warning(f"Redis delete failed for interaction state of user {user_id}: {e}")
+        self._local.delete(str(user_id))
+
+    def _store_redis(self, client, user_id: UUID, state: InteractionState) -> None:
+        pipe = client.pipeline()
+        for kind in KINDS:
+            values = getattr(state, kind)
+            if values:
+                pipe.sadd(self._key(user_id, kind), *values)
+                pipe.expire(self._key(user_id, kind), STATE_TTL_SECONDS)
+        pipe.set(self._key(user_id, 'loaded'), 1, ex=STATE_TTL_SECONDS)
+        pipe.execute()
+
+    def _load(self, db: Session, user_id: UUID) -> InteractionState:
+        """Build the state from the database (3 queries)."""
+        state = InteractionState()
+        interactions = db.query(
+            PodcastInteraction.podcast_external_id,
+            PodcastInteraction.interaction_type,
+        ).filter(PodcastInteraction.user_id == user_id).distinct()
+        for podcast_id, interaction_type in interactions:
+            state.interacted.add(podcast_id)
+            if interaction_type == InteractionType.like:
+                state.liked.add(podcast_id)
+            elif interaction_type == InteractionType.dislike:
+                state.disliked.add(podcast_id)
+
+        state.saved = {
+            row[0] for row in db.query(SavedPodcast.external_id).filter(SavedPodcast.user_id == user_id)
+        }
+
+        # Rollups, plus raw sessions too recent to be rolled up yet (bounded
+        # on both sides so only the current partitions are scanned)
+        lower, upper = recent_range(UNROLLED_SESSION_WINDOW)
+        listened = db.query(ListeningSession.podcast_external_id).filter(
+            ListeningSession.user_id == user_id,
+            ListeningSession.started_at >= lower,
+            ListeningSession.started_at < upper
+        ).union(
+            db.query(ListeningDailyRollup.podcast_external_id).filter(
+                ListeningDailyRollup.user_id == user_id
+            )
+        )
+        state.listened = {row[0] for row in listened}
+        return state
+
+
+interaction_state = InteractionStateCache()
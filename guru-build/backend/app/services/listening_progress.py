@@ -0,0 +1,387 @@
+"""Write-behind buffer for listening-session progress heartbeats.
+
+Progress updates arrive every ~30 seconds per listener. Instead of a SELECT
+and a COMMIT per heartbeat, the latest state per session is kept in a
+buffer (a Redis hash shared by all web workers, or an in-process map when
+Redis is unavailable) and flushed periodically with a single
+UPDATE ... FROM (VALUES ...) statement.
+
+LISTENING_PROGRESS_FLUSH_SECONDS bounds how much progress can be lost if
+the buffer's holder crashes: with Redis, the flush task runs at that
+interval; in-process, a daemon thread does, and a heartbeat that finds the
+buffer older than the bound flushes it inline. 0 disables buffering.
+
+listening_sessions is partitioned on started_at, so buffered states carry
+the session's started_at and every lookup or UPDATE by session ID is also
+bounded on it, touching only the partitions those sessions are in.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import DateTime, Float, Integer, String, cast, column, func, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.cache import CACHE_KEY_PREFIX, SharedCache, get_redis
+from app.models.podcast_recommendation import ListeningSession
+from app.services.partitions import recent_range
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SECONDS = float(os.getenv('LISTENING_PROGRESS_FLUSH_SECONDS', '15'))
+FLUSH_CHUNK_SIZE = 1000  # Sessions per UPDATE statement
+
+# Sessions still reporting progress started within this window; lookups
+# by ID search it first and older partitions only for IDs not found there
+ACTIVE_SESSION_WINDOW = timedelta(days=2)
+
+# Owner, duration and start per session, so heartbeats need no SELECT
+SESSION_META_TTL_SECONDS = 12 * 3600
+session_meta_cache = SharedCache('listening_session_meta', default_ttl=SESSION_META_TTL_SECONDS)
+
+# Buffered fields; None means "not reported yet, keep the stored value"
+PROGRESS_FIELDS = (
+    'listened_duration_seconds',
+    'completion_rate',
+    'pause_count',
+    'seek_forward_count',
+    'seek_backward_count',
+    'playback_speed',
+)
+
+
+def _merge(older: Optional[Dict[str, Any]], newer: Dict[str, Any]) -> Dict[str, Any]:
+    """Latest state wins, but fields the newer heartbeat omitted are kept."""
+    if not older:
+        return newer
+    return {**older, **{k: v for k, v in newer.items() if v is not None}}
+
+
+class ListeningProgressBuffer:
+    """Coalescing buffer of the latest progress per listening session."""
+
+    KEY = f"{CACHE_KEY_PREFIX}listening_progress:pending"
+
+    def __init__(self, flush_seconds: float = FLUSH_SECONDS):
+        self.flush_seconds = flush_seconds
+        self._local: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._oldest_local: Optional[float] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._stats = {'buffered': 0, 'flushed': 0, 'flushes': 0, 'last_flush_ms': 0.0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.flush_seconds > 0
+
+    def record(self, session_id: UUID, state: Dict[str, Any]) -> None:
+        """Buffer the latest progress for a session (replacing older state)."""
+        key = str(session_id)
+        client = get_redis()
+        if client is not None:
+            try:
+                older = client.hget(self.KEY, key)
+                merged = _merge(json.loads(older) if older else None, state)
+                client.hset(self.KEY, key, json.dumps(merged))
+                self._count('buffered')
+                return
+            except Exception as e:
+                logger.warning(f"Redis buffer write failed for listening progress: {e}")
+
+        with self._lock:
+            self._local[key] = _merge(self._local.get(key), state)
+            if self._oldest_local is None:
+                self._oldest_local = time.monotonic()
+            overdue = time.monotonic() - self._oldest_local > self.flush_seconds
+            self._stats['buffered'] += 1
+        self._ensure_local_flusher()
+
+        if overdue:
+            # The flusher thread fell behind; don't let unflushed data grow
+            self.flush_with_new_session()
+
+    def pop(self, session_id: UUID) -> Optional[Dict[str, Any]]:
+        """Remove and return the buffered state of one session."""
+        key = str(session_id)
+        client = get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline()  # MULTI: read and delete atomically
+                pipe.hget(self.KEY, key)
+                pipe.hdel(self.KEY, key)
+                raw = pipe.execute()[0]
+                if raw:
+                    return json.loads(raw)
+            except Exception as e:
+                logger.warning(f"Redis buffer pop failed for listening progress: {e}")
+
+        with self._lock:
+            return self._local.pop(key, None)
+
+    def drain(self) -> Dict[str, Dict[str, Any]]:
+        """Remove and return every buffered state."""
+        drained: Dict[str, Dict[str, Any]] = {}
+        client = get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline()  # MULTI: read and delete atomically
+                pipe.hgetall(self.KEY)
+                pipe.delete(self.KEY)
+                raw = pipe.execute()[0]
+                drained = {
+                    (k.decode() if isinstance(k, bytes) else k): json.loads(v)
+                    for k, v in raw.items()
+                }
+            except Exception as e:
+                logger.warning(f"Redis buffer drain failed for listening progress: {e}")
+
+        with self._lock:
+            for key, state in self._local.items():
+                drained[key] = _merge(drained.get(key), state)
+            self._local.clear()
+            self._oldest_local = None
+        return drained
+
+    def restore(self, states: Dict[str, Dict[str, Any]]) -> None:
+        """Put drained states back after a failed flush; newer states win."""
+        for key, state in states.items():
+            client = get_redis()
+            if client is not None:
+                try:
+                    client.hsetnx(self.KEY, key, json.dumps(state))
+                    continue
+                except Exception:
+                    pass
+            with self._lock:
+                self._local.setdefault(key, state)
+                if self._oldest_local is None:
+                    self._oldest_local = time.monotonic()
+
+    def flush(self, db: Session) -> int:
+        """Write every buffered state with UPDATE ... FROM (VALUES ...).
+
+        Returns:
+            Number of sessions written
+        """
+        states = self.drain()
+        if not states:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            rows = [
+                (key, started_at, *(state.get(field) for field in PROGRESS_FIELDS), None)
+                for key, (started_at, state) in _with_started_at(db, states).items()
+            ]
+            for offset in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                db.execute(progress_update_statement(rows[offset:offset + FLUSH_CHUNK_SIZE]))
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.restore(states)
+            raise
+
+        with self._lock:
+            self._stats['flushed'] += len(rows)
+            self._stats['flushes'] += 1
+            self._stats['last_flush_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return len(rows)
+
+    def flush_with_new_session(self) -> int:
+        """Flush using a short-lived database session (for threads and tasks)."""
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return self.flush(db)
+        except Exception as e:
+            logger.error(f"Error flushing listening progress: {e}", exc_info=True)
+            return 0
+        finally:
+            db.close()
+
+    def _ensure_local_flusher(self) -> None:
+        """Start the in-process flusher thread (no-Redis fallback) once."""
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(
+                target=self._run_local_flusher, name="listening-progress-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _run_local_flusher(self) -> None:
+        while True:
+            time.sleep(self.flush_seconds)
+            with self._lock:
+                pending = bool(self._local)
+            if pending:
+                self.flush_with_new_session()
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of buffer metrics for this process."""
+        with self._lock:
+            local_pending = len(self._local)
+            stats = dict(self._stats)
+        pending = local_pending
+        client = get_redis()
+        if client is not None:
+            try:
+                pending += int(client.hlen(self.KEY))
+            except Exception:
+                pass
+        return {
+            'enabled': self.enabled,
+            'flush_seconds': self.flush_seconds,
+            'pending_sessions': pending,
+            **stats,
+        }
+
+
+def _with_started_at(db: Session, states: Dict[str, Dict[str, Any]]) -> Dict[str, tuple]:
+    """Pair buffered states with their session's started_at.
+
+    States buffered without it (before started_at was buffered) are looked
+    up; states of sessions that no longer exist are dropped.
+    """
+    paired = {
+        key: (datetime.fromisoformat(state['started_at']), state)
+        for key, state in states.items() if state.get('started_at')
+    }
+    missing = [UUID(key) for key in states if key not in paired]
+    if missing:
+        query = db.query(ListeningSession.id, ListeningSession.started_at)
+        for row in sessions_by_id(query, missing):
+            paired[str(row.id)] = (row.started_at, states[str(row.id)])
+    return paired
+
+
+def sessions_by_id(query, session_ids: Iterable[UUID]) -> list:
+    """Rows of a ListeningSession query for the given session IDs.
+
+    IDs carry no partition key, so sessions are looked up among those
+    started within ACTIVE_SESSION_WINDOW first (the partitions of the
+    current month or two), and only IDs not found there in older partitions.
+
+    Args:
+        query: Query selecting ListeningSession (or columns including its id)
+        session_ids: Sessions to find
+
+    Returns:
+        Matching rows, in no particular order
+    """
+    session_ids = set(session_ids)
+    if not session_ids:
+        return []
+    lower, upper = recent_range(ACTIVE_SESSION_WINDOW)
+    rows = query.filter(
+        ListeningSession.id.in_(session_ids),
+        ListeningSession.started_at >= lower,
+        ListeningSession.started_at < upper
+    ).all()
+    missing = session_ids - {row.id for row in rows}
+    if missing:
+        rows += query.filter(
+            ListeningSession.id.in_(missing),
+            ListeningSession.started_at < lower
+        ).all()
+    return rows
+
+
+def progress_update_statement(rows: List[tuple]):
+    """UPDATE listening_sessions FROM (VALUES ...) for many sessions at once.
+
+    Rows are matched on the full primary key, and the statement is bounded
+    by the rows' oldest and newest started_at so that only the partitions
+    holding them are scanned.
+
+    Args:
+        rows: (session_id, started_at, *PROGRESS_FIELDS, ended_at) tuples;
+            None values keep the stored column value
+    """
+    starts = [row[1] for row in rows]
+    v = values(
+        column('id', String),
+        column('started_at', DateTime),
+        column('listened_duration_seconds', Integer),
+        column('completion_rate', Float),
+        column('pause_count', Integer),
+        column('seek_forward_count', Integer),
+        column('seek_backward_count', Integer),
+        column('playback_speed', Float),
+        column('ended_at', DateTime),
+        name='progress',
+    ).data(rows)
+
+    table = ListeningSession.__table__
+    return (
+        update(table)
+        .where(
+            table.c.id == cast(v.c.id, PG_UUID(as_uuid=True)),
+            table.c.started_at == cast(v.c.started_at, table.c.started_at.type),
+            table.c.started_at >= min(starts),
+            table.c.started_at <= max(starts),
+        )
+        .values(
+            updated_at=datetime.utcnow(),
+            **{
+                field: func.coalesce(cast(v.c[field], table.c[field].type), table.c[field])
+                for field in PROGRESS_FIELDS + ('ended_at',)
+            },
+        )
+    )
+
+
+def remember_session(
+    session_id: UUID,
+    user_id: UUID,
+    duration_seconds: Optional[int],
+    started_at: datetime
+) -> None:
+    """Cache a new session's owner, duration and start for buffered heartbeats."""
+    session_meta_cache.set(str(session_id), _session_meta(user_id, duration_seconds, started_at))
+
+
+def _session_meta(user_id: UUID, duration_seconds: Optional[int], started_at: datetime) -> Dict[str, Any]:
+    return {
+        'user_id': str(user_id),
+        'duration': duration_seconds,
+        'started_at': started_at.isoformat(),
+    }
+
+
+def get_session_meta(db: Session, session_id: UUID) -> Optional[Dict[str, Any]]:
+    """Owner, duration and start of a session: cached, else a SELECT (then cached)."""
+    meta = session_meta_cache.get(str(session_id))
+    if meta is not None and 'started_at' in meta:
+        return meta
+
+    rows = sessions_by_id(db.query(
+        ListeningSession.id,
+        ListeningSession.user_id,
+        ListeningSession.episode_duration_seconds,
+        ListeningSession.started_at,
+    ), [session_id])
+    if not rows:
+        return None
+
+    row = rows[0]
+    meta = _session_meta(row.user_id, row.episode_duration_seconds, row.started_at)
+    session_meta_cache.set(str(session_id), meta)
+    return meta
+
+
+listening_progress_buffer = ListeningProgressBuffer()
@@ -0,0 +1,239 @@
+"""Incremental daily rollups of listening sessions, and raw-row retention.
+
+listening_daily_rollups holds one row per (user, podcast, day) aggregated
+from listening_sessions. The rollup job only looks at sessions updated
+since its watermark (new, progressed or ended sessions) and recomputes the
+(user, podcast, day) keys they touch with one INSERT ... SELECT ... ON
+CONFLICT DO UPDATE, so a run costs O(recent activity), not O(history).
+
+Raw sessions older than LISTENING_SESSION_RETENTION_DAYS are dropped a
+monthly partition at a time once the rollups cover every session in it.
+Days before the purge watermark (below which raw sessions may be gone) are
+never recomputed, so a rolled-up day is never rebuilt from a partial set of
+sessions; until the first purge, every session is rolled up.
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.podcast_recommendation import JobWatermark, ListeningSession
+from app.services import partitions
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "listening_daily_rollups"
+# Raw sessions started before this watermark may have been purged
+PURGE_WATERMARK_NAME = "listening_sessions_purged"
+# Raw sessions are kept this long (0 = forever)
+RETENTION_DAYS = int(os.getenv('LISTENING_SESSION_RETENTION_DAYS', '180'))
+# Each run advances the watermark at most this far per statement
+ROLLUP_WINDOW = timedelta(hours=6)
+# Re-scan this far behind the watermark: a transaction can commit rows
+# with an updated_at slightly older than a watermark set meanwhile
+ROLLUP_OVERLAP = timedelta(minutes=5)
+
+# A session's podcast reaches the rollups within one job run (5 minutes) of
+# the session being stored; raw sessions older than this are covered by them
+UNROLLED_SESSION_WINDOW = timedelta(days=2)
+
+# Sessions at or above this completion count as engaged listening (profile signal)
+ENGAGED_COMPLETION = 0.3
+
+_ROLLUP_SQL = text("""
+    WITH touched AS (
+        SELECT DISTINCT user_id, podcast_external_id, started_at::date AS day
+        FROM listening_sessions
+        WHERE updated_at > :since AND updated_at <= :until
+            AND started_at >= :retained_from
+            AND (CAST(:user_id AS uuid) IS NULL OR user_id = CAST(:user_id AS uuid))
+    )
+    INSERT INTO listening_daily_rollups (
+        id, user_id, podcast_external_id, day,
+        session_count, ended_session_count, listened_seconds, max_completion,
+        pause_count, seek_forward_count, seek_backward_count,
+        engaged_session_count, engaged_listened_seconds, engagement_weight,
+        created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid(), t.user_id, t.podcast_external_id, t.day,
+        count(*),
+        count(s.ended_at),
+        COALESCE(sum(s.listened_duration_seconds), 0),
+        COALESCE(max(s.completion_rate), 0),
+        COALESCE(sum(s.pause_count), 0),
+        COALESCE(sum(s.seek_forward_count), 0),
+        COALESCE(sum(s.seek_backward_count), 0),
+        count(*) FILTER (WHERE s.completion_rate >= :engaged),
+        COALESCE(sum(s.listened_duration_seconds) FILTER (WHERE s.completion_rate >= :engaged), 0),
+        COALESCE(sum(
+            s.completion_rate * (1 + 0.1 * COALESCE(s.seek_backward_count, 0))
+        ) FILTER (WHERE s.completion_rate >= :engaged), 0),
+        :now, :now
+    FROM touched t
+    JOIN listening_sessions s
+        ON s.user_id = t.user_id
+        AND s.podcast_external_id = t.podcast_external_id
+        AND s.started_at >= t.day
+        AND s.started_at < t.day + 1
+    GROUP BY t.user_id, t.podcast_external_id, t.day
+    ON CONFLICT (user_id, podcast_external_id, day) DO UPDATE SET
+        session_count = EXCLUDED.session_count,
+        ended_session_count = EXCLUDED.ended_session_count,
+        listened_seconds = EXCLUDED.listened_seconds,
+        max_completion = EXCLUDED.max_completion,
+        pause_count = EXCLUDED.pause_count,
+        seek_forward_count = EXCLUDED.seek_forward_count,
+        seek_backward_count = EXCLUDED.seek_backward_count,
+        engaged_session_count = EXCLUDED.engaged_session_count,
+        engaged_listened_seconds = EXCLUDED.engaged_listened_seconds,
+        engagement_weight = EXCLUDED.engagement_weight,
+        updated_at = EXCLUDED.updated_at
+""")
+
+
+def retention_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Start of the oldest month whose raw sessions are kept."""
+    return partitions.retention_cutoff(RETENTION_DAYS, now) or datetime.min
+
+
+def get_watermark(db: Session, name: str = WATERMARK_NAME) -> Optional[datetime]:
+    return db.query(JobWatermark.watermark).filter(JobWatermark.name == name).scalar()
+
+
+def set_watermark(db: Session, watermark: datetime, name: str = WATERMARK_NAME) -> None:
+    """Upsert a job's watermark (committed by the caller)."""
+    now = datetime.utcnow()
+    stmt = pg_insert(JobWatermark.__table__).values(
+        id=uuid4(), name=name, watermark=watermark, created_at=now, updated_at=now
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'watermark': stmt.excluded.watermark, 'updated_at': now},
+    ))
+
+
+def _roll_up(db: Session, since: datetime, until: datetime, user_id: Optional[UUID] = None) -> int:
+    result = db.execute(_ROLLUP_SQL, {
+        'since': since - ROLLUP_OVERLAP,
+        'until': until,
+        'retained_from': get_watermark(db, PURGE_WATERMARK_NAME) or datetime.min,
+        'user_id': str(user_id) if user_id else None,
+        'engaged': ENGAGED_COMPLETION,
+        'now': datetime.utcnow(),
+    })
+    return result.rowcount or 0
+
+
+def roll_up_listening_sessions(db: Session) -> int:
+    """Bring the rollups up to date with sessions changed since the watermark.
+
+    Advances the watermark in ROLLUP_WINDOW steps, committing after each,
+    so a long backlog (e.g. the first run) is processed incrementally.
+
+    Returns:
+        Number of rollup rows written
+    """
+    until = datetime.utcnow()
+    since = get_watermark(db)
+    if since is None:
+        oldest = db.query(ListeningSession.updated_at).order_by(
+            ListeningSession.updated_at.asc()
+        ).limit(1).scalar()
+        if oldest is None:
+            return 0
+        since = oldest - timedelta(microseconds=1)
+
+    written = 0
+    while since < until:
+        step = min(since + ROLLUP_WINDOW, until)
+        try:
+            written += _roll_up(db, since, step)
+            set_watermark(db, step)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        since = step
+
+    return written
+
+
+def roll_up_user_sessions(db: Session, user_id: UUID) -> int:
+    """Fold one user's not-yet-rolled-up sessions into their rollups now.
+
+    Lets request-time readers (profile updates, history summaries) see
+    sessions that ended after the last job run. Leaves the watermark alone.
+
+    Returns:
+        Number of rollup rows written
+    """
+    since = get_watermark(db) or datetime.min + ROLLUP_OVERLAP
+    try:
+        written = _roll_up(db, since, datetime.utcnow(), user_id=user_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return written
+
+
+def purge_expired_sessions(db: Session) -> int:
+    """Drop monthly session partitions past retention.
+
+    A partition is only dropped once the rollups cover all of its rows:
+    none of them changed after the watermark, and every (user, podcast,
+    day) in it has a rollup row counting all of its sessions. Afterwards
+    the purge watermark moves up to the oldest start whose sessions are
+    all still stored.
+
+    Returns:
+        Number of partitions dropped
+    """
+    if RETENTION_DAYS <= 0:
+        return 0
+    watermark = get_watermark(db)
+    if watermark is None:
+        return 0  # Nothing rolled up yet
+    retained_from = get_watermark(db, PURGE_WATERMARK_NAME) or datetime.min
+    covered = {}
+
+    def rolled_up(partition: str) -> bool:
+        covered[partition] = db.execute(text(f"""
+            SELECT NOT EXISTS (
+                SELECT 1 FROM {partition}
+                WHERE updated_at > :watermark AND started_at >= :retained_from
+            ) AND NOT EXISTS (
+                SELECT 1
+                FROM {partition} s
+                LEFT JOIN listening_daily_rollups r
+                    ON r.user_id = s.user_id
+                    AND r.podcast_external_id = s.podcast_external_id
+                    AND r.day = s.started_at::date
+                WHERE s.started_at >= :retained_from
+                GROUP BY s.user_id, s.podcast_external_id, s.started_at::date
+                HAVING count(*) <> COALESCE(max(r.session_count), 0)
+            )
+        """), {'watermark': watermark - ROLLUP_OVERLAP, 'retained_from': retained_from}).scalar()
+        return covered[partition]
+
+    cutoff = retention_cutoff()
+    dropped = partitions.drop_expired_partitions(
+        db, 'listening_sessions', cutoff, can_drop=rolled_up
+    )
+
+    if covered.get(partitions.archive_partition_name('listening_sessions')):
+        # Sessions before the cutoff are gone unless their month was kept
+        months = partitions.list_partitions(db, 'listening_sessions')
+        kept = min(months) if months else None
+        purged_before = min(cutoff, datetime(kept.year, kept.month, 1)) if kept else cutoff
+        if purged_before > retained_from:
+            set_watermark(db, purged_before, PURGE_WATERMARK_NAME)
+            db.commit()
+    return dropped
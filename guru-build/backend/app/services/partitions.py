@@ -0,0 +1,245 @@
+"""Monthly range partitions for the listening and interaction event tables.
+
+listening_sessions is partitioned on started_at and podcast_interactions on
+interaction_timestamp, one partition per calendar month (UTC), plus an
+archive partition holding everything before the oldest month (e.g. very
+old offline logs). There is no DEFAULT partition: every partition has
+explicit bounds, so a query bounded on both sides of the partition key
+touches only the months it spans. Partitions are created ahead of time by
+the maintain_partitions task (no event is stamped later than
+now + MAX_CLOCK_SKEW), and retention drops whole partitions instead of
+deleting rows, so old data leaves without table bloat.
+"""
+
+import logging
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES: Dict[str, str] = {
+    'listening_sessions': 'started_at',
+    'podcast_interactions': 'interaction_timestamp',
+}
+
+# Future months that always have a partition ready
+PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', '3'))
+# Explicit interactions (likes, dislikes, saves) are durable preference
+# signals, so they are kept forever unless this is set (0 = keep)
+INTERACTION_RETENTION_DAYS = int(os.getenv('PODCAST_INTERACTION_RETENTION_DAYS', '0'))
+# Client clocks may run slightly ahead of ours; later timestamps are rejected
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+# Newest-first listings search this many months one partition at a time
+# before falling back to one query over everything older
+NEWEST_FIRST_MONTHS = 3
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def archive_partition_name(table: str) -> str:
+    return f"{table}_archive"
+
+
+def archive_upper_bound(db: Session, table: str) -> Optional[date]:
+    """Exclusive upper bound of a table's archive partition, or None if it has none."""
+    bound = db.execute(text("""
+        SELECT pg_get_expr(relpartbound, oid) FROM pg_class
+        WHERE oid = to_regclass(:name)
+    """), {'name': archive_partition_name(table)}).scalar()
+    if bound is None:
+        return None
+    match = re.search(r"TO \('([^']+)'\)", bound)
+    return datetime.fromisoformat(match.group(1)).date()
+
+
+def create_archive_partition(db: Session, table: str, upper: date) -> str:
+    """Create the partition for everything before `upper` (committed by the caller)."""
+    name = archive_partition_name(table)
+    db.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{upper}')"
+    ))
+    return name
+
+
+def list_partitions(db: Session, table: str) -> Dict[date, str]:
+    """Monthly partitions of a table (on the search path), by month."""
+    rows = db.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:table AS regclass)
+    """), {'table': table}).scalars()
+
+    prefix = f"{table}_p"
+    partitions = {}
+    for name in rows:
+        if not name.startswith(prefix):
+            continue  # Archive partition
+        year, month = name[len(prefix):].split('_')
+        partitions[date(int(year), int(month), 1)] = name
+    return partitions
+
+
+def create_partition(db: Session, table: str, month: date) -> str:
+    """Create one monthly partition (committed by the caller)."""
+    name = partition_name(table, month)
+    db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+    ))
+    return name
+
+
+def ensure_partitions(
+    db: Session,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+    months_back: int = 0,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """Create any missing monthly partitions around the current month.
+
+    A table without an archive partition (a fresh schema) gets one ending
+    at its oldest month; months before the archive's bound are already
+    covered by it.
+
+    Args:
+        months_ahead: Future months to cover
+        months_back: Past months to cover (for backfills)
+
+    Returns:
+        Names of the partitions created
+    """
+    current = month_start(now or datetime.utcnow())
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = list_partitions(db, table)
+        floor = archive_upper_bound(db, table)
+        if floor is None:
+            floor = min([add_months(current, -months_back), *existing])
+            created.append(create_archive_partition(db, table, floor))
+        for offset in range(-months_back, months_ahead + 1):
+            month = add_months(current, offset)
+            if month >= floor and month not in existing:
+                created.append(create_partition(db, table, month))
+    db.commit()
+
+    if created:
+        logger.info(f"Created partitions: {', '.join(created)}")
+    return created
+
+
+def drop_expired_partitions(
+    db: Session,
+    table: str,
+    cutoff: datetime,
+    can_drop: Optional[Callable[[str], bool]] = None
+) -> int:
+    """Drop monthly partitions entirely older than `cutoff`.
+
+    Partitions are dropped oldest first and the archive partition is
+    recreated to end where the remaining months start, so the table stays
+    covered without gaps. Archive rows older than `cutoff` are deleted.
+
+    Args:
+        table: Partitioned table
+        cutoff: Rows before this are expired (use a month start)
+        can_drop: Optional check per partition name; False keeps it (and
+            every newer partition)
+
+    Returns:
+        Number of partitions dropped
+    """
+    archive = archive_partition_name(table)
+    floor = archive_upper_bound(db, table)
+    if floor is None:
+        return 0
+    if can_drop is not None and not can_drop(archive):
+        logger.warning(f"Keeping expired partitions of {table}: {archive} not safe to drop yet")
+        return 0
+
+    key = PARTITIONED_TABLES[table]
+    expired = []
+    for month, name in sorted(list_partitions(db, table).items()):
+        if add_months(month, 1) > cutoff.date():
+            break
+        if can_drop is not None and not can_drop(name):
+            logger.warning(f"Keeping expired partition {name}: not safe to drop yet")
+            break
+        expired.append((month, name))
+
+    if expired:
+        # Everything older than the new floor is expired: replace the
+        # archive and the expired months with an empty archive up to it
+        new_floor = add_months(expired[-1][0], 1)
+        for _, name in expired:
+            db.execute(text(f'DROP TABLE {name}'))
+        db.execute(text(f'DROP TABLE {archive}'))
+        create_archive_partition(db, table, new_floor)
+        for _, name in expired:
+            logger.info(f"Dropped expired partition {name}")
+    else:
+        db.execute(text(f'DELETE FROM {archive} WHERE {key} < :cutoff'), {'cutoff': cutoff})
+    db.commit()
+    return len(expired)
+
+
+def newest_first_ranges(
+    months: int = NEWEST_FIRST_MONTHS,
+    now: Optional[datetime] = None
+) -> List[Tuple[Optional[datetime], datetime]]:
+    """Partition-key ranges [lower, upper) for newest-first listings.
+
+    The current month (up to now + MAX_CLOCK_SKEW), each of the `months` - 1
+    months before it, then everything older (lower None). Each bounded
+    range touches one partition, so a listing that fills up in recent
+    months never scans older ones.
+    """
+    now = now or datetime.utcnow()
+    upper = now + MAX_CLOCK_SKEW
+    ranges = []
+    month = month_start(now)
+    for _ in range(months):
+        lower = datetime(month.year, month.month, 1)
+        ranges.append((lower, upper))
+        upper = lower
+        month = add_months(month, -1)
+    ranges.append((None, upper))
+    return ranges
+
+
+def recent_range(window: timedelta, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Partition-key range [now - window, now + MAX_CLOCK_SKEW).
+
+    Bounded on both sides, so it touches only the monthly partitions it spans.
+    """
+    now = now or datetime.utcnow()
+    return now - window, now + MAX_CLOCK_SKEW
+
+
+def retention_cutoff(retention_days: int, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Start of the oldest month kept under a retention period, or None to keep all.
+
+    Month-aligned, so retention always drops whole partitions.
+    """
+    if retention_days <= 0:
+        return None
+    month = month_start((now or datetime.utcnow()) - timedelta(days=retention_days))
+    return datetime(month.year, month.month, 1)
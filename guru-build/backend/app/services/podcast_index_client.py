@@ -0,0 +1,280 @@
+"""Shared Podcast Index API client.
+
+One pooled, rate-limited client for every Podcast Index call in the app:
+- Keep-alive connection pool (requests.Session)
+- Per-endpoint TTL response caching (shared via app.cache)
+- Token-bucket rate limiting per process
+- Retries with exponential backoff and jitter on 429/5xx/network errors
+- Request coalescing: concurrent identical requests share one upstream call
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.cache import SharedCache
+
+logger = logging.getLogger(__name__)
+
+PODCAST_INDEX_BASE_URL = os.getenv('PODCAST_INDEX_BASE_URL', 'https://api.podcastindex.org/api/1.0')
+
+# Response cache TTLs (seconds) per endpoint; 0 disables caching
+ENDPOINT_CACHE_TTLS = {
+    'search/byterm': 6 * 3600,
+    'podcasts/trending': 0,  # Cached by app.services.trending_cache
+    'podcasts/byfeedid': 3600,
+    'episodes/byfeedid': 15 * 60,
+    'categories/list': 24 * 3600,
+    'recent/episodes': 60,
+}
+
+
+class PodcastIndexError(Exception):
+    """Podcast Index request failed."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, detail: str = ''):
+        super().__init__(message)
+        self.status_code = status_code
+        self.detail = detail or message
+
+
+class PodcastIndexNotConfigured(PodcastIndexError):
+    """PODCAST_INDEX_API_KEY / PODCAST_INDEX_API_SECRET are not set."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = 30.0) -> bool:
+        """Block until a token is available (or timeout). Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class PodcastIndexClient:
+    """Pooled, cached, rate-limited Podcast Index client (use get_podcast_index_client())."""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # Longest wait between attempts, including a server's Retry-After
+    MAX_RETRY_DELAY = 30.0
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        base_url: str = PODCAST_INDEX_BASE_URL,
+        rate_per_second: float = float(os.getenv('PODCAST_INDEX_RATE_PER_SECOND', '10')),
+        burst: float = float(os.getenv('PODCAST_INDEX_BURST', '20')),
+        max_retries: int = int(os.getenv('PODCAST_INDEX_MAX_RETRIES', '3')),
+        timeout: float = 10.0,
+        pool_size: int = 32,
+    ):
+        self.api_key = api_key if api_key is not None else os.getenv('PODCAST_INDEX_API_KEY')
+        self.api_secret = api_secret if api_secret is not None else os.getenv('PODCAST_INDEX_API_SECRET')
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.rate_limiter = TokenBucket(rate_per_second, burst)
+        self.cache = SharedCache('podcast_index', default_ttl=3600)
+
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    @property
+    def has_credentials(self) -> bool:
+        return bool(self.api_key and self.api_secret)
+
+    def _auth_headers(self) -> Dict[str, str]:
+        """Generate Podcast Index authentication headers (fresh per request)."""
+        if not self.has_credentials:
+            raise PodcastIndexNotConfigured("Podcast Index API credentials not configured")
+
+        epoch_time = str(int(time.time()))
+        data_to_hash = self.api_key + self.api_secret + epoch_time
+        sha_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()
+
+        return {
+            'User-Agent': 'GuruApp/1.0',
+            'X-Auth-Key': self.api_key,
+            'X-Auth-Date': epoch_time,
+            'Authorization': sha_hash,
+        }
+
+    def get(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        ttl: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """GET an endpoint and return the decoded JSON body.
+
+        Args:
+            endpoint: Path relative to the API base, e.g. "search/byterm"
+            params: Query parameters (None values are dropped)
+            ttl: Cache TTL in seconds; defaults to ENDPOINT_CACHE_TTLS, 0 disables
+
+        Raises:
+            PodcastIndexNotConfigured: If credentials are missing
+            PodcastIndexError: If the request fails after retries
+        """
+        endpoint = endpoint.strip('/')
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        ttl = ENDPOINT_CACHE_TTLS.get(endpoint, 0) if ttl is None else ttl
+        key = endpoint + ':' + hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+        if ttl:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        # Coalesce concurrent identical requests onto one upstream call
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            try:
+                return future.result(timeout=self._max_request_seconds())
+            except FutureTimeoutError:
+                raise PodcastIndexError(f"Timed out waiting for a coalesced {endpoint} request")
+
+        try:
+            data = self._request(endpoint, params)
+            if ttl:
+                self.cache.set(key, data, ttl)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _max_request_seconds(self) -> float:
+        """Upper bound on one _request call: per attempt a rate-limit wait and
+        the request itself, plus the backoff between attempts (and slack)."""
+        attempts = self.max_retries + 1
+        return attempts * 2 * self.timeout + self.max_retries * self.MAX_RETRY_DELAY + self.timeout
+
+    def _request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Perform the request with rate limiting and retries."""
+        url = f"{self.base_url}/{endpoint}"
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.max_retries + 1):
+            if not self.rate_limiter.acquire(timeout=self.timeout):
+                raise PodcastIndexError(f"Rate limit wait exceeded for {endpoint}")
+
+            retry_after = None
+            try:
+                response = self.session.get(
+                    url, headers=self._auth_headers(), params=params, timeout=self.timeout
+                )
+                if response.ok:
+                    try:
+                        return response.json()
+                    except ValueError as e:
+                        raise PodcastIndexError(
+                            f"Podcast Index {endpoint} returned invalid JSON: {e}",
+                            status_code=response.status_code,
+                        )
+
+                last_error = PodcastIndexError(
+                    f"Podcast Index {endpoint} returned {response.status_code}",
+                    status_code=response.status_code,
+                    detail=response.text,
+                )
+                if response.status_code not in self.RETRY_STATUSES:
+                    raise last_error
+                retry_after = response.headers.get('Retry-After')
+            except requests.RequestException as e:
+                last_error = PodcastIndexError(f"Podcast Index {endpoint} request failed: {e}")
+
+            if attempt < self.max_retries:
+                # Exponential backoff with full jitter, honoring Retry-After
+                delay = random.uniform(0, min(8.0, 0.5 * (2 ** attempt)))
+                if retry_after and retry_after.isdigit():
+                    delay = min(max(delay, float(retry_after)), self.MAX_RETRY_DELAY)
+                logger.warning(f"{last_error}; retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+        raise last_error
+
+    # === Endpoint helpers ===
+
+    def search_by_term(self, q: str, max_results: int = 10, lang: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        return self.get('search/byterm', {'q': q, 'max': max_results, 'lang': lang}, **kwargs)
+
+    def trending(
+        self,
+        max_results: int = 20,
+        category: Optional[str] = None,
+        lang: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        return self.get('podcasts/trending', {'max': max_results, 'cat': category, 'lang': lang}, **kwargs)
+
+    def podcast_by_feed_id(self, feed_id: str, **kwargs) -> Dict[str, Any]:
+        return self.get('podcasts/byfeedid', {'id': feed_id}, **kwargs)
+
+    def episodes_by_feed_id(self, feed_id: str, max_results: int = 10, **kwargs) -> Dict[str, Any]:
+        return self.get('episodes/byfeedid', {'id': feed_id, 'max': max_results}, **kwargs)
+
+    def categories(self, **kwargs) -> Dict[str, Any]:
+        return self.get('categories/list', **kwargs)
+
+    def recent_episodes(self, max_results: int = 20, **kwargs) -> Dict[str, Any]:
+        return self.get('recent/episodes', {'max': max_results}, **kwargs)
+
+
+_client: Optional[PodcastIndexClient] = None
+_client_lock = threading.Lock()
+
+
+def get_podcast_index_client() -> PodcastIndexClient:
+    """Get the process-wide Podcast Index client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PodcastIndexClient()
+    return _client
@@ -10,11 +10,8 @@ This service handles intelligent podcast scheduling by:
 import os
 import json
 import logging
-import hashlib
-import time
 from datetime import datetime, date, timedelta
 from typing import List, Optional, Dict, Any
-import requests
 
 from sqlalchemy.orm import Session
 from anthropic import Anthropic
@@ -29,6 +26,8 @@ from app.schemas.schedule import (
     ScheduleWarning,
 )
 from app.services.calendar_service import CalendarService
+from app.services.user_timezone import get_user_timezone
+from app.services.podcast_index_client import PodcastIndexNotConfigured, get_podcast_index_client
 
 logger = logging.getLogger(__name__)
 
@@ -42,8 +41,6 @@ class PodcastSchedulerService:
         self.user = user
         self.anthropic_client = self._init_anthropic_client()
         self.openai_client = self._init_openai_client()
-        self.podcast_api_key = os.getenv("PODCAST_INDEX_API_KEY")
-        self.podcast_api_secret = os.getenv("PODCAST_INDEX_API_SECRET")
 
     def _init_anthropic_client(self) -> Optional[Anthropic]:
         """Initialize the Anthropic client for Claude API."""
@@ -61,34 +58,13 @@ class PodcastSchedulerService:
             return None
         return OpenAI(api_key=api_key)
 
-    def _get_podcast_index_headers(self) -> Dict[str, str]:
-        """Generate authentication headers for Podcast Index API."""
-        if not self.podcast_api_key or not self.podcast_api_secret:
-            return {}
-
-        epoch_time = int(time.time())
-        data_to_hash = self.podcast_api_key + self.podcast_api_secret + str(epoch_time)
-        sha_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()
-
-        return {
-            "User-Agent": "GuruApp/1.0",
-            "X-Auth-Key": self.podcast_api_key,
-            "X-Auth-Date": str(epoch_time),
-            "Authorization": sha_hash,
-        }
-
     def _get_user_preferences(self) -> Optional[UserPreference]:
         """Fetch user preferences from database."""
         return self.db.query(UserPreference).filter_by(user_id=self.user.id).first()
 
     def _get_user_timezone(self) -> str:
-        """Fetch user's timezone from Google Calendar."""
-        if not self.user.google_tokens:
-            return "UTC"
-        try:
-            return CalendarService(self.user.google_tokens).get_calendar_timezone()
-        except Exception:
-            return "UTC"
+        """Fetch user's timezone from Google Calendar (cached on the user)."""
+        return get_user_timezone(self.db, self.user)
 
     def _get_calendar_events(self, week_start: date) -> List[Dict[str, Any]]:
         """Fetch calendar events for the week."""
@@ -112,20 +88,11 @@ class PodcastSchedulerService:
     def _get_podcast_episodes(self, feed_id: str, count: int = 10) -> List[Dict[str, Any]]:
         """Fetch recent episodes from Podcast Index API."""
         try:
-            headers = self._get_podcast_index_headers()
-            if not headers:
-                logger.warning("Podcast Index API credentials not configured")
-                return []
-
-            url = f"https://api.podcastindex.org/api/1.0/episodes/byfeedid?id={feed_id}&max={count}"
-            response = requests.get(url, headers=headers, timeout=10)
-
-            if response.status_code != 200:
-                logger.error(f"Podcast Index API error: {response.status_code}")
-                return []
-
-            data = response.json()
+            data = get_podcast_index_client().episodes_by_feed_id(feed_id, count)
             return data.get("items", [])
+        except PodcastIndexNotConfigured:
+            logger.warning("Podcast Index API credentials not configured")
+            return []
         except Exception as e:
             logger.error(f"Failed to fetch podcast episodes: {e}")
             return []
@@ -0,0 +1,146 @@
+"""Debounced, coalesced user-profile updates on the Celery queue.
+
+Request handlers call schedule_profile_update() instead of rebuilding the
+profile themselves. The first request for a user marks the user pending
+and queues one Celery task delayed by the debounce window; further
+requests within the window are coalesced into that task. The task clears
+the mark before it reads the user's history, so anything recorded while
+it runs schedules a fresh update.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict
+from uuid import UUID
+
+from app.cache import CACHE_KEY_PREFIX, get_redis
+
+logger = logging.getLogger(__name__)
+
+# Requests for the same user within this window share one update
+DEBOUNCE_SECONDS = float(os.getenv('PROFILE_UPDATE_DEBOUNCE_SECONDS', '30'))
+# A pending mark older than this is assumed lost (task dropped, worker died)
+PENDING_TIMEOUT_SECONDS = DEBOUNCE_SECONDS + 10 * 60
+
+TASK_NAME = "app.tasks.recommendations.update_user_profile"
+STAT_FIELDS = ('requested', 'enqueued', 'coalesced', 'completed', 'failed')
+
+
+class ProfileUpdateQueue:
+    """Users with a profile update queued, by when it was queued.
+
+    A Redis sorted set (plus a stats hash) shared by web and worker
+    processes; falls back to in-process state when Redis is unavailable.
+    """
+
+    KEY = f"{CACHE_KEY_PREFIX}profile_updates:pending"
+    STATS_KEY = f"{CACHE_KEY_PREFIX}profile_updates:stats"
+
+    def __init__(self):
+        self._local: Dict[str, float] = {}
+        self._stats = dict.fromkeys(STAT_FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def mark_pending(self, user_id: str) -> bool:
+        """Mark a user pending; False if an update is already pending."""
+        now = time.time()
+        client = get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                pipe.zremrangebyscore(self.KEY, '-inf', now - PENDING_TIMEOUT_SECONDS)
+                pipe.zadd(self.KEY, {user_id: now}, nx=True)
+                return bool(pipe.execute()[1])
+            except Exception as e:
+                logger.warning(f"Redis zadd failed for profile update queue: {e}")
+        with self._lock:
+            queued_at = self._local.get(user_id)
+            if queued_at is not None and now - queued_at < PENDING_TIMEOUT_SECONDS:
+                return False
+            self._local[user_id] = now
+            return True
+
+    def clear_pending(self, user_id: str) -> None:
+        """Drop a user's pending mark (the update is starting or failed to queue)."""
+        client = get_redis()
+        if client is not None:
+            try:
+                client.zrem(self.KEY, user_id)
+            except Exception as e:
+                logger.warning(f"Redis zrem failed for profile update queue: {e}")
+        with self._lock:
+            self._local.pop(user_id, None)
+
+    def count(self, stat: str) -> None:
+        client = get_redis()
+        if client is not None:
+            try:
+                client.hincrby(self.STATS_KEY, stat, 1)
+                return
+            except Exception:
+                pass
+        with self._lock:
+            self._stats[stat] += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            depth = len(self._local)
+        client = get_redis()
+        if client is not None:
+            try:
+                depth += int(client.zcard(self.KEY))
+            except Exception:
+                pass
+        return depth
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and coalescing ratio (shared when Redis is up)."""
+        with self._lock:
+            stats = dict(self._stats)
+        client = get_redis()
+        if client is not None:
+            try:
+                for field, value in client.hgetall(self.STATS_KEY).items():
+                    field = field.decode() if isinstance(field, bytes) else field
+                    stats[field] = stats.get(field, 0) + int(value)
+            except Exception:
+                pass
+        requested = stats['requested']
+        return {
+            'debounce_seconds': DEBOUNCE_SECONDS,
+            'queue_depth': len(self),
+            **stats,
+            'coalescing_ratio': round(stats['coalesced'] / requested, 4) if requested else 0.0,
+        }
+
+
+profile_update_queue = ProfileUpdateQueue()
+
+
+def schedule_profile_update(user_id: UUID) -> bool:
+    """Queue a debounced profile update for a user.
+
+    Never blocks on the rebuild; safe to call on every interaction.
+
+    Returns:
+        True if a task was queued, False if coalesced into a pending one
+    """
+    from app.celery_config import celery_app
+
+    key = str(user_id)
+    profile_update_queue.count('requested')
+    if not profile_update_queue.mark_pending(key):
+        profile_update_queue.count('coalesced')
+        return False
+
+    try:
+        celery_app.send_task(TASK_NAME, args=[key], countdown=DEBOUNCE_SECONDS)
+    except Exception as e:
+        profile_update_queue.clear_pending(key)
+        logger.error(f"Error queueing profile update for user {user_id}: {e}")
+        return False
+
+    profile_update_queue.count('enqueued')
+    return True
@@ -0,0 +1,640 @@
+"""Vectorized (NumPy) recommendation scoring over the podcast and episode catalogs."""
+
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy.orm import Session
+
+from app.models.podcast_recommendation import (
+    EpisodeFeatures,
+    PodcastFeatures,
+    PodcastNeighbors,
+    UserPodcastProfile,
+)
+
+logger = logging.getLogger(__name__)
+
+# Scoring weights (see RecommendationService for the rationale)
+WEIGHT_CONTENT = 0.40
+WEIGHT_CATEGORY = 0.30
+WEIGHT_DURATION = 0.10
+WEIGHT_POPULARITY = 0.10
+WEIGHT_NOVELTY = 0.10
+# Bonus from item-item collaborative filtering, applied where neighbours exist
+WEIGHT_COLLABORATIVE = 0.15
+
+# Diversity re-ranking (maximal marginal relevance). Lambda trades relevance
+# (1.0 = plain top-k) against similarity to podcasts already picked.
+MMR_ENABLED = os.getenv('MMR_ENABLED', 'true').lower() == 'true'
+MMR_LAMBDA = {
+    'commute': 0.8,
+    'workout': 0.8,
+    'chore': 0.65,
+    'relaxing': 0.65,
+    None: 0.7,
+}
+MMR_POOL_FACTOR = 5  # Re-rank the best limit * factor candidates
+MMR_TIME_BUDGET_MS = float(os.getenv('MMR_TIME_BUDGET_MS', '5'))
+
+# Episode scoring weights: the parent show's score, episode-level content
+# similarity, how well the episode fills the listening window, and recency
+EPISODE_WEIGHT_SHOW = 0.45
+EPISODE_WEIGHT_CONTENT = 0.25
+EPISODE_WEIGHT_FIT = 0.20
+EPISODE_WEIGHT_RECENCY = 0.10
+EPISODE_RECENCY_HALF_LIFE_DAYS = 30
+EPISODE_WINDOW_OVERRUN = 0.1  # Episodes may run this far past the window
+EPISODES_PER_SHOW = 10  # Newest episodes per show kept in the index
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows; all-zero rows stay zero."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _vector_dims(vectors: Iterable[Optional[Sequence[float]]], default: int) -> int:
+    """Most common length among the non-empty vectors (default if there are none).
+
+    Embedding sizes depend on EMBEDDING_MODEL_NAME, so they are taken from
+    the stored data rather than assumed.
+    """
+    lengths = Counter(len(vector) for vector in vectors if vector)
+    return lengths.most_common(1)[0][0] if lengths else default
+
+
+def _stack(vectors: Sequence[Optional[Sequence[float]]], dims: int, what: str = 'vectors') -> np.ndarray:
+    """Stack optional vectors into a float32 matrix (missing -> zeros).
+
+    Vectors of another length (e.g. embedded with a different model) are
+    treated as missing, with a warning.
+    """
+    matrix = np.zeros((len(vectors), dims), dtype=np.float32)
+    mismatched = 0
+    for i, vector in enumerate(vectors):
+        if not vector:
+            continue
+        if len(vector) == dims:
+            matrix[i] = vector
+        else:
+            mismatched += 1
+    if mismatched:
+        logger.warning(
+            f"Ignoring {mismatched} of {len(vectors)} {what} that are not {dims}-dimensional"
+        )
+    return matrix
+
+
+class CatalogMatrix:
+    """Dense matrix view of PodcastFeatures rows for batch scoring.
+
+    Holds L2-normalized description embeddings and category vectors plus
+    per-podcast duration and popularity arrays, aligned with `rows`.
+    """
+
+    EMBEDDING_DIMS = 384  # all-MiniLM-L6-v2; only used when no row has an embedding
+    CATEGORY_DIMS = 19
+
+    def __init__(self, rows: List[PodcastFeatures]):
+        self.rows = rows
+        self.external_ids = [row.external_id for row in rows]
+        self.index: Dict[str, int] = {pid: i for i, pid in enumerate(self.external_ids)}
+
+        self.has_embedding = np.array(
+            [bool(row.description_embedding) for row in rows], dtype=bool
+        )
+        embeddings = [row.description_embedding for row in rows]
+        self.embedding_dims = _vector_dims(embeddings, self.EMBEDDING_DIMS)
+        self.embeddings = _normalize_rows(
+            _stack(embeddings, self.embedding_dims, 'podcast embeddings')
+        )
+        self.has_categories = np.array(
+            [bool(row.category_vector) for row in rows], dtype=bool
+        )
+        self.categories = _normalize_rows(
+            _stack([row.category_vector for row in rows], self.CATEGORY_DIMS, 'category vectors')
+        )
+        # Minutes; NaN where unknown
+        self.durations = np.array(
+            [
+                row.avg_episode_duration_seconds / 60 if row.avg_episode_duration_seconds else np.nan
+                for row in rows
+            ],
+            dtype=np.float32,
+        )
+        self.popularity = np.array(
+            [row.popularity_score or 0.0 for row in rows], dtype=np.float32
+        )
+
+        # Item-item CF neighbours (see attach_neighbors); None until loaded
+        self.neighbors: Optional[sp.csr_matrix] = None
+        self.neighbor_index: Dict[str, int] = {}
+        self.neighbor_totals: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def load(cls, db: Session, limit: Optional[int] = None) -> "CatalogMatrix":
+        """Load podcasts that have embeddings, most popular first."""
+        query = db.query(PodcastFeatures).filter(
+            PodcastFeatures.description_embedding.isnot(None)
+        ).order_by(
+            PodcastFeatures.popularity_score.desc().nullslast()
+        )
+        if limit:
+            query = query.limit(limit)
+        return cls(query.all())
+
+    def load_neighbors(self, db: Session, chunk_size: int = 5000) -> "CatalogMatrix":
+        """Attach stored CF neighbour lists for every catalog podcast."""
+        neighbor_rows = []
+        for offset in range(0, len(self.external_ids), chunk_size):
+            chunk = self.external_ids[offset:offset + chunk_size]
+            neighbor_rows.extend(
+                db.query(
+                    PodcastNeighbors.external_id,
+                    PodcastNeighbors.neighbor_ids,
+                    PodcastNeighbors.neighbor_scores,
+                ).filter(PodcastNeighbors.external_id.in_(chunk)).all()
+            )
+        return self.attach_neighbors(neighbor_rows)
+
+    def attach_neighbors(
+        self,
+        neighbor_rows: Iterable[Tuple[str, List[str], List[float]]]
+    ) -> "CatalogMatrix":
+        """Build the sparse (catalog x neighbour vocabulary) similarity matrix.
+
+        Neighbours need not be in the catalog themselves: a user's history
+        usually isn't, and it's their history the candidates are matched on.
+        Each catalog row holds at most top-N entries, so scoring a candidate
+        touches only its k neighbours.
+
+        Args:
+            neighbor_rows: (external_id, neighbor_ids, neighbor_scores) tuples
+        """
+        by_podcast = {pid: (ids or [], scores or []) for pid, ids, scores in neighbor_rows}
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+
+        for pid in self.external_ids:
+            ids, scores = by_podcast.get(pid, ([], []))
+            for neighbor_id, score in zip(ids, scores):
+                indices.append(vocabulary.setdefault(neighbor_id, len(vocabulary)))
+                data.append(score)
+            indptr.append(len(indices))
+
+        self.neighbor_index = vocabulary
+        self.neighbors = sp.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), indptr),
+            shape=(len(self.rows), len(vocabulary)),
+        )
+        self.neighbor_totals = np.asarray(self.neighbors.sum(axis=1), dtype=np.float32).ravel()
+        return self
+
+    def mask_for(self, podcast_ids) -> np.ndarray:
+        """Boolean mask over the catalog for a set of external IDs."""
+        mask = np.zeros(len(self.rows), dtype=bool)
+        for pid in podcast_ids:
+            i = self.index.get(pid)
+            if i is not None:
+                mask[i] = True
+        return mask
+
+
+@dataclass
+class ProfileVectors:
+    """The parts of a UserPodcastProfile the scorer needs."""
+
+    content_embedding: Optional[List[float]]
+    category_preferences: Optional[List[float]]
+    preferred_duration_min: Optional[int]
+    preferred_duration_max: Optional[int]
+
+    @classmethod
+    def from_profile(cls, profile: Optional[UserPodcastProfile]) -> "ProfileVectors":
+        if profile is None:
+            return cls(None, None, None, None)
+        return cls(
+            profile.content_embedding,
+            profile.category_preferences,
+            profile.preferred_duration_min,
+            profile.preferred_duration_max,
+        )
+
+
+def context_boost(durations: np.ndarray, context: Optional[str]) -> np.ndarray:
+    """Per-podcast context boost (0 to 1); 0 where duration is unknown."""
+    boost = np.zeros_like(durations)
+    known = ~np.isnan(durations)
+    d = np.where(known, durations, 0)
+
+    if context == 'commute':
+        # Prefer shorter episodes for commute
+        boost = np.where(d <= 30, 1.0, np.where(d <= 45, 0.5, 0.0))
+    elif context == 'workout':
+        # Prefer medium-length energetic content
+        boost = np.where((d >= 20) & (d <= 60), 0.8, 0.0)
+    elif context == 'chore':
+        # Any length works for chores
+        boost = np.full_like(d, 0.3)
+    elif context == 'relaxing':
+        # Prefer longer, in-depth content
+        boost = np.where(d >= 30, 0.7, 0.0)
+
+    return np.where(known, boost, 0.0).astype(np.float32)
+
+
+def collaborative_affinity(
+    catalog: CatalogMatrix,
+    seeds: Sequence[Set[str]],
+) -> Optional[np.ndarray]:
+    """Item-based CF affinity of each catalog podcast for each user.
+
+    For candidate c with neighbours N(c): sum of sim(c, j) over the user's
+    podcasts j in N(c), divided by the sum over all of N(c) - i.e. the
+    similarity-weighted share of c's neighbourhood the user already likes.
+
+    Args:
+        catalog: Catalog with neighbours attached
+        seeds: Per-user sets of positively interacted podcast IDs
+
+    Returns:
+        (m, n) float32 affinities in 0-1, or None if no neighbours are loaded
+    """
+    if catalog.neighbors is None or not catalog.neighbors.nnz:
+        return None
+
+    rows: List[int] = []
+    cols: List[int] = []
+    for u, podcast_ids in enumerate(seeds):
+        for pid in podcast_ids:
+            j = catalog.neighbor_index.get(pid)
+            if j is not None:
+                rows.append(u)
+                cols.append(j)
+
+    history = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(seeds), catalog.neighbors.shape[1]),
+    )
+    overlap = np.asarray((history @ catalog.neighbors.T).todense(), dtype=np.float32)
+    totals = catalog.neighbor_totals[None, :]
+    return np.divide(overlap, totals, out=np.zeros_like(overlap), where=totals > 0)
+
+
+def score_catalog(
+    catalog: CatalogMatrix,
+    profiles: Sequence[ProfileVectors],
+    context: Optional[str],
+    interacted: np.ndarray,
+    excluded: Optional[np.ndarray] = None,
+    collaborative: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Score every catalog podcast for a block of users at once.
+
+    Combines content, category, duration, popularity, novelty and (when
+    given) collaborative signals, then applies the context boost.
+
+    Args:
+        catalog: Catalog matrix (n podcasts)
+        profiles: m user profiles
+        context: Listening context for boosting
+        interacted: (m, n) bool mask of podcasts each user has interacted with
+        excluded: Optional (m, n) bool mask of podcasts to drop (e.g. disliked)
+        collaborative: Optional (m, n) CF affinities from collaborative_affinity
+
+    Returns:
+        (m, n) float32 score matrix; excluded entries are -inf
+    """
+    m, n = len(profiles), len(catalog)
+    scores = np.zeros((m, n), dtype=np.float32)
+    if n == 0:
+        return scores
+
+    # 1. CONTENT SIMILARITY - cosine mapped to 0-1
+    has_content = np.array([bool(p.content_embedding) for p in profiles], dtype=bool)
+    if has_content.any():
+        user_embeddings = _normalize_rows(
+            _stack([p.content_embedding for p in profiles], catalog.embedding_dims, 'profile embeddings')
+        )
+        content_sim = (user_embeddings @ catalog.embeddings.T + 1) / 2
+        applies = has_content[:, None] & catalog.has_embedding[None, :]
+        scores += np.where(applies, WEIGHT_CONTENT * content_sim, 0.0)
+
+    # 2. CATEGORY ALIGNMENT - positive cosine only
+    has_categories = np.array([bool(p.category_preferences) for p in profiles], dtype=bool)
+    if has_categories.any():
+        user_categories = _normalize_rows(
+            _stack(
+                [p.category_preferences for p in profiles], CatalogMatrix.CATEGORY_DIMS, 'category preferences'
+            )
+        )
+        category_sim = np.maximum(user_categories @ catalog.categories.T, 0)
+        applies = has_categories[:, None] & catalog.has_categories[None, :]
+        scores += np.where(applies, WEIGHT_CATEGORY * category_sim, 0.0)
+
+    # 3. DURATION FIT - full points inside the preferred range, decaying over 30 min
+    known = ~np.isnan(catalog.durations)
+    d = np.where(known, catalog.durations, 0)[None, :]
+    for i, p in enumerate(profiles):
+        if p.preferred_duration_min and p.preferred_duration_max:
+            lo, hi = p.preferred_duration_min, p.preferred_duration_max
+            distance = np.minimum(np.abs(d[0] - lo), np.abs(d[0] - hi))
+            fit = np.where((d[0] >= lo) & (d[0] <= hi), 1.0, np.maximum(0, 1 - distance / 30))
+            scores[i] += np.where(known, WEIGHT_DURATION * fit, 0.0)
+        else:
+            scores[i] += WEIGHT_DURATION * 0.5
+
+    # 4. POPULARITY - unknown popularity gets a default
+    popularity = np.where(catalog.popularity > 0, np.minimum(catalog.popularity, 1.0), 0.3)
+    scores += WEIGHT_POPULARITY * popularity[None, :]
+
+    # 5. NOVELTY - reduced score for already-listened podcasts
+    scores += np.where(interacted, WEIGHT_NOVELTY * 0.3, WEIGHT_NOVELTY)
+
+    # 6. COLLABORATIVE - listeners of the user's podcasts also chose these
+    if collaborative is not None:
+        scores += WEIGHT_COLLABORATIVE * collaborative
+
+    # 7. CONTEXT BOOST
+    if context:
+        scores *= (1 + 0.2 * context_boost(catalog.durations, context))[None, :]
+
+    if excluded is not None:
+        scores = np.where(excluded, -np.inf, scores)
+
+    return scores.astype(np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> List[List[int]]:
+    """Indices of the k best finite scores per row, best first."""
+    results = []
+    k = min(k, scores.shape[1])
+    for row in scores:
+        if k <= 0:
+            results.append([])
+            continue
+        candidates = np.argpartition(-row, k - 1)[:k]
+        ordered = candidates[np.argsort(-row[candidates], kind='stable')]
+        results.append([int(i) for i in ordered if np.isfinite(row[i])])
+    return results
+
+
+def mmr_rerank(
+    catalog: CatalogMatrix,
+    scores: np.ndarray,
+    k: int,
+    lam: float,
+    pool_size: Optional[int] = None,
+    time_budget_ms: Optional[float] = None,
+) -> List[int]:
+    """Re-rank one user's scores for diversity with maximal marginal relevance.
+
+    Picks greedily by lam * relevance - (1 - lam) * max similarity to the
+    podcasts already picked, using the catalog's normalized description
+    embeddings. Each pick costs one (pool x dims) matrix-vector product that
+    updates the running max similarity, so the whole pass is O(k * pool * d).
+    If the time budget runs out, the remaining slots are filled by relevance.
+
+    Args:
+        catalog: Catalog the scores are aligned with
+        scores: (n,) scores for one user (-inf = excluded)
+        k: Number of podcasts to return
+        lam: Relevance weight in [0, 1]; 1 returns plain top-k
+        pool_size: Candidates considered (default k * MMR_POOL_FACTOR)
+        time_budget_ms: Stop diversifying after this long (default MMR_TIME_BUDGET_MS)
+
+    Returns:
+        Catalog indices, in re-ranked order
+    """
+    pool = top_k(scores[None, :], pool_size or k * MMR_POOL_FACTOR)[0]
+    if lam >= 1.0 or len(pool) <= 1 or k <= 1:
+        return pool[:k]
+
+    budget = (time_budget_ms if time_budget_ms is not None else MMR_TIME_BUDGET_MS) / 1000
+    deadline = time.perf_counter() + budget
+
+    pool_idx = np.asarray(pool)
+    relevance = scores[pool_idx].astype(np.float32)
+    spread = relevance.max() - relevance.min()
+    relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones_like(relevance)
+    embeddings = catalog.embeddings[pool_idx]
+
+    selected: List[int] = [0]  # The most relevant podcast always leads
+    available = np.ones(len(pool_idx), dtype=bool)
+    available[0] = False
+    max_similarity = embeddings @ embeddings[0]
+
+    while len(selected) < min(k, len(pool_idx)):
+        if time.perf_counter() > deadline:
+            # Out of budget: fill in relevance order (pool is sorted)
+            selected.extend(np.flatnonzero(available)[:k - len(selected)].tolist())
+            break
+        mmr = lam * relevance - (1 - lam) * max_similarity
+        mmr[~available] = -np.inf
+        pick = int(np.argmax(mmr))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(max_similarity, embeddings @ embeddings[pick], out=max_similarity)
+
+    return [int(pool_idx[i]) for i in selected]
+
+
+class EpisodeIndex:
+    """Per-show episode index over EpisodeFeatures rows for batch scoring.
+
+    Rows are grouped by show, newest first, so each show's episodes are a
+    contiguous slice (`show_slices`). Title and description embeddings are
+    averaged into one normalized vector per episode.
+    """
+
+    def __init__(self, rows: List[EpisodeFeatures]):
+        self.rows = rows
+        self.external_ids = [row.external_id for row in rows]
+        self.index: Dict[str, int] = {eid: i for i, eid in enumerate(self.external_ids)}
+        self.podcast_ids = [row.podcast_external_id for row in rows]
+
+        self.show_slices: Dict[str, slice] = {}
+        start = 0
+        for i in range(1, len(rows) + 1):
+            if i == len(rows) or self.podcast_ids[i] != self.podcast_ids[start]:
+                self.show_slices[self.podcast_ids[start]] = slice(start, i)
+                start = i
+
+        self.embedding_dims = _vector_dims(
+            [row.title_embedding or row.description_embedding for row in rows], CatalogMatrix.EMBEDDING_DIMS
+        )
+        titles = _normalize_rows(
+            _stack([row.title_embedding for row in rows], self.embedding_dims, 'episode title embeddings')
+        )
+        descriptions = _normalize_rows(
+            _stack([row.description_embedding for row in rows], self.embedding_dims, 'episode embeddings')
+        )
+        self.embeddings = _normalize_rows(titles + descriptions)
+        self.has_embedding = np.linalg.norm(self.embeddings, axis=1) > 0
+
+        # Minutes; NaN where unknown
+        self.durations = np.array(
+            [row.duration_seconds / 60 if row.duration_seconds else np.nan for row in rows],
+            dtype=np.float32,
+        )
+        now = datetime.utcnow()
+        self.age_days = np.array(
+            [
+                (now - row.published_at).total_seconds() / 86400 if row.published_at else np.nan
+                for row in rows
+            ],
+            dtype=np.float32,
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def load(
+        cls,
+        db: Session,
+        podcast_ids: Sequence[str],
+        per_show: int = EPISODES_PER_SHOW,
+        chunk_size: int = 1000
+    ) -> "EpisodeIndex":
+        """Load the newest `per_show` stored episodes of each given show."""
+        rows: List[EpisodeFeatures] = []
+        podcast_ids = list(podcast_ids)
+        for offset in range(0, len(podcast_ids), chunk_size):
+            chunk = podcast_ids[offset:offset + chunk_size]
+            episodes = db.query(EpisodeFeatures).filter(
+                EpisodeFeatures.podcast_external_id.in_(chunk)
+            ).order_by(
+                EpisodeFeatures.podcast_external_id,
+                EpisodeFeatures.published_at.desc().nullslast(),
+            ).all()
+
+            kept: Dict[str, int] = {}
+            for episode in episodes:
+                count = kept.get(episode.podcast_external_id, 0)
+                if count < per_show:
+                    rows.append(episode)
+                    kept[episode.podcast_external_id] = count + 1
+        return cls(rows)
+
+    def show_positions(self, catalog: CatalogMatrix) -> np.ndarray:
+        """Catalog index of each episode's show (-1 if not in the catalog)."""
+        return np.array(
+            [catalog.index.get(pid, -1) for pid in self.podcast_ids], dtype=np.int64
+        )
+
+    def mask_for(self, episode_ids) -> np.ndarray:
+        """Boolean mask over the index for a set of episode external IDs."""
+        mask = np.zeros(len(self.rows), dtype=bool)
+        for eid in episode_ids:
+            i = self.index.get(eid)
+            if i is not None:
+                mask[i] = True
+        return mask
+
+
+def window_fit(durations: np.ndarray, window_minutes: Optional[float]) -> np.ndarray:
+    """How well each episode fills a listening window (0 to 1, -inf = doesn't fit).
+
+    Episodes score by the share of the window they fill; ones running more
+    than EPISODE_WINDOW_OVERRUN past it, or of unknown length, don't fit.
+    Without a window every episode gets a neutral 0.5.
+    """
+    if not window_minutes:
+        return np.full(durations.shape, 0.5, dtype=np.float32)
+
+    known = ~np.isnan(durations)
+    d = np.where(known, durations, 0)
+    fits = known & (d <= window_minutes * (1 + EPISODE_WINDOW_OVERRUN))
+    return np.where(fits, np.minimum(d / window_minutes, 1.0), -np.inf).astype(np.float32)
+
+
+def score_episodes(
+    episodes: EpisodeIndex,
+    catalog: CatalogMatrix,
+    show_scores: np.ndarray,
+    profile: ProfileVectors,
+    window_minutes: Optional[float] = None,
+    excluded: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Score every indexed episode for one user.
+
+    Args:
+        episodes: Episode index (e episodes)
+        catalog: Catalog the show scores are aligned with
+        show_scores: (n,) show scores from score_catalog (-inf = excluded show)
+        profile: User profile
+        window_minutes: Listening window to fit episodes into (None = any length)
+        excluded: Optional (e,) bool mask of episodes to drop (e.g. finished)
+
+    Returns:
+        (e,) float32 scores; excluded or non-fitting episodes are -inf
+    """
+    scores = np.zeros(len(episodes), dtype=np.float32)
+    if not len(episodes):
+        return scores
+
+    # 1. SHOW - the parent podcast's score, scaled to 0-1 across shows
+    positions = episodes.show_positions(catalog)
+    in_catalog = positions >= 0
+    show = np.where(in_catalog, show_scores[np.maximum(positions, 0)], -np.inf)
+    finite = np.isfinite(show)
+    top = show[finite].max() if finite.any() else 0.0
+    scores += np.where(finite, EPISODE_WEIGHT_SHOW * show / top if top > 0 else 0.0, 0.0)
+
+    # 2. CONTENT SIMILARITY - episode text vs the user's content embedding
+    if profile.content_embedding:
+        user_embedding = _normalize_rows(
+            _stack([profile.content_embedding], episodes.embedding_dims, 'profile embeddings')
+        )[0]
+        content_sim = (episodes.embeddings @ user_embedding + 1) / 2
+        scores += np.where(episodes.has_embedding, EPISODE_WEIGHT_CONTENT * content_sim, 0.0)
+    else:
+        scores += EPISODE_WEIGHT_CONTENT * 0.5
+
+    # 3. WINDOW FIT
+    scores += EPISODE_WEIGHT_FIT * window_fit(episodes.durations, window_minutes)
+
+    # 4. RECENCY - exponential decay by age
+    known = ~np.isnan(episodes.age_days)
+    age = np.where(known, np.maximum(episodes.age_days, 0), 0)
+    recency = np.power(0.5, age / EPISODE_RECENCY_HALF_LIFE_DAYS)
+    scores += np.where(known, EPISODE_WEIGHT_RECENCY * recency, 0.0)
+
+    scores = np.where(finite, scores, -np.inf)
+    if excluded is not None:
+        scores = np.where(excluded, -np.inf, scores)
+
+    return scores.astype(np.float32)
+
+
+def top_k_per_show(
+    episodes: EpisodeIndex,
+    scores: np.ndarray,
+    k: int,
+    per_show: int,
+) -> List[int]:
+    """Indices of the k best finite episode scores, at most per_show per show."""
+    order = np.argsort(-scores, kind='stable')
+    picked: List[int] = []
+    taken: Dict[str, int] = {}
+    for i in order:
+        if len(picked) >= k or not np.isfinite(scores[i]):
+            break
+        pid = episodes.podcast_ids[i]
+        if taken.get(pid, 0) < per_show:
+            picked.append(int(i))
+            taken[pid] = taken.get(pid, 0) + 1
+    return picked
@@ -2,18 +2,20 @@
 
 import logging
 import os
-import hashlib
-import time
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 
-import requests
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import delete, func
 
+from app.cache import LocalTTLCache, SharedCache
 from app.models.user import User
 from app.models.podcast_recommendation import (
+    ListeningDailyRollup,
     ListeningSession,
     PodcastInteraction,
     PodcastFeatures,
@@ -24,10 +26,47 @@ from app.models.podcast_recommendation import (
 from app.models.saved_media import SavedPodcast
 from app.models.user_preference import UserPreference
 from app.models.media_preference import MediaPreference
+from app.services import recommendation_scoring as scoring
 from app.services.feature_extraction_service import FeatureExtractionService
+from app.services.feature_refresh import is_stale, request_feature_refresh
+from app.services.interaction_state import InteractionState, interaction_state
+from app.services.listening_rollups import roll_up_user_sessions
+from app.services.podcast_index_client import PodcastIndexError, get_podcast_index_client
+from app.services.recommendation_scoring import (
+    CatalogMatrix,
+    EpisodeIndex,
+    ProfileVectors,
+    collaborative_affinity,
+    mmr_rerank,
+    score_catalog,
+    score_episodes,
+    top_k,
+    top_k_per_show,
+)
+from app.services.trending_cache import get_trending_feeds
 
 logger = logging.getLogger(__name__)
 
+# Contexts the recommendations API accepts (None is stored as "none")
+LISTENING_CONTEXTS = ['commute', 'chore', 'workout', 'relaxing', None]
+
+# Cold-start topic searches are identical for every user picking the same
+# topic, so results are shared across users
+TOPIC_SEARCH_MAX_TOPICS = 3
+TOPIC_SEARCH_CACHE_SECONDS = int(os.getenv('TOPIC_SEARCH_CACHE_SECONDS', str(6 * 3600)))
+topic_search_cache = SharedCache('podcast_topic_search', default_ttl=TOPIC_SEARCH_CACHE_SECONDS)
+
+# Episode recommendations rank episodes of the best-scoring shows only
+EPISODE_SHOW_POOL = 100
+EPISODES_PER_SHOW_LIMIT = 2  # Max episodes from one show in a result
+FINISHED_EPISODE_COMPLETION = 0.9
+# Listening windows when neither the request nor the user's preferences give one
+DEFAULT_WINDOW_MINUTES = {'commute': 30, 'chore': 60}
+
+# Podcasts already queued for artwork backfill in this process
+ARTWORK_BACKFILL_RETRY_SECONDS = 6 * 3600
+_artwork_backfill_requested = LocalTTLCache(maxsize=10000)
+
 
 class RecommendationService:
     """Service for generating personalized podcast recommendations.
@@ -43,22 +82,30 @@ class RecommendationService:
     - Duration fit: 10%
     - Popularity: 10%
     - Novelty: 10%
+    - Collaborative (item-item co-listening): +15% where neighbours exist
     """
 
-    # Scoring weights
-    WEIGHT_CONTENT = 0.40
-    WEIGHT_CATEGORY = 0.30
-    WEIGHT_DURATION = 0.10
-    WEIGHT_POPULARITY = 0.10
-    WEIGHT_NOVELTY = 0.10
+    # Scoring weights (applied by recommendation_scoring.score_catalog)
+    WEIGHT_CONTENT = scoring.WEIGHT_CONTENT
+    WEIGHT_CATEGORY = scoring.WEIGHT_CATEGORY
+    WEIGHT_DURATION = scoring.WEIGHT_DURATION
+    WEIGHT_POPULARITY = scoring.WEIGHT_POPULARITY
+    WEIGHT_NOVELTY = scoring.WEIGHT_NOVELTY
+    WEIGHT_COLLABORATIVE = scoring.WEIGHT_COLLABORATIVE
 
     # Cache settings - shorter duration for more variety
     CACHE_DURATION_HOURS = 1
+    ALGORITHM_VERSION = 'v1'
+
+    # Fast cache tier holding fully hydrated recommendation payloads.
+    # The recommendation_cache table stays as the durable fallback.
+    fast_cache = SharedCache('recommendations', default_ttl=CACHE_DURATION_HOURS * 3600)
 
     def __init__(self, db: Session, user: User):
         self.db = db
         self.user = user
         self.feature_service = FeatureExtractionService(db)
+        self._state: Optional[InteractionState] = None
 
     def get_recommendations(
         self,
@@ -76,22 +123,57 @@ class RecommendationService:
         Returns:
             List of recommendation dicts with podcast info and scores
         """
-        # Check cache first
+        cache_key = self._fast_cache_key(context)
+
         if use_cache:
-            cached = self._get_cached_recommendations(context)
-            if cached:
-                logger.debug(f"Returning cached recommendations for user {self.user.id}")
-                return cached[:limit]
+            # One key lookup on a hit; on a miss only one caller per key falls
+            # through to the durable cache / computation
+            recommendations = self.fast_cache.get_or_compute(
+                cache_key,
+                lambda: self._load_or_compute_recommendations(limit, context)
+            )
+            return (recommendations or [])[:limit]
 
-        # Compute fresh recommendations
+        # Forced refresh: recompute and overwrite both cache tiers
         recommendations = self._compute_hybrid_recommendations(limit, context)
-
-        # Cache results
         if recommendations:
             self._cache_recommendations(recommendations, context)
+            self.fast_cache.set(cache_key, recommendations)
 
         return recommendations
 
+    def _load_or_compute_recommendations(
+        self,
+        limit: int,
+        context: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        """Fast-tier miss: read the durable cache, else compute and persist.
+
+        Returns:
+            Tuple of (recommendations, fast-tier TTL in seconds)
+        """
+        cached = self._get_cached_recommendations(context)
+        if cached:
+            recommendations, expires_at = cached
+            logger.debug(f"Returning cached recommendations for user {self.user.id}")
+            remaining = (expires_at - datetime.utcnow()).total_seconds()
+            return recommendations, max(remaining, 0)
+
+        recommendations = self._compute_hybrid_recommendations(limit, context)
+        if recommendations:
+            self._cache_recommendations(recommendations, context)
+
+        return recommendations, None
+
+    def _fast_cache_key(self, context: Optional[str]) -> str:
+        """Fast-tier key for this user's current algorithm version."""
+        return self.fast_cache_key(self.user.id, context, self.ALGORITHM_VERSION)
+
+    @staticmethod
+    def fast_cache_key(user_id, context: Optional[str], algorithm_version: Optional[str]) -> str:
+        """Fast-tier key for (user, context, algorithm_version)."""
+        return f"{user_id}:{context or 'none'}:{algorithm_version or 'v1'}"
+
     def _compute_hybrid_recommendations(
         self,
         limit: int,
@@ -120,161 +202,229 @@ class RecommendationService:
         interacted_podcasts = self._get_interacted_podcast_ids()
         disliked_podcasts = self._get_disliked_podcast_ids()
 
-        # Score candidates
-        scored = []
-        for podcast in candidates:
-            # Skip disliked podcasts entirely
-            if podcast.external_id in disliked_podcasts:
-                continue
+        # Score all candidates in one vectorized pass; disliked podcasts are
+        # excluded entirely
+        catalog = CatalogMatrix(candidates).load_neighbors(self.db)
+        scores = score_catalog(
+            catalog,
+            [ProfileVectors.from_profile(profile)],
+            context,
+            interacted=catalog.mask_for(interacted_podcasts)[None, :],
+            excluded=catalog.mask_for(disliked_podcasts)[None, :],
+            collaborative=collaborative_affinity(catalog, [interacted_podcasts - disliked_podcasts]),
+        )[0]
+
+        return self.rank_and_hydrate(catalog, scores, profile, context, limit)
+
+    def rank_and_hydrate(
+        self,
+        catalog: CatalogMatrix,
+        scores: np.ndarray,
+        profile: UserPodcastProfile,
+        context: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Pick the top-scoring podcasts (diversified with MMR) and build their payloads.
 
-            score = self._compute_recommendation_score(
-                podcast, profile, context, interacted_podcasts
-            )
-            reason = self._generate_recommendation_reason(podcast, profile, context)
-            scored.append((podcast, score, reason))
+        Args:
+            catalog: Catalog the scores are aligned with
+            scores: Per-podcast scores for this user (-inf = excluded)
+            profile: User profile (for recommendation reasons)
+            context: Listening context
+            limit: Maximum number to return
 
-        # Sort by score descending
-        scored.sort(key=lambda x: x[1], reverse=True)
+        Returns:
+            List of recommendation dicts in ranked order
+        """
+        if scoring.MMR_ENABLED:
+            ranked = mmr_rerank(catalog, scores, limit, scoring.MMR_LAMBDA.get(context, 1.0))
+        else:
+            ranked = top_k(scores[None, :], limit)[0]
 
-        # Format results
-        return [
-            {
-                'podcast_id': p.external_id,
-                'title': p.title,
-                'author': p.author,
-                'description': p.description,
-                'categories': p.categories,
-                'artwork': self._get_podcast_artwork(p.external_id),
-                'score': float(score),
-                'reason': reason,
-            }
-            for p, score, reason in scored[:limit]
-        ]
+        scored = []
+        for i in ranked:
+            podcast = catalog.rows[i]
+            reason = self._generate_recommendation_reason(podcast, profile, context)
+            scored.append((podcast, float(scores[i]), reason))
+
+        return self._hydrate_recommendations(scored)
 
-    def _compute_recommendation_score(
+    def _hydrate_recommendations(
         self,
-        podcast: PodcastFeatures,
-        profile: UserPodcastProfile,
-        context: Optional[str],
-        interacted_podcasts: set
-    ) -> float:
-        """Compute recommendation score for a podcast.
+        scored: List[Tuple[PodcastFeatures, float, str]]
+    ) -> List[Dict[str, Any]]:
+        """Build response payloads from already-loaded feature rows.
 
-        Uses weighted combination of multiple signals:
-        - Content similarity (embedding cosine similarity)
-        - Category alignment
-        - Duration fit
-        - Popularity
-        - Novelty (penalty for already-listened)
+        Metadata (artwork included) comes from the PodcastFeatures rows the
+        scorer loaded, so hydration issues no queries. Podcasts without
+        artwork are queued for an asynchronous bulk backfill.
 
         Args:
-            podcast: Podcast features to score
-            profile: User's learned profile
-            context: Listening context
-            interacted_podcasts: Set of podcast IDs user has interacted with
+            scored: (features, score, reason) tuples in ranked order
 
         Returns:
-            Score between 0.0 and ~1.3 (can exceed 1.0 with context boost)
+            List of recommendation dicts
         """
-        score = 0.0
+        recommendations = []
+        missing_artwork = []
 
-        # 1. CONTENT SIMILARITY (40% weight)
-        if profile.content_embedding and podcast.description_embedding:
-            content_sim = self._cosine_similarity(
-                profile.content_embedding,
-                podcast.description_embedding
-            )
-            # Normalize to 0-1 range (cosine can be -1 to 1)
-            content_sim = (content_sim + 1) / 2
-            score += self.WEIGHT_CONTENT * content_sim
+        for features, score, reason in scored:
+            if not features.artwork:
+                missing_artwork.append(features.external_id)
+            recommendations.append({
+                'podcast_id': features.external_id,
+                'title': features.title,
+                'author': features.author,
+                'description': features.description,
+                'categories': features.categories,
+                'artwork': features.artwork or '',
+                'score': float(score),
+                'reason': reason,
+            })
 
-        # 2. CATEGORY ALIGNMENT (30% weight)
-        if profile.category_preferences and podcast.category_vector:
-            category_sim = self._cosine_similarity(
-                profile.category_preferences,
-                podcast.category_vector
-            )
-            category_sim = max(0, category_sim)  # Only positive alignment
-            score += self.WEIGHT_CATEGORY * category_sim
-
-        # 3. DURATION FIT (10% weight)
-        if profile.preferred_duration_min and profile.preferred_duration_max:
-            if podcast.avg_episode_duration_seconds:
-                duration_mins = podcast.avg_episode_duration_seconds / 60
-                if profile.preferred_duration_min <= duration_mins <= profile.preferred_duration_max:
-                    score += self.WEIGHT_DURATION  # Full points
-                else:
-                    # Partial score based on distance
-                    distance = min(
-                        abs(duration_mins - profile.preferred_duration_min),
-                        abs(duration_mins - profile.preferred_duration_max)
-                    )
-                    # Decay over 30 minutes
-                    score += self.WEIGHT_DURATION * max(0, 1 - distance / 30)
-        else:
-            # No preference, give half points
-            score += self.WEIGHT_DURATION * 0.5
+        if missing_artwork:
+            self._schedule_artwork_backfill(missing_artwork)
 
-        # 4. POPULARITY (10% weight)
-        if podcast.popularity_score:
-            score += self.WEIGHT_POPULARITY * min(podcast.popularity_score, 1.0)
-        else:
-            score += self.WEIGHT_POPULARITY * 0.3  # Default for unknown
+        return recommendations
 
-        # 5. NOVELTY (10% weight)
-        if podcast.external_id in interacted_podcasts:
-            # Reduce score for already-listened podcasts
-            score += self.WEIGHT_NOVELTY * 0.3
-        else:
-            score += self.WEIGHT_NOVELTY * 1.0
+    def _schedule_artwork_backfill(self, podcast_ids: List[str]) -> None:
+        """Queue a bulk artwork lookup for podcasts missing artwork.
 
-        # 6. CONTEXT BOOST (optional multiplier)
-        if context:
-            context_boost = self._compute_context_boost(podcast, context)
-            score *= (1 + 0.2 * context_boost)
+        Each ID is queued at most once per ARTWORK_BACKFILL_RETRY_SECONDS per
+        process so repeated requests don't flood the task queue.
+        """
+        pending = [pid for pid in podcast_ids if _artwork_backfill_requested.get(pid) is None]
+        if not pending:
+            return
 
-        return score
+        for pid in pending:
+            _artwork_backfill_requested.set(pid, True, ARTWORK_BACKFILL_RETRY_SECONDS)
+
+        try:
+            from app.tasks.podcast_features import backfill_podcast_artwork
+            backfill_podcast_artwork.delay(pending)
+        except Exception as e:
+            logger.warning(f"Could not queue artwork backfill for {len(pending)} podcasts: {e}")
 
-    def _compute_context_boost(
+    def get_episode_recommendations(
         self,
-        podcast: PodcastFeatures,
-        context: str
-    ) -> float:
-        """Compute context-aware boost for a podcast.
+        limit: int = 10,
+        context: Optional[str] = None,
+        window_minutes: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Recommend individual episodes that fit a listening window.
+
+        Shows are scored with the same vectorized pass as podcast
+        recommendations; the newest stored episodes of the best shows are
+        then scored on show score, episode content similarity, window fit and
+        recency. Everything comes from podcast_features/episode_features, so
+        no Podcast Index calls are made.
 
         Args:
-            podcast: Podcast to evaluate
-            context: Listening context (commute, chore, workout)
+            limit: Maximum number of episodes to return
+            context: Listening context (commute, chore, workout, etc.)
+            window_minutes: Minutes available; defaults to the user's
+                commute/chore duration for those contexts
 
         Returns:
-            Boost multiplier (0 to 1)
+            Tuple of (episode recommendation dicts, window used in minutes)
         """
-        boost = 0.0
+        if window_minutes is None:
+            window_minutes = self._listening_window_minutes(context)
+
+        profile = self._get_or_create_user_profile()
+        candidates = self._get_candidate_podcasts(EPISODE_SHOW_POOL * 5)
+        if not candidates:
+            return [], window_minutes
 
-        if not podcast.avg_episode_duration_seconds:
-            return boost
+        interacted_podcasts = self._get_interacted_podcast_ids()
+        disliked_podcasts = self._get_disliked_podcast_ids()
+        profile_vectors = ProfileVectors.from_profile(profile)
+
+        catalog = CatalogMatrix(candidates).load_neighbors(self.db)
+        show_scores = score_catalog(
+            catalog,
+            [profile_vectors],
+            context,
+            interacted=catalog.mask_for(interacted_podcasts)[None, :],
+            excluded=catalog.mask_for(disliked_podcasts)[None, :],
+            collaborative=collaborative_affinity(catalog, [interacted_podcasts - disliked_podcasts]),
+        )[0]
+
+        shows = top_k(show_scores[None, :], EPISODE_SHOW_POOL)[0]
+        episodes = EpisodeIndex.load(self.db, [catalog.external_ids[i] for i in shows])
+        scores = score_episodes(
+            episodes,
+            catalog,
+            show_scores,
+            profile_vectors,
+            window_minutes=window_minutes,
+            excluded=episodes.mask_for(self._get_finished_episode_ids()),
+        )
 
-        duration_mins = podcast.avg_episode_duration_seconds / 60
+        recommendations = []
+        for i in top_k_per_show(episodes, scores, limit, EPISODES_PER_SHOW_LIMIT):
+            episode = episodes.rows[i]
+            podcast = catalog.rows[catalog.index[episode.podcast_external_id]]
+            if window_minutes and context:
+                reason = f"Fits your {window_minutes}-minute {context}"
+            elif window_minutes:
+                reason = f"Fits in {window_minutes} minutes"
+            else:
+                reason = f"New from {podcast.title}" if podcast.title else "Recommended for you"
+            recommendations.append({
+                'episode_id': episode.external_id,
+                'podcast_id': episode.podcast_external_id,
+                'title': episode.title or '',
+                'podcast_title': podcast.title or '',
+                'description': episode.description or '',
+                'image': episode.image or podcast.artwork or '',
+                'audio_url': episode.enclosure_url,
+                'duration_seconds': episode.duration_seconds,
+                'published_at': episode.published_at,
+                'score': float(scores[i]),
+                'reason': reason,
+            })
 
-        if context == 'commute':
-            # Prefer shorter episodes for commute
-            if duration_mins <= 30:
-                boost = 1.0
-            elif duration_mins <= 45:
-                boost = 0.5
-        elif context == 'workout':
-            # Prefer medium-length energetic content
-            if 20 <= duration_mins <= 60:
-                boost = 0.8
-        elif context == 'chore':
-            # Any length works for chores
-            boost = 0.3
-        elif context == 'relaxing':
-            # Prefer longer, in-depth content
-            if duration_mins >= 30:
-                boost = 0.7
-
-        return boost
+        return recommendations, window_minutes
+
+    def _listening_window_minutes(self, context: Optional[str]) -> Optional[int]:
+        """Listening window for a context from the user's stated durations."""
+        if context not in DEFAULT_WINDOW_MINUTES:
+            return None
+
+        preferences = self.db.query(UserPreference).filter_by(user_id=self.user.id).first()
+        stated = None
+        if preferences:
+            stated = preferences.commute_duration if context == 'commute' else preferences.chore_duration
+        return self._parse_minutes(stated) or DEFAULT_WINDOW_MINUTES[context]
+
+    @staticmethod
+    def _parse_minutes(value: Optional[str]) -> Optional[int]:
+        """Parse durations like "30", "45 min", "1h 30m" or "1 hour" to minutes."""
+        if not value:
+            return None
+        text = value.lower()
+        hours = re.search(r'(\d+)\s*h', text)
+        minutes = re.search(r'(\d+)\s*m', text)
+        if hours or minutes:
+            total = (int(hours.group(1)) * 60 if hours else 0) + (int(minutes.group(1)) if minutes else 0)
+        else:
+            number = re.search(r'\d+', text)
+            total = int(number.group()) if number else 0
+        return total or None
+
+    def _get_finished_episode_ids(self) -> set:
+        """Get IDs of episodes the user has (nearly) finished.
+
+        Returns:
+            Set of episode external IDs
+        """
+        finished = self.db.query(ListeningSession.episode_external_id).filter(
+            ListeningSession.user_id == self.user.id,
+            ListeningSession.completion_rate >= FINISHED_EPISODE_COMPLETION
+        ).distinct().all()
+        return set(r[0] for r in finished)
 
     def _get_cold_start_recommendations(
         self,
@@ -316,7 +466,10 @@ class RecommendationService:
 
         if preferred_topics:
             # Search for podcasts matching user's stated preferences
-            results = self._search_podcasts_by_topics(preferred_topics, limit * 2)
+            lang = None
+            if user_prefs and user_prefs.podcast_languages:
+                lang = ",".join(sorted(user_prefs.podcast_languages))
+            results = self._search_podcasts_by_topics(preferred_topics, limit * 2, lang)
             if results:
                 # Filter out disliked podcasts
                 results = [r for r in results if r['podcast_id'] not in disliked_ids]
@@ -331,53 +484,83 @@ class RecommendationService:
     def _search_podcasts_by_topics(
         self,
         topics: List[str],
-        limit: int
+        limit: int,
+        lang: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Search for podcasts matching user's preferred topics.
 
+        Topic searches run concurrently and each result list is shared across
+        users through a cache keyed by (normalized topic, lang), so popular
+        topics never hit the Podcast Index API on the request path.
+
         Args:
             topics: List of topic strings
             limit: Maximum results
+            lang: Optional Podcast Index language filter (e.g. "en" or "en,es")
 
         Returns:
             List of podcast dicts
         """
-        headers = self._get_api_headers()
-        if not headers:
+        # Normalize and dedupe, keeping the user's order; limit to first 3 topics
+        normalized = list(dict.fromkeys(
+            " ".join(t.lower().split()) for t in topics if t and t.strip()
+        ))[:TOPIC_SEARCH_MAX_TOPICS]
+        if not normalized:
             return []
 
+        with ThreadPoolExecutor(max_workers=len(normalized)) as executor:
+            feeds_per_topic = list(executor.map(
+                lambda topic: topic_search_cache.get_or_compute(
+                    f"{topic}:{lang or 'any'}",
+                    lambda: self._fetch_topic_feeds(topic, lang)
+                ) or [],
+                normalized
+            ))
+
         results = []
         seen_ids = set()
-
-        for topic in topics[:3]:  # Limit to first 3 topics
-            try:
-                response = requests.get(
-                    'https://api.podcastindex.org/api/1.0/search/byterm',
-                    headers=headers,
-                    params={'q': topic, 'max': 10},
-                    timeout=10
-                )
-
-                if response.ok:
-                    for feed in response.json().get('feeds', []):
-                        podcast_id = str(feed.get('id'))
-                        if podcast_id not in seen_ids:
-                            seen_ids.add(podcast_id)
-                            results.append({
-                                'podcast_id': podcast_id,
-                                'title': feed.get('title', ''),
-                                'author': feed.get('author', ''),
-                                'description': feed.get('description', ''),
-                                'categories': feed.get('categories', {}),
-                                'artwork': self._fix_image_url(feed.get('artwork', '')),
-                                'score': 0.5,
-                                'reason': f'Based on your interest in {topic}',
-                            })
-            except requests.RequestException as e:
-                logger.warning(f"Error searching for topic {topic}: {e}")
+        for topic, feeds in zip(normalized, feeds_per_topic):
+            for feed in feeds:
+                if feed['podcast_id'] in seen_ids:
+                    continue
+                seen_ids.add(feed['podcast_id'])
+                results.append({
+                    **feed,
+                    'score': 0.5,
+                    'reason': f'Based on your interest in {topic}',
+                })
 
         return results[:limit]
 
+    def _fetch_topic_feeds(
+        self,
+        topic: str,
+        lang: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        """Fetch search/byterm results for one topic (cache compute function).
+
+        Returns:
+            Tuple of (podcast dicts, cache TTL); failures return a TTL of 0
+            so they are not cached
+        """
+        try:
+            data = get_podcast_index_client().search_by_term(topic, 10, lang=lang, ttl=0)
+        except PodcastIndexError as e:
+            logger.warning(f"Topic search for {topic} failed: {e}")
+            return [], 0
+
+        return [
+            {
+                'podcast_id': str(feed.get('id')),
+                'title': feed.get('title', ''),
+                'author': feed.get('author', ''),
+                'description': feed.get('description', ''),
+                'categories': feed.get('categories', {}),
+                'artwork': self._fix_image_url(feed.get('artwork', '')),
+            }
+            for feed in data.get('feeds', [])
+        ], None
+
     def _get_trending_podcasts(self, limit: int) -> List[Dict[str, Any]]:
         """Get trending podcasts as fallback recommendations.
 
@@ -387,36 +570,20 @@ class RecommendationService:
         Returns:
             List of podcast dicts
         """
-        headers = self._get_api_headers()
-        if not headers:
-            return []
-
-        try:
-            response = requests.get(
-                'https://api.podcastindex.org/api/1.0/podcasts/trending',
-                headers=headers,
-                params={'max': limit, 'lang': 'en'},
-                timeout=10
-            )
-
-            if response.ok:
-                return [
-                    {
-                        'podcast_id': str(feed.get('id')),
-                        'title': feed.get('title', ''),
-                        'author': feed.get('author', ''),
-                        'description': feed.get('description', ''),
-                        'categories': feed.get('categories', {}),
-                        'artwork': self._fix_image_url(feed.get('artwork', '')),
-                        'score': (feed.get('trendScore', 0) / 100),
-                        'reason': 'Trending podcast',
-                    }
-                    for feed in response.json().get('feeds', [])
-                ]
-        except requests.RequestException as e:
-            logger.error(f"Error fetching trending podcasts: {e}")
-
-        return []
+        feeds = get_trending_feeds(category=None, lang='en', limit=limit) or []
+        return [
+            {
+                'podcast_id': str(feed.get('id')),
+                'title': feed.get('title', ''),
+                'author': feed.get('author', ''),
+                'description': feed.get('description', ''),
+                'categories': feed.get('categories', {}),
+                'artwork': self._fix_image_url(feed.get('artwork', '')),
+                'score': (feed.get('trendScore', 0) / 100),
+                'reason': 'Trending podcast',
+            }
+            for feed in feeds
+        ]
 
     def _get_or_create_user_profile(self) -> UserPodcastProfile:
         """Get or create user's podcast preference profile.
@@ -445,7 +612,7 @@ class RecommendationService:
         """Recompute user's preference profile from interaction history.
 
         Aggregates signals from:
-        - Listening sessions (weighted by completion rate)
+        - Listening rollups (engaged sessions, weighted by completion rate)
         - Explicit likes (strong positive)
         - Saved podcasts (positive)
         - Dislikes (excluded from profile)
@@ -455,12 +622,18 @@ class RecommendationService:
         """
         profile = self._get_or_create_user_profile()
 
-        # Aggregate listening sessions (completion >= 30% = positive signal)
-        sessions = self.db.query(ListeningSession).filter_by(
-            user_id=self.user.id
+        # Engaged listening (completion >= 30%) per podcast, from the daily
+        # rollups brought up to date for this user first
+        roll_up_user_sessions(self.db, self.user.id)
+        listening = self.db.query(
+            ListeningDailyRollup.podcast_external_id,
+            func.sum(ListeningDailyRollup.engagement_weight),
+            func.sum(ListeningDailyRollup.engaged_session_count),
+            func.sum(ListeningDailyRollup.engaged_listened_seconds),
         ).filter(
-            ListeningSession.completion_rate >= 0.3
-        ).all()
+            ListeningDailyRollup.user_id == self.user.id,
+            ListeningDailyRollup.engaged_session_count > 0
+        ).group_by(ListeningDailyRollup.podcast_external_id).all()
 
         # Get liked podcasts
         liked_interactions = self.db.query(PodcastInteraction).filter_by(
@@ -474,12 +647,9 @@ class RecommendationService:
         # Collect positive podcast IDs with weights
         positive_podcasts: Dict[str, float] = {}
 
-        # Sessions: weight by completion rate + engagement
-        for session in sessions:
-            pid = session.podcast_external_id
-            weight = session.completion_rate
-            # Bonus for rewinds (engagement signal)
-            weight *= (1 + 0.1 * (session.seek_backward_count or 0))
+        # Sessions: weight by completion rate, with a bonus for rewinds
+        # (engagement signal), summed in the rollups
+        for pid, weight, _, _ in listening:
             positive_podcasts[pid] = positive_podcasts.get(pid, 0) + weight
 
         # Likes: strong positive signal (weight = 2.0)
@@ -501,13 +671,15 @@ class RecommendationService:
             PodcastFeatures.external_id.in_(list(positive_podcasts.keys()))
         ).all()
 
-        # If we don't have features, try to extract them
-        if len(podcast_features) < len(positive_podcasts) * 0.5:
-            for pid in positive_podcasts.keys():
-                if not any(pf.external_id == pid for pf in podcast_features):
-                    features = self.feature_service.extract_and_store_features(pid)
-                    if features:
-                        podcast_features.append(features)
+        # Missing or stale features are refreshed in the background; the
+        # profile is built from the rows available now
+        known = {pf.external_id for pf in podcast_features}
+        request_feature_refresh(
+            [pid for pid in positive_podcasts if pid not in known], missing=True
+        )
+        request_feature_refresh(
+            [pf.external_id for pf in podcast_features if is_stale(pf.features_computed_at)]
+        )
 
         if not podcast_features:
             logger.warning(f"No podcast features available for user {self.user.id}")
@@ -554,15 +726,20 @@ class RecommendationService:
             profile.preferred_duration_max = int(durations[3 * n // 4]) if n >= 4 else int(durations[-1])
 
         # Update stats
-        profile.total_interactions = len(sessions) + len(liked_interactions) + len(saved)
+        session_count = sum(count for _, _, count, _ in listening)
+        profile.total_interactions = session_count + len(liked_interactions) + len(saved)
         profile.total_listening_hours = sum(
-            s.listened_duration_seconds for s in sessions
+            seconds for _, _, _, seconds in listening
         ) / 3600
         profile.last_updated_at = datetime.utcnow()
         profile.profile_version += 1
 
         self.db.commit()
 
+        # Cached recommendations (including nightly precomputed ones) were
+        # scored against the old profile
+        self.invalidate_cache()
+
         logger.info(
             f"Updated profile for user {self.user.id}: "
             f"{profile.total_interactions} interactions, "
@@ -590,32 +767,19 @@ class RecommendationService:
             PodcastFeatures.popularity_score.desc().nullslast()
         ).limit(limit).all()
 
+    def _interaction_state(self) -> InteractionState:
+        """The user's cached interaction sets (fetched once per service)."""
+        if self._state is None:
+            self._state = interaction_state.get(self.db, self.user.id)
+        return self._state
+
     def _get_interacted_podcast_ids(self) -> set:
-        """Get IDs of podcasts user has interacted with.
+        """Get IDs of podcasts user has listened to, saved or interacted with.
 
         Returns:
             Set of podcast external IDs
         """
-        # From listening sessions
-        session_ids = self.db.query(ListeningSession.podcast_external_id).filter_by(
-            user_id=self.user.id
-        ).distinct().all()
-
-        # From interactions
-        interaction_ids = self.db.query(PodcastInteraction.podcast_external_id).filter_by(
-            user_id=self.user.id
-        ).distinct().all()
-
-        # From saved
-        saved_ids = self.db.query(SavedPodcast.external_id).filter_by(
-            user_id=self.user.id
-        ).all()
-
-        return set(
-            [r[0] for r in session_ids] +
-            [r[0] for r in interaction_ids] +
-            [r[0] for r in saved_ids]
-        )
+        return self._interaction_state().interacted_ids
 
     def _get_disliked_podcast_ids(self) -> set:
         """Get IDs of podcasts user has disliked.
@@ -623,11 +787,7 @@ class RecommendationService:
         Returns:
             Set of podcast external IDs
         """
-        disliked = self.db.query(PodcastInteraction.podcast_external_id).filter_by(
-            user_id=self.user.id,
-            interaction_type=InteractionType.dislike
-        ).all()
-        return set(r[0] for r in disliked)
+        return set(self._interaction_state().disliked)
 
     def _generate_recommendation_reason(
         self,
@@ -680,14 +840,14 @@ class RecommendationService:
     def _get_cached_recommendations(
         self,
         context: Optional[str]
-    ) -> Optional[List[Dict[str, Any]]]:
-        """Get cached recommendations if available and fresh.
+    ) -> Optional[Tuple[List[Dict[str, Any]], datetime]]:
+        """Get recommendations from the durable cache table if fresh.
 
         Args:
             context: Listening context to match
 
         Returns:
-            List of recommendation dicts, or None if cache miss
+            Tuple of (recommendation dicts, expiry time), or None if cache miss
         """
         cache = self.db.query(RecommendationCache).filter_by(
             user_id=self.user.id,
@@ -727,7 +887,11 @@ class RecommendationService:
             logger.debug("Cache missing titles, invalidating")
             return None
 
-        return recommendations
+        missing_artwork = [r['podcast_id'] for r in recommendations if not r['artwork']]
+        if missing_artwork:
+            self._schedule_artwork_backfill(missing_artwork)
+
+        return recommendations, cache.expires_at
 
     def _cache_recommendations(
         self,
@@ -751,7 +915,7 @@ class RecommendationService:
             podcast_ids=[r['podcast_id'] for r in recommendations],
             scores=[r['score'] for r in recommendations],
             reasons=[r['reason'] for r in recommendations],
-            algorithm_version='v1',
+            algorithm_version=self.ALGORITHM_VERSION,
             model_type='hybrid',
             context=context,
             generated_at=datetime.utcnow(),
@@ -764,101 +928,69 @@ class RecommendationService:
         """Invalidate recommendation cache for this user.
 
         Call this when user dislikes, unsaves, or otherwise changes their preferences.
+        Clears both the fast tier and the durable recommendation_cache rows.
 
         Args:
             podcast_id: If provided, only invalidate if this podcast is in the cache.
                        If None, invalidate all caches for this user.
         """
+        table = RecommendationCache.__table__
+        stmt = delete(table).where(table.c.user_id == self.user.id)
         if podcast_id:
-            # Check if this podcast is in any cached recommendations
-            caches = self.db.query(RecommendationCache).filter_by(
-                user_id=self.user.id
-            ).all()
-
-            for cache in caches:
-                if cache.podcast_ids and podcast_id in cache.podcast_ids:
-                    self.db.delete(cache)
-            self.db.commit()
-        else:
-            # Invalidate all caches for user
-            self.db.query(RecommendationCache).filter_by(
-                user_id=self.user.id
-            ).delete()
-            self.db.commit()
+            # Array containment is answered by the GIN index on podcast_ids
+            stmt = stmt.where(table.c.podcast_ids.contains([podcast_id]))
+
+        deleted = self.db.execute(
+            stmt.returning(table.c.context, table.c.algorithm_version)
+        ).all()
+        self.db.commit()
+
+        keys = {
+            self.fast_cache_key(self.user.id, context, version)
+            for context, version in deleted
+        }
+        if not podcast_id:
+            # Fast-tier entries may exist without a durable row (e.g. expired)
+            keys.update(self._fast_cache_key(c) for c in LISTENING_CONTEXTS)
+        self.fast_cache.delete(*keys)
 
         logger.debug(f"Invalidated recommendation cache for user {self.user.id}")
 
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Compute cosine similarity between two vectors.
+    @classmethod
+    def invalidate_podcasts_for_all_users(cls, db: Session, podcast_ids: List[str]) -> int:
+        """Invalidate every cached recommendation list containing any of these podcasts.
+
+        Use when a podcast is delisted or its features change. Runs as a single
+        DELETE driven by the GIN index on podcast_ids (array overlap).
 
         Args:
-            vec1: First vector
-            vec2: Second vector
+            db: Database session
+            podcast_ids: External podcast IDs
 
         Returns:
-            Cosine similarity (-1 to 1)
+            Number of cache entries invalidated
         """
-        if not vec1 or not vec2 or len(vec1) != len(vec2):
-            return 0.0
-
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        norm1 = sum(a * a for a in vec1) ** 0.5
-        norm2 = sum(b * b for b in vec2) ** 0.5
-
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-
-        return dot_product / (norm1 * norm2)
-
-    def _get_api_headers(self) -> Optional[Dict[str, str]]:
-        """Get Podcast Index API headers."""
-        api_key = os.getenv('PODCAST_INDEX_API_KEY')
-        api_secret = os.getenv('PODCAST_INDEX_API_SECRET')
-
-        if not api_key or not api_secret:
-            return None
-
-        epoch_time = str(int(time.time()))
-        data_to_hash = api_key + api_secret + epoch_time
-        sha_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()
-
-        return {
-            'User-Agent': 'GuruApp/1.0',
-            'X-Auth-Key': api_key,
-            'X-Auth-Date': epoch_time,
-            'Authorization': sha_hash,
-        }
-
-    def _get_podcast_artwork(self, podcast_id: str) -> str:
-        """Get podcast artwork URL from cached features."""
-        features = self.db.query(PodcastFeatures).filter_by(
-            external_id=podcast_id
-        ).first()
-
-        # For now we don't store artwork in features, so return empty
-        # The cold start and trending paths set artwork from API response
-        return ''
-
-    def _get_podcast_artwork_from_api(self, podcast_id: str) -> str:
-        """Fetch podcast artwork from Podcast Index API."""
-        headers = self._get_api_headers()
-        if not headers:
-            return ''
+        if not podcast_ids:
+            return 0
+
+        table = RecommendationCache.__table__
+        deleted = db.execute(
+            delete(table)
+            .where(table.c.podcast_ids.overlap(list(podcast_ids)))
+            .returning(table.c.user_id, table.c.context, table.c.algorithm_version)
+        ).all()
+        db.commit()
 
-        try:
-            response = requests.get(
-                f'https://api.podcastindex.org/api/1.0/podcasts/byfeedid',
-                headers=headers,
-                params={'id': podcast_id},
-                timeout=10
-            )
-            if response.ok:
-                feed = response.json().get('feed', {})
-                return self._fix_image_url(feed.get('artwork', ''))
-        except requests.RequestException as e:
-            logger.warning(f"Error fetching artwork for {podcast_id}: {e}")
+        cls.fast_cache.delete(*{
+            cls.fast_cache_key(user_id, context, version)
+            for user_id, context, version in deleted
+        })
 
-        return ''
+        logger.info(
+            f"Invalidated {len(deleted)} recommendation cache entries "
+            f"for {len(podcast_ids)} podcasts"
+        )
+        return len(deleted)
 
     def _fix_image_url(self, url: str) -> str:
         """Fix image URL to use HTTPS."""
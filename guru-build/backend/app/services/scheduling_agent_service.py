@@ -9,9 +9,6 @@ This service handles intelligent schedule generation by:
 import os
 import json
 import logging
-import hashlib
-import time
-import requests
 from datetime import datetime, date, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
@@ -37,6 +34,8 @@ from app.schemas.schedule import (
     ActivityType,
 )
 from app.services.calendar_service import CalendarService
+from app.services.user_timezone import get_user_timezone
+from app.services.podcast_index_client import PodcastIndexError, get_podcast_index_client
 
 logger = logging.getLogger(__name__)
 
@@ -100,13 +99,8 @@ class SchedulingAgentService:
         )
 
     def _get_user_timezone(self) -> str:
-        """Fetch user's timezone from Google Calendar."""
-        if not self.user.google_tokens:
-            return "UTC"
-        try:
-            return CalendarService(self.user.google_tokens).get_calendar_timezone()
-        except Exception:
-            return "UTC"
+        """Fetch user's timezone from Google Calendar (cached on the user)."""
+        return get_user_timezone(self.db, self.user)
 
     def _get_podcast_recommendation(self, topic: str) -> Tuple[str, str]:
         """
@@ -118,65 +112,35 @@ class SchedulingAgentService:
         Returns:
             Tuple of (podcast_name, episode_title)
         """
-        api_key = os.getenv('PODCAST_INDEX_API_KEY')
-        api_secret = os.getenv('PODCAST_INDEX_API_SECRET')
-
-        if not api_key or not api_secret:
+        client = get_podcast_index_client()
+        if not client.has_credentials:
             logger.warning("Podcast Index API credentials not configured, using fallback")
             return self._get_fallback_podcast(topic)
 
         try:
-            # Generate auth headers
-            api_header_time = str(int(time.time()))
-            data_to_hash = api_key + api_secret + api_header_time
-            sha_1_hash = hashlib.sha1(data_to_hash.encode()).hexdigest()
-
-            headers = {
-                'X-Auth-Date': api_header_time,
-                'X-Auth-Key': api_key,
-                'Authorization': sha_1_hash,
-                'User-Agent': 'GuruApp/1.0'
-            }
-
             # Search for trending podcasts in this topic
-            response = requests.get(
-                'https://api.podcastindex.org/api/1.0/search/byterm',
-                headers=headers,
-                params={'q': topic, 'max': 5},
-                timeout=10
-            )
+            feeds = client.search_by_term(topic, 5).get('feeds', [])
+
+            if feeds:
+                # Pick the first result
+                podcast = feeds[0]
+                podcast_name = podcast.get('title', f'{topic} Podcast')
+                podcast_id = podcast.get('id')
+
+                # Try to get a recent episode
+                if podcast_id:
+                    items = client.episodes_by_feed_id(podcast_id, 1).get('items', [])
+                    if items:
+                        episode_title = items[0].get('title', 'Latest Episode')
+                        return (podcast_name, episode_title)
+
+                return (podcast_name, 'Latest Episode')
 
-            if response.ok:
-                data = response.json()
-                feeds = data.get('feeds', [])
-
-                if feeds:
-                    # Pick the first result
-                    podcast = feeds[0]
-                    podcast_name = podcast.get('title', f'{topic} Podcast')
-                    podcast_id = podcast.get('id')
-
-                    # Try to get a recent episode
-                    if podcast_id:
-                        episodes_response = requests.get(
-                            'https://api.podcastindex.org/api/1.0/episodes/byfeedid',
-                            headers=headers,
-                            params={'id': podcast_id, 'max': 1},
-                            timeout=10
-                        )
-
-                        if episodes_response.ok:
-                            episodes_data = episodes_response.json()
-                            items = episodes_data.get('items', [])
-                            if items:
-                                episode_title = items[0].get('title', 'Latest Episode')
-                                return (podcast_name, episode_title)
-
-                    return (podcast_name, 'Latest Episode')
-
-            logger.warning(f"Podcast Index API request failed: {response.status_code}")
             return self._get_fallback_podcast(topic)
 
+        except PodcastIndexError as e:
+            logger.warning(f"Podcast Index API request failed: {e}")
+            return self._get_fallback_podcast(topic)
         except Exception as e:
             logger.error(f"Error fetching podcast from API: {e}")
             return self._get_fallback_podcast(topic)
@@ -1,6 +1,7 @@
 """AI Todo Scheduling Service using Claude API.
 
-This service handles intelligent todo scheduling for a specific day by:
+This service handles intelligent todo scheduling for a specific day (or a
+range of days, for the weekly cleanup) by:
 1. Fetching user preferences (sleep time, wake time, important events)
 2. Analyzing calendar events for the target day
 3. Finding available time slots
@@ -10,7 +11,9 @@ This service handles intelligent todo scheduling for a specific day by:
 
 import os
 import json
+import hashlib
 import logging
+import uuid
 from datetime import datetime, date, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 
@@ -29,6 +32,7 @@ from app.schemas.schedule import (
     ScheduleWarning,
 )
 from app.services.calendar_service import CalendarService
+from app.services.user_timezone import get_user_timezone
 
 logger = logging.getLogger(__name__)
 
@@ -64,13 +68,8 @@ class TodoSchedulerService:
         return self.db.query(UserPreference).filter_by(user_id=self.user.id).first()
 
     def _get_user_timezone(self) -> str:
-        """Fetch user's timezone from Google Calendar."""
-        if not self.user.google_tokens:
-            return "UTC"
-        try:
-            return CalendarService(self.user.google_tokens).get_calendar_timezone()
-        except Exception:
-            return "UTC"
+        """Fetch user's timezone from Google Calendar (cached on the user)."""
+        return get_user_timezone(self.db, self.user)
 
     def _get_calendar_events(self, target_date: date) -> List[Dict[str, Any]]:
         """Fetch calendar events for the target day."""
@@ -316,6 +315,103 @@ IMPORTANT:
 - If you cannot schedule ALL selected todos, set "requires_reranking" in reasoning to suggest user should reprioritize
 - Always schedule in priority order - never skip a high-priority item to fit a lower-priority one
 - Times must be in ISO format: {target_date.isoformat()}THH:MM:SS
+"""
+        return prompt
+
+    def _build_week_scheduling_prompt(
+        self,
+        todos: List[TodoItem],
+        available_slots: List[Dict[str, datetime]],
+        calendar_events: List[Dict[str, Any]],
+        dates: List[date],
+        timezone: str,
+    ) -> str:
+        """Build the prompt for Claude to schedule todos across several days."""
+
+        # Format todos
+        todos_text = "TODOS TO SCHEDULE (in priority order - 1 is highest priority):\n"
+        total_requested = 0
+        for todo in sorted(todos, key=lambda x: x.priority):
+            duration = todo.estimated_duration_minutes or 30
+            total_requested += duration
+            todos_text += f"- ID: {todo.id}, Priority: {todo.priority}, Duration: {duration}min, Text: \"{todo.text}\"\n"
+
+        # Format available slots, grouped by day
+        slots_text = "AVAILABLE TIME SLOTS:\n"
+        total_available = 0
+        for day in dates:
+            slots_text += f"{day.strftime('%A, %B %d, %Y')}:\n"
+            day_slots = [slot for slot in available_slots if slot['start'].date() == day]
+            if not day_slots:
+                slots_text += "- (no free time)\n"
+            for slot in day_slots:
+                duration = int((slot['end'] - slot['start']).total_seconds() / 60)
+                total_available += duration
+                slots_text += f"- {slot['start'].strftime('%H:%M')} to {slot['end'].strftime('%H:%M')} ({duration} minutes)\n"
+
+        # Format existing events
+        events_text = "EXISTING CALENDAR EVENTS (BLOCKED - DO NOT OVERLAP):\n"
+        for event in calendar_events:
+            start = event.get("start", {}).get("dateTime", event.get("start", {}).get("date", ""))
+            end = event.get("end", {}).get("dateTime", event.get("end", {}).get("date", ""))
+            events_text += f"- {event.get('summary', 'Untitled')}: {start} to {end}\n"
+
+        first_day = dates[0].strftime('%A, %B %d, %Y')
+        last_day = dates[-1].strftime('%A, %B %d, %Y')
+        prompt = f"""You are an AI scheduling assistant. Your task is to schedule todo items carried over from last week into available time slots between {first_day} and {last_day}.
+
+Timezone: {timezone}
+
+{todos_text}
+
+{slots_text}
+
+{events_text}
+
+TOTAL TIME NEEDED: {total_requested} minutes
+TOTAL TIME AVAILABLE: {total_available} minutes
+
+CRITICAL RULES:
+1. Schedule todos in PRIORITY ORDER (priority 1 first, then 2, etc.)
+2. NEVER schedule during existing calendar events
+3. NEVER schedule outside the available slots
+4. Spread the todos across the days to balance the workload; avoid piling them onto one day
+5. If a todo doesn't fit in any slot, mark it as "unscheduled" with a reason
+6. Leave at least 5-minute buffer between scheduled items
+7. Consider energy levels: schedule important tasks during morning/peak hours if possible
+
+Respond with a JSON object in this EXACT format:
+{{
+    "scheduled_todos": [
+        {{
+            "todo_id": "the-todo-id",
+            "text": "the todo text",
+            "start_time": "{dates[0].isoformat()}T09:00:00",
+            "end_time": "{dates[0].isoformat()}T09:30:00",
+            "priority": 1
+        }}
+    ],
+    "unscheduled_todos": [
+        {{
+            "todo_id": "the-todo-id",
+            "text": "the todo text",
+            "priority": 5,
+            "reason": "Not enough time available this week",
+            "suggested_alternative": "Reduce duration or schedule manually"
+        }}
+    ],
+    "reasoning": "Explanation of scheduling decisions",
+    "warnings": [
+        {{
+            "message": "Warning message here",
+            "severity": "warning"
+        }}
+    ]
+}}
+
+IMPORTANT:
+- Each todo is scheduled at most once
+- Times must be in ISO format: YYYY-MM-DDTHH:MM:SS, on one of the days above
 """
         return prompt
 
@@ -402,15 +498,148 @@ IMPORTANT:
             )
 
         # Create calendar events for scheduled todos
+        calendar_service = None
+        if self.user.google_tokens:
+            try:
+                calendar_service = CalendarService(self.user.google_tokens)
+            except Exception as e:
+                logger.error(f"Failed to create calendar service: {e}")
+        scheduled_todos = self._create_todo_events(schedule_data, calendar_service)
+        self.db.commit()
+
+        return self._build_response(
+            request.targetDate, scheduled_todos, schedule_data, total_available, total_requested
+        )
+
+    async def schedule_todos_for_week(
+        self,
+        todos: List[TodoItem],
+        week_start: date,
+        days: int = 5,
+        calendar_service: Optional[CalendarService] = None,
+    ) -> TodoScheduleResponse:
+        """
+        Schedule todo items across consecutive days in one planning pass.
+
+        Fetches preferences and calendar events once for the whole range and
+        makes a single AI call, instead of one schedule_todos call per day.
+        List items get their new calendar event IDs but are not committed;
+        the caller commits. Event IDs are derived from the todo and the week,
+        so a retry after a failed commit reuses the events already created.
+
+        Args:
+            todos: Todos to schedule
+            week_start: First day to schedule on
+            days: Number of consecutive days
+            calendar_service: Calendar service to reuse (created if not given)
+
+        Returns:
+            TodoScheduleResponse (targetDate is week_start)
+        """
+        dates = [week_start + timedelta(days=offset) for offset in range(days)]
+        logger.info(f"Scheduling {len(todos)} todos for user {self.user.id} from {dates[0]} to {dates[-1]}")
+
+        if calendar_service is None and self.user.google_tokens:
+            try:
+                calendar_service = CalendarService(self.user.google_tokens)
+            except Exception as e:
+                logger.error(f"Failed to create calendar service: {e}")
+
+        preferences = self._get_user_preferences()
+        timezone = get_user_timezone(self.db, self.user, calendar_service)
+
+        # One fetch for the whole range (padded a day each side for UTC offsets)
+        calendar_events = []
+        if calendar_service:
+            try:
+                calendar_events = calendar_service.get_events(
+                    time_min=datetime.combine(dates[0] - timedelta(days=1), datetime.min.time()),
+                    time_max=datetime.combine(dates[-1] + timedelta(days=2), datetime.min.time()),
+                    max_results=2500,
+                )
+            except Exception as e:
+                logger.error(f"Failed to fetch calendar events: {e}")
+        day_strings = {day.isoformat() for day in dates}
+        calendar_events = [
+            event for event in calendar_events
+            if event.get("start", {}).get("dateTime", event.get("start", {}).get("date", ""))[:10] in day_strings
+        ]
+        logger.info(f"Found {len(calendar_events)} calendar events from {dates[0]} to {dates[-1]}")
+
+        available_slots = []
+        for day in dates:
+            wake_time = None
+            bed_time = None
+            if preferences:
+                wake_time = self._parse_time_string(preferences.wake_time, day)
+                bed_time = self._parse_time_string(preferences.bed_time, day)
+            day_slots, _ = self._calculate_available_slots(day, calendar_events, wake_time, bed_time)
+            available_slots.extend(day_slots)
+        total_available = sum(
+            int((slot['end'] - slot['start']).total_seconds() / 60) for slot in available_slots
+        )
+        total_requested = sum((todo.estimated_duration_minutes or 30) for todo in todos)
+
+        if not todos:
+            return self._build_response(
+                week_start, [], {"reasoning": "No todos to schedule"}, total_available, 0
+            )
+
+        schedule_data = None
+        if self.anthropic_client:
+            prompt = self._build_week_scheduling_prompt(
+                todos, available_slots, calendar_events, dates, timezone
+            )
+            schedule_data = await self._request_schedule(prompt)
+
+        if not schedule_data:
+            logger.warning("AI scheduling failed, using fallback")
+            # Slots are in chronological order across the days
+            schedule_data = self._generate_fallback_schedule(todos, available_slots, week_start)
+
+        scheduled_todos = self._create_todo_events(
+            schedule_data, calendar_service, event_key=f"week:{week_start.isoformat()}"
+        )
+        return self._build_response(
+            week_start, scheduled_todos, schedule_data, total_available, total_requested
+        )
+
+    def _create_todo_events(
+        self,
+        schedule_data: Dict[str, Any],
+        calendar_service: Optional[CalendarService],
+        event_key: Optional[str] = None,
+    ) -> List[ScheduledTodo]:
+        """
+        Create calendar events for scheduled todos and link them to their list items.
+
+        List items are updated in the session, not committed. With an
+        event_key, each todo's event gets an ID derived from the todo and
+        the key, so re-running after a failure (before the links were
+        committed) reuses the events created earlier instead of duplicating
+        them.
+        """
+        todo_ids = []
+        for todo_data in schedule_data.get("scheduled_todos", []):
+            try:
+                todo_ids.append(uuid.UUID(str(todo_data["todo_id"])))
+            except (KeyError, ValueError):
+                continue
+        list_items = {
+            str(item.id): item
+            for item in self.db.query(ListItem).filter(
+                ListItem.user_id == self.user.id,
+                ListItem.id.in_(todo_ids)
+            )
+        } if todo_ids else {}
+
         scheduled_todos = []
         for todo_data in schedule_data.get("scheduled_todos", []):
             calendar_event_id = None
 
             # Create Google Calendar event
-            if self.user.google_tokens:
+            if calendar_service:
                 try:
-                    calendar_service = CalendarService(self.user.google_tokens)
-
                     start_time = datetime.fromisoformat(todo_data["start_time"])
                     end_time = datetime.fromisoformat(todo_data["end_time"])
 
@@ -420,15 +649,15 @@ IMPORTANT:
                         end_time=end_time,
                         description=f"Todo item scheduled by Guru AI",
                         color_id=self.TODO_COLOR_ID,
+                        event_id=self._todo_event_id(todo_data["todo_id"], event_key) if event_key else None,
                     )
                     calendar_event_id = event.get("id")
                     logger.info(f"Created calendar event {calendar_event_id} for todo {todo_data['todo_id']}")
 
                     # Update the list item with calendar event ID
-                    list_item = self.db.query(ListItem).filter_by(id=todo_data["todo_id"]).first()
+                    list_item = list_items.get(str(todo_data["todo_id"]))
                     if list_item:
                         list_item.calendar_event_id = calendar_event_id
-                        self.db.commit()
 
                 except Exception as e:
                     logger.error(f"Failed to create calendar event for todo: {e}")
@@ -443,6 +672,22 @@ IMPORTANT:
                 scheduled_successfully=calendar_event_id is not None,
             ))
 
+        return scheduled_todos
+
+    @staticmethod
+    def _todo_event_id(todo_id: str, event_key: str) -> str:
+        """Deterministic Google Calendar event ID for a todo (hex is valid base32hex)."""
+        return hashlib.md5(f"{todo_id}:{event_key}".encode()).hexdigest()
+
+    def _build_response(
+        self,
+        target_date: date,
+        scheduled_todos: List[ScheduledTodo],
+        schedule_data: Dict[str, Any],
+        total_available: int,
+        total_requested: int,
+    ) -> TodoScheduleResponse:
+        """Build the scheduling response from the created events and the raw schedule."""
         # Build unscheduled todos list
         unscheduled_todos = [
             UnscheduledTodo(
@@ -474,7 +719,7 @@ IMPORTANT:
 
         return TodoScheduleResponse(
             success=True,
-            targetDate=request.targetDate,
+            targetDate=target_date,
             scheduledTodos=scheduled_todos,
             unscheduledTodos=unscheduled_todos,
             scheduledCount=len(scheduled_todos),
@@ -500,7 +745,10 @@ IMPORTANT:
         prompt = self._build_scheduling_prompt(
             todos, available_slots, calendar_events, target_date, timezone, preferences
         )
+        return await self._request_schedule(prompt)
 
+    async def _request_schedule(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """Send a scheduling prompt to Claude and parse the JSON schedule."""
         try:
             logger.info("Sending request to Claude API for todo scheduling...")
             message = self.anthropic_client.messages.create(
@@ -0,0 +1,137 @@
+"""Shared trending-podcast cache with stale-while-revalidate refresh."""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.cache import SharedCache
+from app.services.podcast_index_client import (
+    PodcastIndexError,
+    PodcastIndexNotConfigured,
+    get_podcast_index_client,
+)
+
+logger = logging.getLogger(__name__)
+
+# Trending is fetched once per (category, lang) at the largest size any caller
+# uses, and callers slice it - the list is ranked, so the top N is the same
+TRENDING_FETCH_MAX = 100
+
+# Entries are served without refresh while fresh, served and refreshed in the
+# background while stale, and dropped after the stale window
+TRENDING_FRESH_SECONDS = int(os.getenv('TRENDING_FRESH_SECONDS', '600'))
+TRENDING_STALE_SECONDS = int(os.getenv('TRENDING_STALE_SECONDS', str(24 * 3600)))
+
+# Keys refreshed at startup and on every beat tick, plus any requested since
+DEFAULT_TRENDING_KEYS: List[Tuple[Optional[str], Optional[str]]] = [(None, 'en')]
+
+trending_cache = SharedCache('podcast_trending', default_ttl=TRENDING_STALE_SECONDS)
+
+
+def _cache_key(category: Optional[str], lang: Optional[str]) -> str:
+    return f"{(category or 'all').lower()}:{(lang or 'any').lower()}"
+
+
+def _fetch_trending(category: Optional[str], lang: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    """Fetch raw trending feeds from Podcast Index (None on failure)."""
+    try:
+        data = get_podcast_index_client().trending(
+            TRENDING_FETCH_MAX, category=category, lang=lang, ttl=0
+        )
+        return data.get('feeds', [])
+    except PodcastIndexNotConfigured:
+        logger.error("Missing Podcast Index API credentials")
+    except PodcastIndexError as e:
+        logger.warning(f"Trending fetch failed for {category}/{lang}: {e}")
+
+    return None
+
+
+def refresh_trending(category: Optional[str] = None, lang: Optional[str] = 'en') -> bool:
+    """Fetch trending feeds for one key and store them.
+
+    Returns:
+        True if the cache entry was refreshed
+    """
+    feeds = _fetch_trending(category, lang)
+    if feeds is None:
+        return False
+
+    trending_cache.set(_cache_key(category, lang), {'fetched_at': time.time(), 'feeds': feeds})
+    _remember_key(category, lang)
+    return True
+
+
+def refresh_known_trending() -> int:
+    """Refresh every default and previously requested key (beat tick / startup).
+
+    Returns:
+        Number of keys refreshed
+    """
+    keys = {tuple(k) for k in (trending_cache.get('known_keys') or [])}
+    keys.update(DEFAULT_TRENDING_KEYS)
+    return sum(1 for category, lang in keys if refresh_trending(category, lang))
+
+
+def get_trending_feeds(
+    category: Optional[str] = None,
+    lang: Optional[str] = 'en',
+    limit: int = 20
+) -> Optional[List[Dict[str, Any]]]:
+    """Get raw Podcast Index trending feeds from the shared cache.
+
+    Fresh entries are returned as-is. Stale entries are returned immediately
+    while a background refresh runs (at most one per key across processes).
+    Only a key that has never been fetched, or whose stale window has passed,
+    is fetched on the calling thread.
+
+    Args:
+        category: Optional Podcast Index category filter
+        lang: Optional language filter
+        limit: Maximum feeds to return
+
+    Returns:
+        List of raw feed dicts, or None if trending is unavailable
+    """
+    key = _cache_key(category, lang)
+    entry = trending_cache.get(key)
+
+    if entry is None:
+        def compute():
+            feeds = _fetch_trending(category, lang)
+            if feeds is None:
+                return None, 0
+            _remember_key(category, lang)
+            return {'fetched_at': time.time(), 'feeds': feeds}, None
+
+        entry = trending_cache.get_or_compute(key, compute)
+        if entry is None:
+            return None
+    elif time.time() - entry.get('fetched_at', 0) > TRENDING_FRESH_SECONDS:
+        _schedule_refresh(category, lang)
+
+    return entry['feeds'][:limit]
+
+
+def _schedule_refresh(category: Optional[str], lang: Optional[str]) -> None:
+    """Refresh a stale key in a background thread, deduped across processes."""
+    if not trending_cache.add(f"refreshing:{_cache_key(category, lang)}", True, ttl=60):
+        return
+
+    thread = threading.Thread(
+        target=refresh_trending,
+        args=(category, lang),
+        name="trending-refresh",
+        daemon=True,
+    )
+    thread.start()
+
+
+def _remember_key(category: Optional[str], lang: Optional[str]) -> None:
+    """Track requested keys so the beat tick keeps them warm."""
+    known = trending_cache.get('known_keys') or []
+    if [category, lang] not in known:
+        known.append([category, lang])
+        trending_cache.set('known_keys', known, ttl=7 * 24 * 3600)
@@ -0,0 +1,98 @@
+"""Users' Google Calendar timezones, cached on the users table.
+
+The schedulers need the timezone on every run and the weekly cleanup needs
+it to put each user in their local-midnight cohort without calling Google
+for every user. The cached value is re-fetched once it is older than
+TIMEZONE_REFRESH; users never fetched count as UTC. The cache is written
+through its own short-lived session, so callers' transactions are left
+alone.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone, tzinfo
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.user import User
+from app.services.calendar_service import CalendarService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEZONE = "UTC"
+TIMEZONE_REFRESH = timedelta(days=1)
+
+
+def get_zone(name: Optional[str]) -> tzinfo:
+    """tzinfo for an IANA name; UTC when missing or unknown."""
+    if not name:
+        return dt_timezone.utc
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        return dt_timezone.utc
+
+
+def get_user_timezone(db: Session, user: User, calendar_service: Optional[CalendarService] = None) -> str:
+    """
+    The user's calendar timezone, from the cache or Google Calendar.
+
+    Args:
+        db: The caller's database session (not committed or rolled back)
+        user: User
+        calendar_service: Existing calendar service to fetch with, if any
+
+    Returns:
+        IANA timezone name (UTC if unknown)
+    """
+    checked_at = user.calendar_timezone_checked_at
+    if user.calendar_timezone and checked_at and datetime.utcnow() - checked_at < TIMEZONE_REFRESH:
+        return user.calendar_timezone
+    if not user.google_tokens:
+        return user.calendar_timezone or DEFAULT_TIMEZONE
+
+    try:
+        calendar_service = calendar_service or CalendarService(user.google_tokens)
+        fetched = calendar_service.get_calendar_timezone(default=None)
+    except Exception as e:
+        logger.warning(f"Could not fetch calendar timezone for user {user.id}: {e}")
+        fetched = None
+    if fetched is None:
+        # Keep the last known value rather than falling back to UTC
+        return user.calendar_timezone or DEFAULT_TIMEZONE
+
+    _cache_timezone(user, fetched)
+    return fetched
+
+
+def _cache_timezone(user: User, timezone: str) -> None:
+    """Store a fetched timezone with a separate session and commit."""
+    from app.database import SessionLocal
+
+    checked_at = datetime.utcnow()
+    cache_db = SessionLocal()
+    try:
+        # Leave updated_at alone: it orders users elsewhere
+        cache_db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(
+                calendar_timezone=timezone,
+                calendar_timezone_checked_at=checked_at,
+                updated_at=User.updated_at,
+            )
+        )
+        cache_db.commit()
+    except Exception as e:
+        cache_db.rollback()
+        logger.warning(f"Could not cache calendar timezone for user {user.id}: {e}")
+        return
+    finally:
+        cache_db.close()
+
+    # Mirror the stored values without marking the caller's user dirty
+    set_committed_value(user, 'calendar_timezone', timezone)
+    set_committed_value(user, 'calendar_timezone_checked_at', checked_at)
@@ -28,6 +28,7 @@ from app.schemas.schedule import (
     ScheduleWarning,
 )
 from app.services.calendar_service import CalendarService
+from app.services.user_timezone import get_user_timezone
 
 logger = logging.getLogger(__name__)
 
@@ -76,13 +77,8 @@ class WorkoutSchedulerService:
         )
 
     def _get_user_timezone(self) -> str:
-        """Fetch user's timezone from Google Calendar."""
-        if not self.user.google_tokens:
-            return "UTC"
-        try:
-            return CalendarService(self.user.google_tokens).get_calendar_timezone()
-        except Exception:
-            return "UTC"
+        """Fetch user's timezone from Google Calendar (cached on the user)."""
+        return get_user_timezone(self.db, self.user)
 
     def _get_calendar_events(self, week_start: date) -> List[Dict[str, Any]]:
         """Fetch calendar events for the week."""
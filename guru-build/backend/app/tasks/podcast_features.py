@@ -0,0 +1,167 @@
+"""Background tasks for podcast feature extraction."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import bindparam, update
+
+from app.cache import SharedCache
+from app.celery_config import celery_app
+from app.database import SessionLocal
+from app.models.podcast_recommendation import PodcastFeatures
+from app.services.feature_extraction_service import FeatureExtractionService
+from app.services.feature_refresh import (
+    REFRESH_BATCH_SIZE,
+    feature_refresh_queue,
+    plan_feature_refresh,
+    refresh_next_batch,
+)
+from app.services.trending_cache import refresh_known_trending
+
+logger = logging.getLogger(__name__)
+
+# Cross-process claim so refresh runs never overlap
+refresh_locks = SharedCache('feature_refresh_lock', default_ttl=10 * 60)
+
+
+@celery_app.task(name="app.tasks.podcast_features.backfill_podcast_features")
+def backfill_podcast_features(
+    podcast_ids: List[str],
+    skip_existing: bool = True,
+    batch_size: Optional[int] = None
+):
+    """
+    Extract and store features for a list of podcasts using the batch pipeline.
+
+    Args:
+        podcast_ids: External podcast IDs to process
+        skip_existing: Skip podcasts that already have embeddings
+        batch_size: Podcasts per upsert transaction
+    """
+    db = SessionLocal()
+    try:
+        service = FeatureExtractionService(db)
+        results = service.batch_extract_features(
+            podcast_ids,
+            skip_existing=skip_existing,
+            batch_size=batch_size
+        )
+        logger.info(f"Backfilled features for {len(results)}/{len(podcast_ids)} podcasts")
+        return len(results)
+    except Exception as e:
+        logger.error(f"Error in podcast feature backfill: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.podcast_features.backfill_podcast_artwork")
+def backfill_podcast_artwork(podcast_ids: List[str]):
+    """
+    Fill in missing artwork for podcasts that already have feature rows.
+
+    Podcast Index has no bulk lookup by feed ID, so feeds are fetched
+    concurrently and all found artwork is written with one UPDATE.
+
+    Args:
+        podcast_ids: External podcast IDs whose artwork is missing
+    """
+    db = SessionLocal()
+    try:
+        service = FeatureExtractionService(db)
+
+        with ThreadPoolExecutor(max_workers=service.FETCH_WORKERS) as executor:
+            feeds = list(executor.map(service._fetch_podcast_data, podcast_ids))
+
+        rows = []
+        for podcast_id, feed in zip(podcast_ids, feeds):
+            artwork = (feed or {}).get('artwork') or (feed or {}).get('image')
+            if artwork:
+                rows.append({
+                    'b_external_id': podcast_id,
+                    'b_artwork': service._fix_image_url(artwork),
+                })
+
+        if rows:
+            table = PodcastFeatures.__table__
+            db.execute(
+                update(table)
+                .where(table.c.external_id == bindparam('b_external_id'))
+                .values(artwork=bindparam('b_artwork'), updated_at=datetime.utcnow()),
+                rows
+            )
+            db.commit()
+
+        logger.info(f"Backfilled artwork for {len(rows)}/{len(podcast_ids)} podcasts")
+        return len(rows)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error in artwork backfill: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.podcast_features.refresh_trending_podcasts")
+def refresh_trending_podcasts():
+    """
+    Keep the shared trending cache warm so no request waits on Podcast Index.
+
+    Runs on a beat tick and once when a worker starts.
+    """
+    refreshed = refresh_known_trending()
+    logger.info(f"Refreshed {refreshed} trending cache entries")
+    return refreshed
+
+
+@celery_app.task(name="app.tasks.podcast_features.plan_feature_refresh")
+def plan_feature_refresh_task():
+    """
+    Queue stale and missing podcast features by staleness x demand.
+
+    Demand is the number of users whose cached recommendations, saves or
+    recent listening reference a podcast; request-time demand is added to
+    the same queue as it happens.
+    """
+    db = SessionLocal()
+    try:
+        queued = plan_feature_refresh(db)
+        logger.info(f"Queued {queued} podcasts for feature refresh ({len(feature_refresh_queue)} pending)")
+        return queued
+    except Exception as e:
+        logger.error(f"Error planning feature refresh: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.podcast_features.refresh_stale_features")
+def refresh_stale_features(batch_size: Optional[int] = None):
+    """
+    Refresh the highest-priority queued podcasts in one rate-limited batch.
+
+    Runs every minute, so at most batch_size podcasts are refreshed per
+    minute on top of the Podcast Index client's own rate limit. A run is
+    skipped while another one still holds the claim.
+
+    Args:
+        batch_size: Override FEATURE_REFRESH_BATCH_SIZE
+    """
+    if not refresh_locks.add('refresh', True):
+        logger.info("Feature refresh already running, skipping")
+        return 0
+
+    db = SessionLocal()
+    try:
+        refreshed = refresh_next_batch(db, batch_size or REFRESH_BATCH_SIZE)
+        if refreshed:
+            logger.info(f"Refreshed features for {refreshed} podcasts")
+        return refreshed
+    except Exception as e:
+        logger.error(f"Error refreshing stale features: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+        refresh_locks.delete('refresh')
@@ -0,0 +1,384 @@
+"""Background jobs for podcast recommendations."""
+
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import insert, or_, union
+from sqlalchemy.orm import Session
+
+from app.celery_config import celery_app
+from app.database import SessionLocal
+from app.models.podcast_recommendation import (
+    InteractionType,
+    ListeningDailyRollup,
+    ListeningSession,
+    PodcastInteraction,
+    RecommendationCache,
+    UserPodcastProfile,
+)
+from app.models.saved_media import SavedPodcast
+from app.models.user import User
+from app.services.collaborative_filtering import rebuild_podcast_neighbors
+from app.services.listening_progress import listening_progress_buffer
+from app.services.listening_rollups import purge_expired_sessions, roll_up_listening_sessions
+from app.services.partitions import (
+    INTERACTION_RETENTION_DAYS,
+    drop_expired_partitions,
+    ensure_partitions,
+    retention_cutoff,
+)
+from app.services.profile_updates import profile_update_queue
+from app.services.recommendation_scoring import (
+    CatalogMatrix,
+    ProfileVectors,
+    collaborative_affinity,
+    score_catalog,
+)
+from app.services.recommendation_service import LISTENING_CONTEXTS, RecommendationService
+
+logger = logging.getLogger(__name__)
+
+# Precompute settings
+PRECOMPUTE_TIME_BUDGET_SECONDS = int(os.getenv("PRECOMPUTE_TIME_BUDGET_SECONDS", str(25 * 60)))
+PRECOMPUTE_USER_BLOCK_SIZE = int(os.getenv("PRECOMPUTE_USER_BLOCK_SIZE", "128"))
+PRECOMPUTE_CATALOG_SIZE = int(os.getenv("PRECOMPUTE_CATALOG_SIZE", "50000"))
+PRECOMPUTE_LIMIT = int(os.getenv("PRECOMPUTE_LIMIT", "20"))
+PRECOMPUTE_CACHE_HOURS = int(os.getenv("PRECOMPUTE_CACHE_HOURS", "26"))  # Until after the next run
+ACTIVE_USER_DAYS = int(os.getenv("ACTIVE_USER_DAYS", "30"))
+
+# Item-item collaborative filtering settings
+CF_TOP_N = int(os.getenv("CF_TOP_N", "50"))
+CF_MIN_SUPPORT = int(os.getenv("CF_MIN_SUPPORT", "2"))
+CF_LOOKBACK_DAYS = int(os.getenv("CF_LOOKBACK_DAYS", "365"))
+CF_BLOCK_SIZE = int(os.getenv("CF_BLOCK_SIZE", "1000"))
+
+
+@celery_app.task(name="app.tasks.recommendations.precompute_recommendations")
+def precompute_recommendations(time_budget_seconds: Optional[int] = None):
+    """
+    Nightly job that precomputes recommendations for all active users.
+
+    Loads the catalog into a matrix once, scores blocks of users against the
+    whole catalog for every listening context in one vectorized pass, and
+    bulk-writes the results to recommendation_cache and the fast cache tier.
+    Stops cleanly once the time budget is used up; users not reached keep
+    computing inline on their next request.
+
+    Args:
+        time_budget_seconds: Override PRECOMPUTE_TIME_BUDGET_SECONDS
+    """
+    budget = time_budget_seconds or PRECOMPUTE_TIME_BUDGET_SECONDS
+    deadline = time.monotonic() + budget
+    db = SessionLocal()
+    try:
+        catalog = CatalogMatrix.load(db, limit=PRECOMPUTE_CATALOG_SIZE).load_neighbors(db)
+        if not len(catalog):
+            logger.info("No podcast features available, skipping precompute")
+            return 0
+
+        user_ids = _get_active_user_ids(db)
+        logger.info(
+            f"Precomputing recommendations for {len(user_ids)} users "
+            f"x {len(LISTENING_CONTEXTS)} contexts over {len(catalog)} podcasts"
+        )
+
+        processed = 0
+        for offset in range(0, len(user_ids), PRECOMPUTE_USER_BLOCK_SIZE):
+            if time.monotonic() >= deadline:
+                logger.warning(
+                    f"Precompute time budget of {budget}s exhausted after "
+                    f"{processed}/{len(user_ids)} users"
+                )
+                break
+
+            block = user_ids[offset:offset + PRECOMPUTE_USER_BLOCK_SIZE]
+            try:
+                processed += _precompute_block(db, catalog, block)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error precomputing block at offset {offset}: {e}", exc_info=True)
+
+        logger.info(f"Precomputed recommendations for {processed} users")
+        return processed
+
+    except Exception as e:
+        logger.error(f"Error in recommendation precompute task: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+def _get_active_user_ids(db: Session) -> List[uuid.UUID]:
+    """Users with listening, interaction or profile activity in the window."""
+    since = datetime.utcnow() - timedelta(days=ACTIVE_USER_DAYS)
+    active = union(
+        db.query(ListeningSession.user_id).filter(ListeningSession.started_at >= since),
+        db.query(PodcastInteraction.user_id).filter(PodcastInteraction.interaction_timestamp >= since),
+        db.query(UserPodcastProfile.user_id).filter(UserPodcastProfile.last_updated_at >= since),
+    )
+    return sorted(row[0] for row in db.execute(active))
+
+
+def _get_user_podcast_sets(db: Session, user_ids: List[uuid.UUID]):
+    """Interacted and disliked podcast IDs for a block of users (2 queries).
+
+    Returns:
+        Tuple of (interacted, disliked) dicts mapping user_id -> set of IDs
+    """
+    interacted: Dict[uuid.UUID, Set[str]] = defaultdict(set)
+    disliked: Dict[uuid.UUID, Set[str]] = defaultdict(set)
+
+    # Rollups rather than raw sessions: raw rows are subject to retention
+    sessions = db.query(
+        ListeningDailyRollup.user_id, ListeningDailyRollup.podcast_external_id
+    ).filter(ListeningDailyRollup.user_id.in_(user_ids))
+    saved = db.query(
+        SavedPodcast.user_id, SavedPodcast.external_id
+    ).filter(SavedPodcast.user_id.in_(user_ids))
+    for user_id, podcast_id in sessions.union(saved):
+        interacted[user_id].add(podcast_id)
+
+    interactions = db.query(
+        PodcastInteraction.user_id,
+        PodcastInteraction.podcast_external_id,
+        PodcastInteraction.interaction_type,
+    ).filter(PodcastInteraction.user_id.in_(user_ids)).distinct()
+    for user_id, podcast_id, interaction_type in interactions:
+        interacted[user_id].add(podcast_id)
+        if interaction_type == InteractionType.dislike:
+            disliked[user_id].add(podcast_id)
+
+    return interacted, disliked
+
+
+def _precompute_block(db: Session, catalog: CatalogMatrix, user_ids: List[uuid.UUID]) -> int:
+    """Score, rank and bulk-write recommendations for one block of users."""
+    users = db.query(User).filter(User.id.in_(user_ids)).all()
+    profiles = {
+        p.user_id: p
+        for p in db.query(UserPodcastProfile).filter(UserPodcastProfile.user_id.in_(user_ids)).all()
+    }
+    # Users without a stored profile are scored like the request path scores
+    # a freshly created (empty) profile
+    for user in users:
+        if user.id not in profiles:
+            profiles[user.id] = UserPodcastProfile(user_id=user.id)
+    interacted, disliked = _get_user_podcast_sets(db, user_ids)
+
+    interacted_mask = np.stack([catalog.mask_for(interacted[u.id]) for u in users])
+    disliked_mask = np.stack([catalog.mask_for(disliked[u.id]) for u in users])
+    profile_vectors = [ProfileVectors.from_profile(profiles[u.id]) for u in users]
+    collaborative = collaborative_affinity(
+        catalog, [interacted[u.id] - disliked[u.id] for u in users]
+    )
+    services = [RecommendationService(db, u) for u in users]
+
+    now = datetime.utcnow()
+    expires_at = now + timedelta(hours=PRECOMPUTE_CACHE_HOURS)
+    rows = []
+    payloads = []
+
+    for context in LISTENING_CONTEXTS:
+        scores = score_catalog(
+            catalog, profile_vectors, context, interacted_mask, disliked_mask, collaborative
+        )
+        for i, service in enumerate(services):
+            recommendations = service.rank_and_hydrate(
+                catalog, scores[i], profiles[service.user.id], context, PRECOMPUTE_LIMIT
+            )
+            if not recommendations:
+                continue
+            payloads.append((service, context, recommendations))
+            rows.append({
+                'id': uuid.uuid4(),
+                'user_id': service.user.id,
+                'podcast_ids': [r['podcast_id'] for r in recommendations],
+                'scores': [r['score'] for r in recommendations],
+                'reasons': [r['reason'] for r in recommendations],
+                'algorithm_version': RecommendationService.ALGORITHM_VERSION,
+                'model_type': 'hybrid_batch',
+                'context': context,
+                'generated_at': now,
+                'expires_at': expires_at,
+                'created_at': now,
+                'updated_at': now,
+            })
+
+    # Replace the block's cache rows in one transaction
+    contexts = [c for c in LISTENING_CONTEXTS if c is not None]
+    db.query(RecommendationCache).filter(
+        RecommendationCache.user_id.in_(user_ids),
+        or_(RecommendationCache.context.in_(contexts), RecommendationCache.context.is_(None))
+    ).delete(synchronize_session=False)
+    if rows:
+        db.execute(insert(RecommendationCache.__table__), rows)
+    db.commit()
+
+    ttl = PRECOMPUTE_CACHE_HOURS * 3600
+    for service, context, recommendations in payloads:
+        service.fast_cache.set(service._fast_cache_key(context), recommendations, ttl)
+
+    return len(users)
+
+
+@celery_app.task(name="app.tasks.recommendations.compute_podcast_neighbors")
+def compute_podcast_neighbors():
+    """
+    Nightly job that rebuilds item-item collaborative filtering neighbours.
+
+    Runs before precompute_recommendations so the nightly recommendations
+    use fresh neighbours.
+    """
+    db = SessionLocal()
+    try:
+        return rebuild_podcast_neighbors(
+            db,
+            top_n=CF_TOP_N,
+            min_support=CF_MIN_SUPPORT,
+            lookback_days=CF_LOOKBACK_DAYS,
+            block_size=CF_BLOCK_SIZE,
+        )
+    except Exception as e:
+        logger.error(f"Error computing podcast neighbours: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.recommendations.invalidate_podcast_recommendations")
+def invalidate_podcast_recommendations(podcast_ids: List[str]):
+    """
+    Drop every user's cached recommendations that include these podcasts.
+
+    Queue this when podcasts are delisted or their features change.
+
+    Args:
+        podcast_ids: External podcast IDs
+    """
+    db = SessionLocal()
+    try:
+        return RecommendationService.invalidate_podcasts_for_all_users(db, podcast_ids)
+    except Exception as e:
+        logger.error(f"Error invalidating recommendations for {podcast_ids}: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.recommendations.flush_listening_progress")
+def flush_listening_progress():
+    """
+    Write buffered listening-session progress to Postgres in bulk.
+
+    Runs every LISTENING_PROGRESS_FLUSH_SECONDS; all sessions buffered since
+    the last run are written with one UPDATE ... FROM (VALUES ...).
+    """
+    if not listening_progress_buffer.enabled:
+        return 0
+
+    db = SessionLocal()
+    try:
+        flushed = listening_progress_buffer.flush(db)
+        if flushed:
+            logger.info(f"Flushed progress for {flushed} listening sessions")
+        return flushed
+    except Exception as e:
+        logger.error(f"Error flushing listening progress: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.recommendations.update_user_profile")
+def update_user_profile(user_id: str):
+    """
+    Rebuild one user's podcast profile from their listening history.
+
+    Queued by schedule_profile_update() after the debounce window, so a
+    burst of interactions results in a single rebuild.
+
+    Args:
+        user_id: User UUID as a string
+    """
+    # Clear first: events recorded from here on schedule a new update
+    profile_update_queue.clear_pending(user_id)
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter_by(id=uuid.UUID(user_id)).first()
+        if not user:
+            return False
+        RecommendationService(db, user).update_user_profile()
+        profile_update_queue.count('completed')
+        return True
+    except Exception as e:
+        db.rollback()
+        profile_update_queue.count('failed')
+        logger.error(f"Error updating profile for user {user_id}: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.recommendations.roll_up_listening_sessions")
+def roll_up_listening_sessions_task():
+    """
+    Fold sessions started, progressed or ended since the last run into
+    listening_daily_rollups.
+    """
+    db = SessionLocal()
+    try:
+        written = roll_up_listening_sessions(db)
+        if written:
+            logger.info(f"Updated {written} listening rollup rows")
+        return written
+    except Exception as e:
+        logger.error(f"Error rolling up listening sessions: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.recommendations.purge_listening_sessions")
+def purge_listening_sessions():
+    """
+    Drop monthly listening-session partitions past
+    LISTENING_SESSION_RETENTION_DAYS that the daily rollups already include.
+    """
+    db = SessionLocal()
+    try:
+        dropped = purge_expired_sessions(db)
+        logger.info(f"Dropped {dropped} expired listening session partitions")
+        return dropped
+    except Exception as e:
+        logger.error(f"Error purging listening sessions: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.recommendations.maintain_partitions")
+def maintain_partitions():
+    """
+    Create the coming months' partitions of listening_sessions and
+    podcast_interactions, and drop interaction partitions past
+    PODCAST_INTERACTION_RETENTION_DAYS (if set).
+    """
+    db = SessionLocal()
+    try:
+        created = ensure_partitions(db)
+        cutoff = retention_cutoff(INTERACTION_RETENTION_DAYS)
+        dropped = drop_expired_partitions(db, 'podcast_interactions', cutoff) if cutoff else 0
+        return {'created': len(created), 'dropped': dropped}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error maintaining partitions: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
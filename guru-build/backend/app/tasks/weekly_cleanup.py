@@ -1,207 +1,516 @@
-"""Weekly cleanup and auto-rescheduling task."""
-
+"""Weekly cleanup and auto-rescheduling task.
+
+Each user's cleanup runs at their local Sunday midnight. An hourly tick
+adds the users whose local Sunday has just begun (one cohort per calendar
+timezone, cached on the users table) to that week's run in cleanup_runs.
+The coordinator then enqueues one cleanup_user task per recorded user on
+the weekly_cleanup queue, in user-id pages, keeping at most
+CLEANUP_MAX_IN_FLIGHT users queued at a time. All progress lives in
+cleanup_runs and cleanup_run_users, so a crashed tick or coordinator
+resumes on its next run instead of starting over.
+"""
+
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import List
+import os
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from app.cache import SharedCache
 from app.celery_config import celery_app
 from app.database import SessionLocal
+from app.models.cleanup_run import CleanupRun, CleanupRunUser
 from app.models.user import User
-from app.models.list_item import ListItem, ItemType
+from app.models.list_item import ListItem, ListItemType
+from app.schemas.schedule import TodoItem
 from app.services.calendar_service import CalendarService
 from app.services.todo_scheduler_service import TodoSchedulerService
+from app.services.user_timezone import DEFAULT_TIMEZONE, get_user_timezone, get_zone
 
 logger = logging.getLogger(__name__)
 
+CLEANUP_QUEUE = "weekly_cleanup"
+# Users queued per page
+PAGE_SIZE = int(os.getenv('CLEANUP_PAGE_SIZE', '500'))
+# Users queued but not finished, per run
+MAX_IN_FLIGHT = int(os.getenv('CLEANUP_MAX_IN_FLIGHT', '200'))
+MAX_RETRIES = int(os.getenv('CLEANUP_MAX_RETRIES', '3'))
+RETRY_BACKOFF_SECONDS = 60
+# Per-user time limit; queued users untouched for longer than the stale
+# window were lost (worker crash, enqueue failure) and are enqueued again
+USER_TIME_LIMIT_SECONDS = 10 * 60
+STALE_SECONDS = 3 * USER_TIME_LIMIT_SECONDS
+
+coordinator_locks = SharedCache('weekly_cleanup_lock', default_ttl=10 * 60)
+
+_ADD_COHORT_SQL = text("""
+    INSERT INTO cleanup_run_users (id, run_id, user_id, status, attempts, created_at, updated_at)
+    SELECT gen_random_uuid(), CAST(:run_id AS uuid), id, 'pending', 0, :now, :now
+    FROM users
+    WHERE (CAST(:timezones AS text[]) IS NULL
+        OR COALESCE(calendar_timezone, :default_timezone) = ANY(CAST(:timezones AS text[])))
+    ON CONFLICT (run_id, user_id) DO NOTHING
+""")
+
+
+def week_start_for(today: date) -> date:
+    """The Sunday starting the week (Sunday to Saturday) that contains `today`."""
+    return today - timedelta(days=(today.weekday() + 1) % 7)
+
+
+def run_key_for(week_start: date, kind: str = "weekly") -> str:
+    return f"{kind}:{week_start.isoformat()}"
+
+
+@celery_app.task(name="app.tasks.weekly_cleanup.dispatch_cleanup_cohorts")
+def dispatch_cleanup_cohorts():
+    """
+    Hourly tick: add users whose local Sunday midnight has passed to the week's run.
+
+    Users are grouped by calendar timezone, so each tick adds the (small)
+    cohorts that just reached 00:00 on Sunday and load spreads across the
+    day. A cohort missed by a skipped tick is added on the next one. A run
+    stops taking cohorts once every timezone has reached its Sunday.
+
+    Returns:
+        Number of users added
+    """
+    if not coordinator_locks.add('cohorts', True):
+        logger.info("Cleanup cohort tick already running, skipping")
+        return 0
+
+    db = SessionLocal()
+    try:
+        now = datetime.now(dt_timezone.utc)
+        timezones = [
+            row[0] for row in db.query(
+                func.coalesce(User.calendar_timezone, DEFAULT_TIMEZONE)
+            ).distinct()
+        ]
+        local_dates = {tz: now.astimezone(get_zone(tz)).date() for tz in timezones}
+
+        # The week's run starts with the first timezone to reach Sunday
+        for local_date in set(local_dates.values()):
+            if local_date.weekday() == 6:
+                _get_or_create_run(db, local_date)
+
+        added = 0
+        for run in db.query(CleanupRun).filter(CleanupRun.status == "dispatching").all():
+            reached = [tz for tz, local_date in local_dates.items() if local_date >= run.week_start]
+            cohort = sorted(set(reached) - set(run.timezones_dispatched))
+            if cohort:
+                count = _add_users(db, run, cohort)
+                run.timezones_dispatched = sorted(set(run.timezones_dispatched) | set(cohort))
+                added += count
+                logger.info(f"Cleanup run {run.run_key}: added {count} users in {', '.join(cohort)}")
+            if len(reached) == len(local_dates):
+                run.status = "dispatched"
+                run.dispatched_at = datetime.utcnow()
+            db.commit()
+        return added
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error dispatching cleanup cohorts: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+        coordinator_locks.delete('cohorts')
+
 
 @celery_app.task(name="app.tasks.weekly_cleanup.cleanup_and_reschedule_tasks")
-def cleanup_and_reschedule_tasks():
+def cleanup_and_reschedule_tasks(run_key: Optional[str] = None):
     """
-    Weekly task that runs every Sunday at midnight to:
+    Run the weekly cleanup for every user now, regardless of timezone:
     1. Delete completed tasks/goals from Google Calendar
     2. Auto-reschedule uncompleted tasks for the next week
 
-    This task processes all users in the system.
+    Manual trigger; the scheduled cleanup goes through dispatch_cleanup_cohorts.
+    Items are rescheduled into the week after today (UTC), like on a Sunday
+    run: on a Sunday everyone is added to that week's run, on other days
+    to a manual run for today. Users already in the run are not processed
+    twice; a completed run is reopened for the users added to it.
+
+    Args:
+        run_key: Run to add everyone to (defaults to today's run, see above)
     """
+    if run_key:
+        kind, run_date = run_key.split(':', 1)
+        run_date = date.fromisoformat(run_date)
+    else:
+        run_date = datetime.utcnow().date()
+        kind = "weekly" if week_start_for(run_date) == run_date else "manual"
+
     db = SessionLocal()
     try:
-        logger.info("Starting weekly cleanup and reschedule task")
+        run = _get_or_create_run(db, run_date, kind)
+        added = _add_users(db, run, None)
+        if run.status == "dispatching":
+            run.status = "dispatched"
+            run.dispatched_at = datetime.utcnow()
+        elif run.status == "completed" and added:
+            # _advance skips completed runs; reopen so the new users get queued
+            run.status = "dispatched"
+            run.completed_at = None
+        db.commit()
+        logger.info(f"Cleanup run {run.run_key}: added {added} users (manual run)")
+        run_key = run.run_key
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
-        # Get all users
-        users = db.query(User).all()
-        logger.info(f"Processing {len(users)} users")
+    return _advance(run_key)
 
-        for user in users:
-            try:
-                process_user_weekly_cleanup(db, user)
-            except Exception as e:
-                logger.error(f"Error processing user {user.id}: {e}", exc_info=True)
-                # Continue with next user even if one fails
-                continue
 
-        logger.info("Weekly cleanup and reschedule task completed")
+@celery_app.task(name="app.tasks.weekly_cleanup.resume_weekly_cleanup")
+def resume_weekly_cleanup():
+    """Keep unfinished cleanup runs dispatching until all users are done."""
+    db = SessionLocal()
+    try:
+        run_keys = [
+            row[0] for row in db.query(CleanupRun.run_key).filter(
+                CleanupRun.status != "completed"
+            ).order_by(CleanupRun.started_at)
+        ]
+    finally:
+        db.close()
+
+    for run_key in run_keys:
+        _advance(run_key)
+    return len(run_keys)
+
+
+def _advance(run_key: str) -> Optional[str]:
+    """Enqueue more users of a run and complete it when all are done.
+
+    Returns:
+        The run's status, or None if skipped
+    """
+    if not coordinator_locks.add(run_key, True):
+        logger.info(f"Cleanup run {run_key} is already being advanced, skipping")
+        return None
+
+    db = SessionLocal()
+    try:
+        run = db.query(CleanupRun).filter(CleanupRun.run_key == run_key).first()
+        if run is None or run.status == "completed":
+            return run.status if run else None
+
+        requeued = _requeue_stale_users(db, run)
+        if requeued:
+            logger.warning(f"Cleanup run {run_key}: re-enqueued {requeued} stalled users")
+
+        queued = _queue_users(db, run)
+        if queued:
+            logger.info(f"Cleanup run {run_key}: queued {queued} users")
+
+        if run.status == "dispatched" and not _count_users(db, run, "pending", "queued"):
+            run.status = "completed"
+            run.completed_at = datetime.utcnow()
+            db.commit()
+            logger.info(
+                f"Weekly cleanup run {run_key} completed: "
+                f"{_count_users(db, run, 'succeeded')} users succeeded, "
+                f"{_count_users(db, run, 'failed')} failed"
+            )
+        return run.status
 
     except Exception as e:
-        logger.error(f"Error in weekly cleanup task: {e}", exc_info=True)
+        db.rollback()
+        logger.error(f"Error advancing cleanup run {run_key}: {e}", exc_info=True)
+        raise
     finally:
         db.close()
+        coordinator_locks.delete(run_key)
+
+
+def _get_or_create_run(db: Session, week_start: date, kind: str = "weekly") -> CleanupRun:
+    run_key = run_key_for(week_start, kind)
+    now = datetime.utcnow()
+    inserted = db.execute(pg_insert(CleanupRun.__table__).values(
+        id=uuid4(), run_key=run_key, week_start=week_start, status="dispatching",
+        timezones_dispatched=[], started_at=now, created_at=now, updated_at=now
+    ).on_conflict_do_nothing(index_elements=['run_key'])).rowcount
+    db.commit()
+    if inserted:
+        logger.info(f"Starting weekly cleanup run {run_key}")
+    return db.query(CleanupRun).filter(CleanupRun.run_key == run_key).one()
 
 
-def process_user_weekly_cleanup(db: Session, user: User):
+def _add_users(db: Session, run: CleanupRun, timezones: Optional[List[str]]) -> int:
+    """Record the users in `timezones` (None = everyone) as pending in a run.
+
+    One INSERT ... SELECT; users already in the run are skipped. Committed
+    by the caller.
     """
-    Process weekly cleanup for a single user.
+    result = db.execute(_ADD_COHORT_SQL, {
+        'run_id': str(run.id),
+        'timezones': timezones,
+        'default_timezone': DEFAULT_TIMEZONE,
+        'now': datetime.utcnow(),
+    })
+    return result.rowcount or 0
+
+
+def _count_users(db: Session, run: CleanupRun, *statuses: str) -> int:
+    return db.query(func.count(CleanupRunUser.id)).filter(
+        CleanupRunUser.run_id == run.id,
+        CleanupRunUser.status.in_(statuses)
+    ).scalar()
+
+
+def _queue_users(db: Session, run: CleanupRun) -> int:
+    """Enqueue the run's pending users in pages, up to the in-flight limit.
+
+    Users are marked queued in one commit per page before their tasks are
+    enqueued; a crash in between leaves them queued but never sent, and
+    the stale check enqueues them later.
+
+    Returns:
+        Number of users queued
+    """
+    budget = MAX_IN_FLIGHT - _count_users(db, run, "queued")
+    queued = 0
+    while budget > 0:
+        page = db.query(CleanupRunUser).filter(
+            CleanupRunUser.run_id == run.id,
+            CleanupRunUser.status == "pending"
+        ).order_by(CleanupRunUser.user_id).limit(min(PAGE_SIZE, budget)).all()
+        if not page:
+            break
+
+        now = datetime.utcnow()
+        for entry in page:
+            entry.status = "queued"
+            entry.updated_at = now
+        user_ids = [entry.user_id for entry in page]
+        db.commit()
+
+        for user_id in user_ids:
+            cleanup_user.apply_async(args=[str(run.id), str(user_id)], queue=CLEANUP_QUEUE)
+        budget -= len(user_ids)
+        queued += len(user_ids)
+
+    return queued
+
+
+def _requeue_stale_users(db: Session, run: CleanupRun) -> int:
+    """Enqueue queued users whose task hasn't touched them within STALE_SECONDS."""
+    now = datetime.utcnow()
+    stale = db.query(CleanupRunUser).filter(
+        CleanupRunUser.run_id == run.id,
+        CleanupRunUser.status == "queued",
+        CleanupRunUser.updated_at < now - timedelta(seconds=STALE_SECONDS)
+    ).limit(MAX_IN_FLIGHT).all()
+    for entry in stale:
+        entry.updated_at = now
+    user_ids = [entry.user_id for entry in stale]
+    db.commit()
+
+    for user_id in user_ids:
+        cleanup_user.apply_async(args=[str(run.id), str(user_id)], queue=CLEANUP_QUEUE)
+    return len(user_ids)
+
+
+@celery_app.task(
+    name="app.tasks.weekly_cleanup.cleanup_user",
+    bind=True,
+    max_retries=MAX_RETRIES,
+    soft_time_limit=USER_TIME_LIMIT_SECONDS,
+    time_limit=USER_TIME_LIMIT_SECONDS + 60,
+)
+def cleanup_user(self, run_id: str, user_id: str):
+    """
+    Run the weekly cleanup for one user of a run.
+
+    Failures are retried with exponential backoff up to CLEANUP_MAX_RETRIES
+    times; the final outcome is recorded on the user's cleanup_run_users row.
+
+    Args:
+        run_id: CleanupRun ID
+        user_id: User ID
+
+    Returns:
+        The user's status in the run
+    """
+    db = SessionLocal()
+    try:
+        entry = db.query(CleanupRunUser).filter(
+            CleanupRunUser.run_id == UUID(run_id),
+            CleanupRunUser.user_id == UUID(user_id)
+        ).first()
+        if entry is None or entry.status != "queued":
+            return entry.status if entry else None  # Duplicate delivery
+        week_start = db.query(CleanupRun.week_start).filter(CleanupRun.id == entry.run_id).scalar()
+
+        entry.attempts += 1
+        entry.updated_at = datetime.utcnow()
+        db.commit()
+
+        try:
+            user = db.query(User).filter(User.id == UUID(user_id)).first()
+            if user is not None:
+                # Keeps the user's cohort current for next week
+                get_user_timezone(db, user)
+                process_user_weekly_cleanup(db, user, week_start)
+        except Exception as e:
+            db.rollback()
+            entry.last_error = str(e)[:2000]
+            entry.updated_at = datetime.utcnow()
+            if self.request.retries < self.max_retries:
+                db.commit()
+                raise self.retry(exc=e, countdown=RETRY_BACKOFF_SECONDS * 2 ** self.request.retries)
+
+            entry.status = "failed"
+            entry.finished_at = datetime.utcnow()
+            db.commit()
+            logger.error(f"Weekly cleanup failed for user {user_id} after {entry.attempts} attempts: {e}")
+            return entry.status
+
+        entry.status = "succeeded"
+        entry.last_error = None
+        entry.finished_at = datetime.utcnow()
+        db.commit()
+        return entry.status
+    finally:
+        db.close()
+
+
+def process_user_weekly_cleanup(db: Session, user: User, run_date: Optional[date] = None):
+    """
+    Process weekly cleanup for a single user in one planning pass.
+
+    Deletes the calendar events of all past-week items with batched
+    calendar requests, schedules the carried-over todos across next week
+    with a single scheduling call and commits once.
 
     Args:
         db: Database session
         user: User to process
+        run_date: The user's local Sunday the cleanup is for, or a manual
+            run's day (defaults to today)
     """
     logger.info(f"Processing cleanup for user: {user.email}")
 
-    # Initialize services
-    calendar_service = CalendarService(db, user)
-
-    # Calculate date range for the past week
-    today = datetime.now().date()
-    week_start = today - timedelta(days=today.weekday() + 1)  # Last Sunday
-    week_end = week_start + timedelta(days=6)  # Last Saturday
+    today = run_date or datetime.now().date()
+    next_week_start = today + timedelta(days=(7 - today.weekday()))  # Next Monday
 
     # Step 1: Get all list items (weekly goals and todos) from the past week
     past_week_items = db.query(ListItem).filter(
         ListItem.user_id == user.id,
-        ListItem.item_type.in_([ItemType.WEEKLY_GOAL, ItemType.TODO])
+        ListItem.item_type.in_([ListItemType.WEEKLY_GOAL, ListItemType.TODO])
     ).all()
 
-    completed_items = []
-    uncompleted_items = []
-
-    for item in past_week_items:
-        if item.completed:
-            completed_items.append(item)
-        else:
-            uncompleted_items.append(item)
+    completed_items = [item for item in past_week_items if item.completed]
+    uncompleted_items = [item for item in past_week_items if not item.completed]
 
     logger.info(
         f"User {user.email}: {len(completed_items)} completed items, "
         f"{len(uncompleted_items)} uncompleted items"
     )
 
-    # Step 2: Delete completed items from Google Calendar
-    deleted_count = delete_completed_from_calendar(
-        calendar_service, completed_items, db
-    )
-    logger.info(f"Deleted {deleted_count} calendar events for completed items")
+    calendar_service = None
+    if user.google_tokens:
+        calendar_service = CalendarService(user.google_tokens)
 
-    # Step 3: Auto-reschedule uncompleted items for next week
+    # Step 2: Delete calendar events of completed items, and last week's
+    # events of uncompleted items (rescheduled below), in batches
+    deleted_count = delete_calendar_events(calendar_service, past_week_items)
+    logger.info(f"Deleted {deleted_count} calendar events")
+
+    # Step 3: Auto-reschedule uncompleted todos across next week
     if uncompleted_items:
-        reschedule_uncompleted_items(db, user, uncompleted_items, calendar_service)
-        logger.info(f"Rescheduled {len(uncompleted_items)} uncompleted items")
+        reschedule_uncompleted_items(db, user, uncompleted_items, calendar_service, next_week_start)
+
+    # Keep tokens Google refreshed during the run
+    if calendar_service:
+        updated_tokens = calendar_service.get_updated_tokens()
+        if updated_tokens.get('access_token') != (user.google_tokens or {}).get('access_token'):
+            user.google_tokens = updated_tokens
 
+    db.commit()
     logger.info(f"Cleanup complete for user: {user.email}")
 
 
-def delete_completed_from_calendar(
-    calendar_service: CalendarService,
-    completed_items: List[ListItem],
-    db: Session
+def delete_calendar_events(
+    calendar_service: Optional[CalendarService],
+    items: List[ListItem]
 ) -> int:
     """
-    Delete calendar events for completed tasks/goals.
+    Delete the calendar events of list items with batched requests.
+
+    Clears `calendar_event_id` on items whose event is gone; items whose
+    delete failed keep it and are retried next week. Not committed.
 
     Args:
-        calendar_service: Calendar service instance
-        completed_items: List of completed items
-        db: Database session
+        calendar_service: Calendar service instance (None if not connected)
+        items: List items whose events should be removed
 
     Returns:
         Number of events deleted
     """
-    deleted_count = 0
-
-    for item in completed_items:
-        if item.calendar_event_id:
-            try:
-                # Delete from Google Calendar
-                calendar_service.delete_event(item.calendar_event_id)
-
-                # Remove the calendar event ID from the database
-                item.calendar_event_id = None
-                db.commit()
-
-                deleted_count += 1
-                logger.debug(f"Deleted calendar event for item: {item.text}")
+    event_ids = [item.calendar_event_id for item in items if item.calendar_event_id]
+    if not calendar_service or not event_ids:
+        return 0
 
-            except Exception as e:
-                logger.error(
-                    f"Failed to delete calendar event {item.calendar_event_id} "
-                    f"for item {item.id}: {e}"
-                )
-                # Continue with next item
-                continue
+    try:
+        deleted = calendar_service.delete_events(event_ids)
+    except Exception as e:
+        logger.error(f"Failed to delete {len(event_ids)} calendar events: {e}")
+        return 0
 
-    return deleted_count
+    for item in items:
+        if item.calendar_event_id in deleted:
+            item.calendar_event_id = None
+    return len(deleted)
 
 
 def reschedule_uncompleted_items(
     db: Session,
     user: User,
     uncompleted_items: List[ListItem],
-    calendar_service: CalendarService
+    calendar_service: Optional[CalendarService],
+    next_week_start: date
 ):
     """
     Auto-reschedule uncompleted items for the next week using AI scheduling.
 
+    All carried-over todos are planned across Monday to Friday in a single
+    scheduling call. Not committed.
+
     Args:
         db: Database session
         user: User instance
         uncompleted_items: List of uncompleted items
-        calendar_service: Calendar service instance
+        calendar_service: Calendar service instance (None if not connected)
+        next_week_start: Monday of the week to schedule into
     """
-    # First, delete any existing calendar events for these items
-    # (they were scheduled for last week, we'll create new ones for next week)
-    for item in uncompleted_items:
-        if item.calendar_event_id:
-            try:
-                calendar_service.delete_event(item.calendar_event_id)
-                item.calendar_event_id = None
-            except Exception as e:
-                logger.warning(
-                    f"Could not delete old calendar event {item.calendar_event_id}: {e}"
-                )
-
-    db.commit()
-
-    # Calculate next week's date range
-    today = datetime.now().date()
-    next_week_start = today + timedelta(days=(7 - today.weekday()))  # Next Monday
-
-    # Use the AI scheduler to reschedule these items
-    # We'll schedule them starting from next Monday
-    todo_scheduler = TodoSchedulerService(db, user)
-
-    # Schedule for each day of next week (Monday-Friday)
-    for day_offset in range(5):  # Monday to Friday
-        target_date = next_week_start + timedelta(days=day_offset)
-
-        try:
-            # Get todos for this specific day (or use all uncompleted for flexibility)
-            result = todo_scheduler.schedule_todos_for_date(
-                target_date=target_date,
-                todo_ids=[item.id for item in uncompleted_items if item.item_type == ItemType.TODO]
-            )
-
-            logger.info(
-                f"Scheduled {len(result.get('scheduled_todos', []))} todos for {target_date}"
-            )
-
-        except Exception as e:
-            logger.error(f"Failed to reschedule for {target_date}: {e}")
-            continue
+    todos = [
+        TodoItem(id=str(item.id), text=item.text)
+        for item in uncompleted_items
+        if item.item_type == ListItemType.TODO
+    ]
+    if todos:
+        todo_scheduler = TodoSchedulerService(db, user)
+        result = asyncio.run(todo_scheduler.schedule_todos_for_week(
+            todos, next_week_start, days=5, calendar_service=calendar_service
+        ))
+        logger.info(
+            f"Scheduled {result.scheduledCount} todos for the week of {next_week_start}, "
+            f"{result.unscheduledCount} unscheduled"
+        )
 
     # For weekly goals, just carry them over without specific scheduling
     # (they represent general goals, not specific calendar events)
     for item in uncompleted_items:
-        if item.item_type == ItemType.WEEKLY_GOAL:
+        if item.item_type == ListItemType.WEEKLY_GOAL:
             logger.info(f"Carried over weekly goal: {item.text}")
             # Weekly goals remain in the database, just without calendar events
             # User can manually schedule or let the agent schedule them
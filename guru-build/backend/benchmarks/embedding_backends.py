@@ -0,0 +1,183 @@
+"""Compare embedding inference backends (fp32 vs int8) on CPU.
+
+Each backend runs in its own subprocess so resident memory is measured in
+isolation. Reports throughput (texts/s), model load time and RSS growth, then
+checks that int8 embeddings stay within a cosine-similarity tolerance of the
+fp32 embeddings. Exits non-zero if the parity check fails or the int8 run
+fell back to fp32, so it can gate a rollout of EMBEDDING_BACKEND=int8.
+
+Usage (from the backend directory):
+    python -m benchmarks.embedding_backends
+    python -m benchmarks.embedding_backends --texts descriptions.txt --output results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+WORDS = (
+    "history science comedy interview weekly news true crime investigation "
+    "technology startup founders health fitness running nutrition sleep music "
+    "culture film review politics economy markets investing storytelling "
+    "fiction mystery education language learning parenting family sports "
+    "football basketball analysis deep dive conversation guests host episode"
+).split()
+
+
+def synthetic_texts(count: int, seed: int = 42) -> List[str]:
+    """Podcast-description-like texts of varied length."""
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))).capitalize() + "."
+        for _ in range(count)
+    ]
+
+
+def read_rss_mb() -> float:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss is KB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def run_worker(backend: str, texts_path: str, output_path: str, batch_size: int) -> None:
+    """Load one backend, encode the texts and write embeddings + stats."""
+    from app.services.embedding_model import EmbeddingModel
+
+    with open(texts_path) as f:
+        texts = [line.strip() for line in f if line.strip()]
+
+    rss_before = read_rss_mb()
+    model = EmbeddingModel(backend=backend)
+    if model.load() is None:
+        raise SystemExit(f"Could not load embedding model for backend {backend}")
+    rss_loaded = read_rss_mb()
+
+    model.encode(texts[:batch_size], batch_size=batch_size)  # warm-up
+
+    started = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+
+    np.save(output_path + ".npy", np.asarray(embeddings, dtype=np.float32))
+    stats = {
+        "backend": model.backend,
+        "texts": len(texts),
+        "batch_size": batch_size,
+        "load_time_seconds": round(model.load_time_seconds or 0.0, 3),
+        "encode_seconds": round(elapsed, 3),
+        "texts_per_second": round(len(texts) / elapsed, 1) if elapsed else None,
+        "rss_model_mb": round(rss_loaded - rss_before, 1),
+        "rss_peak_mb": round(read_rss_mb(), 1),
+    }
+    with open(output_path + ".json", "w") as f:
+        json.dump(stats, f)
+
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """Row-wise cosine similarity between two embedding matrices."""
+    ref = reference / np.linalg.norm(reference, axis=1, keepdims=True).clip(min=1e-12)
+    cand = candidate / np.linalg.norm(candidate, axis=1, keepdims=True).clip(min=1e-12)
+    cosines = np.sum(ref * cand, axis=1)
+    return {
+        "mean": round(float(cosines.mean()), 5),
+        "min": round(float(cosines.min()), 5),
+        "p01": round(float(np.percentile(cosines, 1)), 5),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", help="File with one description per line (default: synthetic)")
+    parser.add_argument("--count", type=int, default=2000, help="Synthetic texts to generate")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--min-cosine", type=float, default=0.97, help="Per-text parity floor")
+    parser.add_argument("--mean-cosine", type=float, default=0.99, help="Mean parity floor")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.texts, args.worker_output, args.batch_size)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        texts_path = args.texts
+        if not texts_path:
+            texts_path = os.path.join(tmp, "texts.txt")
+            with open(texts_path, "w") as f:
+                f.write("\n".join(synthetic_texts(args.count)))
+
+        results: Dict[str, Any] = {"backends": {}}
+        embeddings: Dict[str, np.ndarray] = {}
+        for backend in ("fp32", "int8"):
+            output_path = os.path.join(tmp, backend)
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.embedding_backends",
+                    "--worker", backend,
+                    "--texts", texts_path,
+                    "--worker-output", output_path,
+                    "--batch-size", str(args.batch_size),
+                ],
+                check=True,
+            )
+            with open(output_path + ".json") as f:
+                results["backends"][backend] = json.load(f)
+            embeddings[backend] = np.load(output_path + ".npy")
+
+    fp32, int8 = results["backends"]["fp32"], results["backends"]["int8"]
+    parity = cosine_parity(embeddings["fp32"], embeddings["int8"])
+    results["parity"] = parity
+    results["speedup"] = (
+        round(int8["texts_per_second"] / fp32["texts_per_second"], 2)
+        if fp32["texts_per_second"] and int8["texts_per_second"] else None
+    )
+    results["rss_reduction_mb"] = round(fp32["rss_model_mb"] - int8["rss_model_mb"], 1)
+    # EmbeddingModel falls back to fp32 when quantization fails, which
+    # would compare fp32 with itself
+    quantized = int8["backend"] == "int8"
+    results["int8_loaded"] = quantized
+    passed = quantized and parity["min"] >= args.min_cosine and parity["mean"] >= args.mean_cosine
+    results["parity_passed"] = passed
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if not quantized:
+        print(
+            f"Parity check FAILED: the int8 run fell back to the {int8['backend']} backend",
+            file=sys.stderr,
+        )
+        return 1
+    if not passed:
+        print(
+            f"Parity check FAILED: min={parity['min']} (floor {args.min_cosine}), "
+            f"mean={parity['mean']} (floor {args.mean_cosine})",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Local fake Podcast Index API for development, load tests and benchmarks.
+
+Serves deterministic synthetic responses for the endpoints the app uses,
+checks the auth headers, and can inject latency and 429/5xx errors so the
+client's retries, rate limiting and coalescing can be exercised offline.
+
+Run standalone and point the app at it:
+
+    python -m benchmarks.fake_podcast_index --port 8765 --latency-ms 50
+    PODCAST_INDEX_BASE_URL=http://127.0.0.1:8765/api/1.0 \\
+    PODCAST_INDEX_API_KEY=fake PODCAST_INDEX_API_SECRET=fake uvicorn app.main:app
+
+Or in-process:
+
+    server, base_url = start_fake_server()
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = '/api/1.0'
+
+CATEGORIES = [
+    'Arts', 'Business', 'Comedy', 'Education', 'Fiction', 'Government',
+    'History', 'Health', 'Kids', 'Leisure', 'Music', 'News', 'Religion',
+    'Science', 'Society', 'Sports', 'Technology', 'True Crime', 'TV',
+]
+
+
+def _feed(feed_id: int) -> Dict[str, Any]:
+    rng = random.Random(feed_id)
+    category_id = feed_id % len(CATEGORIES) + 1
+    return {
+        'id': feed_id,
+        'title': f'Podcast {feed_id}',
+        'author': f'Author {feed_id % 97}',
+        'description': f'Episodes about {CATEGORIES[category_id - 1].lower()} number {feed_id}.',
+        'artwork': f'http://images.example.com/{feed_id}.jpg',
+        'image': f'http://images.example.com/{feed_id}.jpg',
+        'url': f'https://feeds.example.com/{feed_id}.xml',
+        'link': f'https://example.com/{feed_id}',
+        'categories': {str(category_id): CATEGORIES[category_id - 1]},
+        'episodeCount': rng.randint(5, 500),
+        'trendScore': rng.randint(1, 9),
+        'language': 'en',
+    }
+
+
+def _episodes(feed_id: int, count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(feed_id)
+    now = int(time.time())
+    cadence = rng.choice([1, 3, 7, 14]) * 86400
+    return [
+        {
+            'id': feed_id * 10000 + i,
+            'title': f'Episode {i} of podcast {feed_id}',
+            'description': f'Episode {i} description.',
+            'datePublished': now - i * cadence,
+            'duration': rng.randint(10, 120) * 60,
+            'enclosureUrl': f'https://media.example.com/{feed_id}/{i}.mp3',
+            'enclosureType': 'audio/mpeg',
+            'image': f'http://images.example.com/{feed_id}.jpg',
+            'feedImage': f'http://images.example.com/{feed_id}.jpg',
+            'feedId': feed_id,
+            'feedTitle': f'Podcast {feed_id}',
+            'link': f'https://example.com/{feed_id}/{i}',
+        }
+        for i in range(count)
+    ]
+
+
+def _term_feed_ids(term: str, count: int) -> List[int]:
+    seed = int(hashlib.sha1(term.lower().encode()).hexdigest()[:8], 16)
+    return [seed % 900000 + 1000 + i * 7 for i in range(count)]
+
+
+class FakePodcastIndexHandler(BaseHTTPRequestHandler):
+    """Request handler; behaviour is configured on the server instance."""
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, code: int, body: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        with server.stats_lock:
+            server.request_count += 1
+
+        if not (self.headers.get('X-Auth-Key') and self.headers.get('Authorization')):
+            self._send(401, {'status': 'false', 'description': 'Authorization required'})
+            return
+
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            self._send(random.choice([429, 503]), {'status': 'false'}, {'Retry-After': '0'})
+            return
+
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        endpoint = url.path[len(API_PREFIX):].strip('/') if url.path.startswith(API_PREFIX) else ''
+        max_results = int(params.get('max', 10))
+
+        if endpoint == 'search/byterm':
+            feeds = [_feed(i) for i in _term_feed_ids(params.get('q', ''), max_results)]
+            self._send(200, {'status': 'true', 'feeds': feeds, 'count': len(feeds)})
+        elif endpoint == 'podcasts/trending':
+            feeds = [_feed(1000 + i) for i in range(max_results)]
+            self._send(200, {'status': 'true', 'feeds': feeds, 'count': len(feeds)})
+        elif endpoint == 'podcasts/byfeedid':
+            feed_id = int(params.get('id', 0))
+            self._send(200, {'status': 'true', 'feed': _feed(feed_id) if feed_id else []})
+        elif endpoint == 'episodes/byfeedid':
+            items = _episodes(int(params.get('id', 0)), max_results)
+            self._send(200, {'status': 'true', 'items': items, 'count': len(items)})
+        elif endpoint == 'recent/episodes':
+            items = [_episodes(1000 + i, 1)[0] for i in range(max_results)]
+            self._send(200, {'status': 'true', 'items': items, 'count': len(items)})
+        elif endpoint == 'categories/list':
+            feeds = [{'id': i + 1, 'name': name} for i, name in enumerate(CATEGORIES)]
+            self._send(200, {'status': 'true', 'feeds': feeds, 'count': len(feeds)})
+        else:
+            self._send(404, {'status': 'false', 'description': f'Unknown endpoint {endpoint}'})
+
+
+def start_fake_server(
+    host: str = '127.0.0.1',
+    port: int = 0,
+    latency_ms: float = 0,
+    error_rate: float = 0,
+    verbose: bool = False,
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the fake API on a background thread.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        latency_ms: Added latency per request
+        error_rate: Fraction of requests answered with 429/503
+        verbose: Log every request
+
+    Returns:
+        Tuple of (server, base URL to use as PODCAST_INDEX_BASE_URL)
+    """
+    server = ThreadingHTTPServer((host, port), FakePodcastIndexHandler)
+    server.daemon_threads = True
+    server.latency = latency_ms / 1000
+    server.error_rate = error_rate
+    server.verbose = verbose
+    server.request_count = 0
+    server.stats_lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, name='fake-podcast-index', daemon=True)
+    thread.start()
+    return server, f'http://{host}:{server.server_address[1]}{API_PREFIX}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    args = parser.parse_args()
+
+    server, base_url = start_fake_server(
+        args.host, args.port, args.latency_ms, args.error_rate, verbose=True
+    )
+    print(f'Fake Podcast Index listening at {base_url}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""Benchmark the item-item collaborative filtering engine on synthetic data.
+
+Generates a clustered, power-law interaction log (default 100k users x 50k
+podcasts), then measures:
+- building the sparse user x podcast matrix
+- the blocked top-N neighbour computation (time and peak RSS)
+- per-request CF scoring: attaching neighbours to a candidate catalog and
+  computing affinities for one user (p50/p95)
+
+Usage (from the backend directory):
+    python -m benchmarks.item_item_cf
+    python -m benchmarks.item_item_cf --users 20000 --podcasts 10000 --output cf.json
+"""
+
+import argparse
+import json
+import resource
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.services.collaborative_filtering import InteractionMatrix, compute_item_neighbors
+from app.services.recommendation_scoring import CatalogMatrix, collaborative_affinity
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def synthetic_interactions(
+    n_users: int,
+    n_podcasts: int,
+    mean_per_user: float,
+    n_clusters: int,
+    seed: int = 7
+):
+    """(user, podcast, weight) arrays with taste clusters and Zipf popularity.
+
+    Each user mostly listens within one cluster of podcasts (so neighbours
+    are meaningful) with some globally popular picks mixed in.
+    """
+    rng = np.random.default_rng(seed)
+    counts = np.maximum(1, rng.poisson(mean_per_user, n_users))
+    users = np.repeat(np.arange(n_users), counts)
+    total = len(users)
+
+    clusters = rng.integers(0, n_clusters, n_users)[users]
+    cluster_size = n_podcasts // n_clusters
+    popularity = rng.zipf(1.3, total) - 1
+
+    in_cluster = rng.random(total) < 0.8
+    podcasts = np.where(
+        in_cluster,
+        clusters * cluster_size + np.minimum(popularity, cluster_size - 1),
+        np.minimum(popularity, n_podcasts - 1),
+    )
+    weights = 1.0 + rng.random(total)
+    return users, podcasts.astype(str), weights
+
+
+def timed(fn, repeats: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+    }
+
+
+def catalog_of(podcast_ids: List[str]) -> CatalogMatrix:
+    """Feature-less catalog rows; only the CF signal is exercised."""
+    return CatalogMatrix([
+        SimpleNamespace(
+            external_id=pid,
+            description_embedding=None,
+            category_vector=None,
+            avg_episode_duration_seconds=None,
+            popularity_score=0.0,
+        )
+        for pid in podcast_ids
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--podcasts", type=int, default=50_000)
+    parser.add_argument("--per-user", type=float, default=20, help="Mean interactions per user")
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--top-n", type=int, default=50)
+    parser.add_argument("--block-size", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {"config": vars(args)}
+
+    users, podcasts, weights = synthetic_interactions(
+        args.users, args.podcasts, args.per_user, args.clusters
+    )
+
+    started = time.perf_counter()
+    interactions = InteractionMatrix.from_triples(users.tolist(), podcasts.tolist(), weights.tolist())
+    matrix = interactions.matrix
+    results["matrix"] = {
+        "users": matrix.shape[0],
+        "podcasts": matrix.shape[1],
+        "nnz": int(matrix.nnz),
+        "build_seconds": round(time.perf_counter() - started, 2),
+    }
+    print(f"Matrix: {results['matrix']}")
+
+    started = time.perf_counter()
+    neighbor_idx, neighbor_sim, support = compute_item_neighbors(
+        matrix, top_n=args.top_n, block_size=args.block_size
+    )
+    with_neighbors = sum(1 for n in neighbor_idx if len(n))
+    results["neighbors"] = {
+        "seconds": round(time.perf_counter() - started, 2),
+        "podcasts_with_neighbors": with_neighbors,
+        "mean_neighbors": round(float(np.mean([len(n) for n in neighbor_idx])), 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    print(f"Neighbours: {results['neighbors']}")
+
+    ids = interactions.podcast_ids
+    neighbor_rows = [
+        (ids[i], [ids[j] for j in neighbor_idx[i]], neighbor_sim[i].tolist())
+        for i in range(len(ids))
+        if len(neighbor_idx[i])
+    ]
+    by_support = [ids[i] for i in np.argsort(-support)]
+    rng = np.random.default_rng(1)
+    history = set(rng.choice(ids, size=min(20, len(ids)), replace=False).tolist())
+
+    results["scoring"] = {}
+    for size in (100, len(by_support)):
+        catalog = catalog_of(by_support[:size])
+        in_catalog = set(catalog.external_ids)
+        rows = [row for row in neighbor_rows if row[0] in in_catalog]  # What load_neighbors fetches
+        attach = timed(lambda: catalog.attach_neighbors(rows), max(3, args.repeats // 50))
+        affinity = timed(lambda: collaborative_affinity(catalog, [history]), args.repeats)
+        results["scoring"][str(size)] = {"attach": attach, "affinity_one_user": affinity}
+        print(f"Catalog {size}: attach {attach}, affinity {affinity}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
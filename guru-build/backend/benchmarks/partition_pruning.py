@@ -0,0 +1,204 @@
+"""Verify that per-user queries on partitioned event tables prune partitions.
+
+Seeds a throwaway Postgres schema with monthly partitions of
+listening_sessions and podcast_interactions and a history spread over
+--months months, runs the service methods that read those tables while
+capturing their SQL, then EXPLAIN ANALYZEs each captured statement and
+counts the partitions actually scanned (plan-time pruning and ordered
+Append nodes that stop early both count as not scanned).
+
+Queries expected to stay on the newest partitions fail the run (exit code
+1) if they scan more than --max-partitions. Queries that need the user's
+whole history are reported for information only.
+
+Usage (from the backend directory):
+    python -m benchmarks.partition_pruning --months 12
+"""
+
+import argparse
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+import numpy as np
+
+PARTITIONED_TABLES = ("listening_sessions", "podcast_interactions")
+
+
+def seed_history(db, rng: np.random.Generator, users: int, months: int, rows_per_month: int) -> List[uuid.UUID]:
+    """Insert users with sessions and interactions in every month; returns user IDs."""
+    from sqlalchemy import insert
+    from app.models.podcast_recommendation import InteractionType, ListeningSession, PodcastInteraction
+    from app.models.user import User
+
+    now = datetime.utcnow()
+    stamp = {"created_at": now, "updated_at": now}
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    db.execute(insert(User.__table__), [
+        {"id": uid, "email": f"pruning-{uid}@example.com", **stamp} for uid in user_ids
+    ])
+
+    sessions, interactions = [], []
+    for uid in user_ids:
+        for _ in range(months * rows_per_month):
+            at = now - timedelta(hours=int(rng.integers(1, months * 30 * 24)))
+            pid = str(int(rng.integers(0, 500)))
+            completion = float(rng.random())
+            sessions.append({
+                "id": uuid.uuid4(),
+                "user_id": uid,
+                "episode_external_id": f"{pid}-{int(rng.integers(0, 50))}",
+                "podcast_external_id": pid,
+                "started_at": at,
+                "ended_at": at + timedelta(minutes=30),
+                "episode_duration_seconds": 3600,
+                "listened_duration_seconds": int(3600 * completion),
+                "completion_rate": completion,
+                **stamp,
+            })
+            interactions.append({
+                "id": uuid.uuid4(),
+                "user_id": uid,
+                "podcast_external_id": pid,
+                "interaction_type": InteractionType.like if rng.random() < 0.8 else InteractionType.dislike,
+                "interaction_timestamp": at,
+                **stamp,
+            })
+    db.execute(insert(ListeningSession.__table__), sessions)
+    db.execute(insert(PodcastInteraction.__table__), interactions)
+    db.commit()
+    return user_ids
+
+
+def capture_statements(engine, fn: Callable[[], Any]) -> List[Tuple[str, Any]]:
+    """Run fn and return the (statement, parameters) it executed."""
+    from sqlalchemy import event
+
+    captured: List[Tuple[str, Any]] = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return captured
+
+
+def scanned_partitions(plan: Dict[str, Any]) -> Dict[str, Tuple[Set[str], Set[str]]]:
+    """Per partitioned table: (partitions in the plan, partitions executed)."""
+    found = {table: (set(), set()) for table in PARTITIONED_TABLES}
+
+    def walk(node: Dict[str, Any]) -> None:
+        relation = node.get("Relation Name", "")
+        for table in PARTITIONED_TABLES:
+            if relation.startswith(f"{table}_"):
+                planned, executed = found[table]
+                planned.add(relation)
+                if node.get("Actual Loops", 0) > 0:
+                    executed.add(relation)
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL", os.getenv("DATABASE_URL", "postgresql://localhost:5432/guru_db")),
+    )
+    parser.add_argument("--months", type=int, default=12, help="Months of seeded history")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--rows-per-month", type=int, default=20, help="Sessions and interactions per user-month")
+    parser.add_argument("--max-partitions", type=int, default=2, help="Allowed scans for recent-data queries")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--keep-schema", action="store_true", help="Don't drop the schema")
+    args = parser.parse_args()
+
+    if args.database_url.startswith("sqlite"):
+        sys.exit("SQLite is not supported: partitioning needs Postgres.")
+
+    os.environ.setdefault("PODCAST_INDEX_API_KEY", "bench")
+    os.environ.setdefault("PODCAST_INDEX_API_SECRET", "bench")
+
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+    import app.models  # noqa: F401  (registers all mappers)
+    from app.models.base import Base
+    from app.models.user import User
+    from app.services.event_tracking_service import EventTrackingService
+    from app.services.partitions import ensure_partitions
+    from app.services.recommendation_service import RecommendationService
+
+    url = args.database_url.replace("postgres://", "postgresql://", 1)
+    schema = f"pruning_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(url)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    failed = False
+    try:
+        ensure_partitions(db, months_back=args.months)
+        user_ids = seed_history(db, np.random.default_rng(args.seed), args.users, args.months, args.rows_per_month)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE listening_sessions; ANALYZE podcast_interactions"))
+        user = db.get(User, user_ids[0])
+        events = EventTrackingService(db, user)
+        recommendations = RecommendationService(db, user)
+
+        # (name, call, tables expected to stay on the newest partitions);
+        # other tables may need the user's whole history
+        recent = args.max_partitions
+        checks: List[Tuple[str, Callable[[], Any], Dict[str, int]]] = [
+            ("get_listening_sessions", lambda: events.get_listening_sessions(limit=20),
+             {"listening_sessions": recent}),
+            ("get_user_interactions", lambda: events.get_user_interactions(limit=20),
+             {"podcast_interactions": recent}),
+            ("_get_interacted_podcast_ids", recommendations._get_interacted_podcast_ids,
+             {"listening_sessions": recent}),
+            ("_get_disliked_podcast_ids", recommendations._get_disliked_podcast_ids, {}),
+            ("_get_finished_episode_ids", recommendations._get_finished_episode_ids, {}),
+        ]
+
+        print(f"{'query':32s} {'table':22s} {'planned':>8s} {'scanned':>8s}")
+        for name, call, limits in checks:
+            for statement, parameters in capture_statements(engine, call):
+                if not any(table in statement for table in PARTITIONED_TABLES):
+                    continue
+                with engine.connect() as conn:
+                    plan = conn.exec_driver_sql(
+                        "EXPLAIN (ANALYZE, FORMAT JSON) " + statement, parameters
+                    ).scalar()[0]
+                for table, (planned, executed) in scanned_partitions(plan).items():
+                    if not planned:
+                        continue
+                    over = table in limits and len(executed) > limits[table]
+                    failed = failed or over
+                    print(
+                        f"{name:32s} {table:22s} {len(planned):8d} {len(executed):8d}"
+                        f"{'  TOO MANY PARTITIONS' if over else ''}"
+                    )
+    finally:
+        db.close()
+        engine.dispose()
+        if not args.keep_schema:
+            with admin.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
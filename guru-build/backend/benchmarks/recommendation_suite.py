@@ -0,0 +1,406 @@
+"""Recommendation performance benchmark suite.
+
+Seeds a throwaway Postgres schema with synthetic PodcastFeatures (random unit
+embeddings, category vectors) and synthetic users with listening sessions,
+interactions and saves, then measures latency (p50/p95/max), SQL queries per
+call and peak Python allocations for:
+
+- cold_start        new user, empty catalog (topic search via a local fake API)
+- cache_miss        get_recommendations after invalidating the user's caches
+- cache_hit         get_recommendations with warm caches
+- profile_refresh   update_user_profile
+- feature_extraction  FeatureExtractionService.batch_extract_features
+
+Each scenario after cold_start is repeated for every --catalog-sizes step, so
+growth is visible. Podcast Index calls go to benchmarks.fake_podcast_index.
+Results are written as JSON; --compare flags p95 regressions against a
+previous run (exit code 1).
+
+The models use Postgres ARRAY/JSONB/UUID columns, so a SQLite stand-in is
+not supported; point --database-url at a local Postgres. Everything is
+created in a temporary schema that is dropped afterwards.
+
+Usage (from the backend directory):
+    python -m benchmarks.recommendation_suite --output bench.json
+    python -m benchmarks.recommendation_suite --catalog-sizes 1000 20000 --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.fake_podcast_index import start_fake_server
+
+CATEGORY_DIMS = 19
+EMBEDDING_DIMS = 384
+CATEGORY_NAMES = [
+    "Arts", "Business", "Comedy", "Education", "Fiction", "Government",
+    "Health & Fitness", "History", "Kids & Family", "Leisure", "Music", "News",
+    "Religion & Spirituality", "Science", "Society & Culture", "Sports",
+    "Technology", "True Crime", "TV & Film",
+]
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def measure(
+    fn: Callable[[int], Any],
+    repeats: int,
+    counter: QueryCounter,
+    setup: Optional[Callable[[int], Any]] = None
+) -> Dict[str, float]:
+    """Run fn(i) `repeats` times; setup(i) runs first and is not measured."""
+    latencies: List[float] = []
+    queries: List[int] = []
+    peaks: List[int] = []
+
+    tracemalloc.start()
+    try:
+        for i in range(repeats):
+            if setup:
+                setup(i)
+            tracemalloc.reset_peak()
+            counter.count = 0
+            started = time.perf_counter()
+            fn(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(counter.count)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "repeats": repeats,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "max_ms": round(max(latencies), 2),
+        "queries_per_call": round(statistics.mean(queries), 1),
+        "peak_alloc_kb": round(max(peaks) / 1024, 1),
+    }
+
+
+def unit_vectors(rng: np.random.Generator, count: int, dims: int) -> np.ndarray:
+    vectors = rng.normal(size=(count, dims)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def seed_catalog(db, rng: np.random.Generator, start: int, end: int) -> None:
+    """Insert synthetic podcast_features rows with external IDs start..end-1."""
+    from sqlalchemy import insert
+    from app.models.podcast_recommendation import PodcastFeatures
+
+    now = datetime.utcnow()
+    for offset in range(start, end, 2000):
+        stop = min(offset + 2000, end)
+        embeddings = unit_vectors(rng, stop - offset, EMBEDDING_DIMS)
+        rows = []
+        for i, external_id in enumerate(range(offset, stop)):
+            picked = rng.choice(CATEGORY_DIMS, size=int(rng.integers(1, 4)), replace=False)
+            vector = [0.0] * CATEGORY_DIMS
+            for c in picked:
+                vector[int(c)] = 1.0
+            rows.append({
+                "id": uuid.uuid4(),
+                "external_id": str(external_id),
+                "title": f"Synthetic podcast {external_id}",
+                "author": f"Author {external_id % 500}",
+                "description": f"Synthetic description {external_id}",
+                "artwork": f"https://images.example.com/{external_id}.jpg",
+                "language": "en",
+                "categories": {str(int(c) + 1): CATEGORY_NAMES[int(c)] for c in picked},
+                "episode_count": int(rng.integers(5, 500)),
+                "category_vector": vector,
+                "description_embedding": embeddings[i].tolist(),
+                "avg_episode_duration_seconds": int(rng.integers(10, 120)) * 60,
+                "update_frequency_days": float(rng.choice([1, 3, 7, 14])),
+                "popularity_score": float(rng.random()),
+                "last_fetched_at": now,
+                "features_computed_at": now,
+                "created_at": now,
+                "updated_at": now,
+            })
+        db.execute(insert(PodcastFeatures.__table__), rows)
+    db.commit()
+
+
+def seed_users(
+    db,
+    rng: np.random.Generator,
+    count: int,
+    catalog_size: int,
+    sessions_per_user: int,
+    interactions_per_user: int,
+    with_history: bool = True,
+    topics: Optional[List[str]] = None
+) -> List[uuid.UUID]:
+    """Insert synthetic users (and their history); returns user IDs."""
+    from sqlalchemy import insert
+    from app.models.podcast_recommendation import InteractionType, ListeningSession, PodcastInteraction
+    from app.models.saved_media import SavedPodcast
+    from app.models.user import User
+    from app.models.user_preference import UserPreference
+
+    now = datetime.utcnow()
+    stamp = {"created_at": now, "updated_at": now}
+    user_ids = [uuid.uuid4() for _ in range(count)]
+    db.execute(insert(User.__table__), [
+        {"id": uid, "email": f"bench-{uid}@example.com", **stamp} for uid in user_ids
+    ])
+    db.execute(insert(UserPreference.__table__), [
+        {
+            "id": uuid.uuid4(),
+            "user_id": uid,
+            "podcast_topics": topics or ["technology", "history"],
+            "podcast_languages": ["en"],
+            **stamp,
+        }
+        for uid in user_ids
+    ])
+
+    if with_history and catalog_size:
+        sessions, interactions, saved = [], [], []
+        for uid in user_ids:
+            podcasts = rng.integers(0, catalog_size, sessions_per_user)
+            for pid in podcasts:
+                started = now - timedelta(hours=int(rng.integers(1, 24 * 60)))
+                duration = int(rng.integers(10, 120)) * 60
+                completion = float(rng.random())
+                sessions.append({
+                    "id": uuid.uuid4(),
+                    "user_id": uid,
+                    "episode_external_id": f"{pid}-{int(rng.integers(0, 50))}",
+                    "podcast_external_id": str(pid),
+                    "started_at": started,
+                    "ended_at": started + timedelta(seconds=duration * completion),
+                    "episode_duration_seconds": duration,
+                    "listened_duration_seconds": int(duration * completion),
+                    "completion_rate": completion,
+                    "pause_count": 0,
+                    "seek_forward_count": 0,
+                    "seek_backward_count": int(rng.integers(0, 3)),
+                    "playback_speed": 1.0,
+                    **stamp,
+                })
+            for pid in rng.integers(0, catalog_size, interactions_per_user):
+                interactions.append({
+                    "id": uuid.uuid4(),
+                    "user_id": uid,
+                    "podcast_external_id": str(pid),
+                    "interaction_type": InteractionType.like if rng.random() < 0.8 else InteractionType.dislike,
+                    "interaction_timestamp": now - timedelta(hours=int(rng.integers(1, 24 * 60))),
+                    **stamp,
+                })
+            for pid in rng.integers(0, catalog_size, 3):
+                saved.append({
+                    "id": uuid.uuid4(),
+                    "user_id": uid,
+                    "external_id": str(pid),
+                    "title": f"Synthetic podcast {pid}",
+                    **stamp,
+                })
+        db.execute(insert(ListeningSession.__table__), sessions)
+        db.execute(insert(PodcastInteraction.__table__), interactions)
+        db.execute(insert(SavedPodcast.__table__), saved)
+
+    db.commit()
+    return user_ids
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> bool:
+    """Print p95 deltas against a baseline run; False if any regressed."""
+    with open(baseline_path) as f:
+        baseline = {
+            (r["scenario"], r["catalog_size"]): r for r in json.load(f)["results"]
+        }
+
+    ok = True
+    print(f"\nComparison with {baseline_path} (tolerance {tolerance:.0%}):")
+    for result in results:
+        before = baseline.get((result["scenario"], result["catalog_size"]))
+        if not before:
+            continue
+        delta = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        regressed = delta > tolerance
+        ok = ok and not regressed
+        print(
+            f"  {result['scenario']:20s} catalog={result['catalog_size']:<7d} "
+            f"p95 {before['p95_ms']:.1f} -> {result['p95_ms']:.1f} ms ({delta:+.0%})"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL", os.getenv("DATABASE_URL", "postgresql://localhost:5432/guru_db")),
+    )
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--sessions-per-user", type=int, default=40)
+    parser.add_argument("--interactions-per-user", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=30)
+    parser.add_argument("--extract-batch", type=int, default=25, help="Podcasts per feature extraction call")
+    parser.add_argument("--skip-feature-extraction", action="store_true")
+    parser.add_argument("--api-latency-ms", type=float, default=30, help="Fake Podcast Index latency")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON from a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 regression")
+    parser.add_argument("--keep-schema", action="store_true", help="Don't drop the benchmark schema")
+    args = parser.parse_args()
+
+    if args.database_url.startswith("sqlite"):
+        sys.exit("SQLite is not supported: the models use Postgres ARRAY/JSONB/UUID columns.")
+
+    # Point the shared Podcast Index client at the fake before app modules load
+    server, base_url = start_fake_server(latency_ms=args.api_latency_ms)
+    os.environ["PODCAST_INDEX_BASE_URL"] = base_url
+    os.environ.setdefault("PODCAST_INDEX_API_KEY", "bench")
+    os.environ.setdefault("PODCAST_INDEX_API_SECRET", "bench")
+
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+    import app.models  # noqa: F401  (registers all mappers)
+    from app.models.base import Base
+    from app.models.user import User
+    from app.services.feature_extraction_service import FeatureExtractionService
+    from app.services.partitions import ensure_partitions
+    from app.services.recommendation_service import RecommendationService
+
+    url = args.database_url.replace("postgres://", "postgresql://", 1)
+    schema = f"bench_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(url)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    Base.metadata.create_all(engine)
+
+    counter = QueryCounter(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    ensure_partitions(db, months_back=3)  # Seeded history spans 60 days
+    rng = np.random.default_rng(args.seed)
+    run_id = uuid.uuid4().hex[:6]
+    results: List[Dict[str, Any]] = []
+
+    def record(scenario: str, catalog_size: int, stats: Dict[str, float]) -> None:
+        results.append({"scenario": scenario, "catalog_size": catalog_size, **stats})
+        print(f"{scenario:20s} catalog={catalog_size:<7d} {stats}")
+
+    try:
+        # Cold start: no catalog rows yet, so recommendations come from topic search
+        cold_ids = seed_users(db, rng, args.repeats, 0, 0, 0, with_history=False)
+        for i, uid in enumerate(cold_ids):
+            db.execute(
+                text("UPDATE user_preferences SET podcast_topics = :topics WHERE user_id = :uid"),
+                {"topics": [f"bench {run_id} topic {i}"], "uid": uid},
+            )
+        db.commit()
+        cold_users = [db.get(User, uid) for uid in cold_ids]
+        record("cold_start", 0, measure(
+            lambda i: RecommendationService(db, cold_users[i]).get_recommendations(limit=20),
+            args.repeats, counter,
+        ))
+
+        seeded = 0
+        next_extract_id = 10_000_000
+        for size in sorted(args.catalog_sizes):
+            seed_catalog(db, rng, seeded, size)
+            seeded = size
+
+            user_ids = seed_users(
+                db, rng, args.users, size, args.sessions_per_user, args.interactions_per_user
+            )
+            users = [db.get(User, uid) for uid in user_ids]
+            service_for = lambda i: RecommendationService(db, users[i % len(users)])
+
+            record("cache_miss", size, measure(
+                lambda i: service_for(i).get_recommendations(limit=20),
+                args.repeats, counter,
+                setup=lambda i: service_for(i).invalidate_cache(),
+            ))
+            record("cache_hit", size, measure(
+                lambda i: service_for(i).get_recommendations(limit=20),
+                args.repeats, counter,
+                setup=lambda i: service_for(i).get_recommendations(limit=20),
+            ))
+            record("profile_refresh", size, measure(
+                lambda i: service_for(i).update_user_profile(),
+                args.repeats, counter,
+            ))
+
+            if not args.skip_feature_extraction:
+                def extract(i):
+                    start = next_extract_id + i * args.extract_batch
+                    FeatureExtractionService(db).batch_extract_features(
+                        [str(pid) for pid in range(start, start + args.extract_batch)],
+                        skip_existing=False,
+                    )
+
+                record("feature_extraction", size, measure(
+                    extract, max(3, args.repeats // 10), counter
+                ))
+                next_extract_id += 1_000_000
+
+    finally:
+        db.close()
+        engine.dispose()
+        if not args.keep_schema:
+            with admin.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+        server.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "fake_api_requests": server.request_count,
+            "config": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
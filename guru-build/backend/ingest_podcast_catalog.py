@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Ingest the Podcast Index catalog dump into podcast_features.
+
+Download the dump from https://public.podcastindex.org/podcastindex_feeds.db.tgz,
+extract it, then run:
+
+    python ingest_podcast_catalog.py podcastindex_feeds.db --language en
+
+Progress is checkpointed next to the dump after every chunk, so the same
+command resumes an interrupted run. Use --reset to start over.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Add the current directory to sys.path so we can import app
+sys.path.append(str(Path(__file__).resolve().parent))
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest the Podcast Index catalog dump")
+    parser.add_argument("dump_path", help="Path to podcastindex_feeds.db")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <dump>.checkpoint.json)")
+    parser.add_argument("--chunk-size", type=int, help="Dump rows per transaction")
+    parser.add_argument("--language", help="Only ingest this language (e.g. 'en')")
+    parser.add_argument("--limit", type=int, help="Stop after this many podcasts")
+    parser.add_argument("--skip-embeddings", action="store_true", help="Don't compute embeddings")
+    parser.add_argument("--reset", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    # The app engine echoes SQL; keep COPY batches out of the log
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    from app.database import SessionLocal, engine
+    from app.services.catalog_ingestion_service import CatalogIngestionService
+
+    engine.echo = False
+    db = SessionLocal()
+    try:
+        result = CatalogIngestionService(db).ingest(
+            args.dump_path,
+            checkpoint_path=args.checkpoint,
+            chunk_size=args.chunk_size,
+            language=args.language,
+            limit=args.limit,
+            compute_embeddings=not args.skip_embeddings,
+            reset=args.reset,
+        )
+        print(json.dumps(result, indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
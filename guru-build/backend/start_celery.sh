@@ -1,8 +1,8 @@
 #!/bin/bash
 # Start Celery worker and beat scheduler
 
-# Start Celery worker in the background
-celery -A app.celery_config:celery_app worker --loglevel=info &
+# Start Celery worker in the background (default queue plus per-user weekly cleanup)
+celery -A app.celery_config:celery_app worker -Q celery,weekly_cleanup --loglevel=info &
 
 # Start Celery beat scheduler (for scheduled tasks)
 celery -A app.celery_config:celery_app beat --loglevel=info &